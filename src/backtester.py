@@ -1,85 +1,162 @@
 # backtester.py
+import copy
 import pandas as pd
 import numpy as np
-from tqdm import tqdm
-from strategy_core import _resolve_indicator,_resolve_trigger, evaluate_rules, evaluate_signals
+from strategy_core import evaluate_signals
+from strategy_compiler import compile_strategy
 from entry_manager import EntryManager
+from compact_dtypes import PRICE_COLUMNS, compact_ohlc, compact_signals, restore_prices
+from compact_dtypes import price_digits as detect_price_digits
+from performance import downsample, extended_metrics, mark_to_market, mtm_metrics
+
+# Version der Simulationslogik – bei Änderungen, die Ergebnisse beeinflussen, erhöhen
+# (ungültig macht damit alle Einträge im Ergebnis-Cache)
+ENGINE_VERSION = "1.3.3"
+
+
+class BacktestAborted(Exception):
+    """
+    Abbruch eines Laufs, weil ein Limit (max_drawdown, max_trades) bereits verletzt ist.
+    bars: Anzahl bis zum Abbruch simulierter Bars
+    """
+    def __init__(self, reason, time, bars):
+        super().__init__(f"{reason} (Bar {bars} @ {time})")
+        self.reason = reason
+        self.time = time
+        self.bars = bars
 
 
 class Backtester:
     
-    def __init__(self, df, strategy):
-        self.df = df
+    def __init__(self, df, strategy, compact=False, event_driven=False, rule_workers=None, mtm_resolution=None,
+                 price_digits=None, progress=True):
+        # compact=True: float32-Preise/Indikatoren, kleine Integer, Categorical-Signale,
+        #               Regel-/Logikmasken bit-gepackt
+        # price_digits: Nachkommastellen der Kurse für compact (Standard: aus den Daten ermittelt)
+        # event_driven=True: nur Bars mit Signal, Exit-Logik oder SL/TP-Treffer offener Trades
+        #               simulieren (gleiche Trades wie der Bar-für-Bar-Lauf)
+        # rule_workers > 1: Indikatoren/Regeln auf so vielen Threads auswerten (gleiches Ergebnis)
+        # mtm_resolution: 'Equity Curve (MTM)' verkleinert speichern ('1D' oder jede n-te Bar);
+        #               die MTM-Kennzahlen nutzen immer alle Bars
+        # progress=False: kein Fortschrittsbalken (Batch, Optimierer, Worker)
+        self.compact = compact
+        self.event_driven = event_driven
+        self.rule_workers = rule_workers
+        self.mtm_resolution = mtm_resolution
+        self.progress = progress
+        self.price_digits = None
+        if compact:
+            if price_digits is None:
+                price_digits = max(detect_price_digits(df[col]) for col in PRICE_COLUMNS if col in df.columns)
+            self.price_digits = price_digits
+        self.df = compact_ohlc(df, self.price_digits) if compact else df
         self.strategy = strategy
         self.rules = strategy["rules"]
         self.logic = strategy["entry_logic"]
         self.rule_results = {}
         self.signal_masks = {}
-        self.signals = pd.Series(index=df.index, dtype=object)
+        self.signals = pd.Series(index=self.df.index, dtype=object)
     
     
     
-    def evaluate_performance(self, trades):
+    def _close_prices(self):
+        """Close-Kurse für die Simulation – im kompakten Modus zurück auf die exakten Kurse (price_digits)."""
+        if self.compact:
+            return restore_prices(self.df["Close"], self.price_digits)
+        return self.df["Close"]
+
+
+    def evaluate_performance(self, trades, start_balance=None, open_trades=(), start=None, sink=None):
         """
         Berechnet Backtest-Metriken inkl. Equity-Kurve & Risk-Reward Ratio.
         Unterstützt mehrere gleichzeitige Trades.
+        Fortsetzung (Checkpoint): Start-Balance, bereits offene Trades und nur Bars nach 'start'.
         """
         import numpy as np
         df = self.df
+        close = self._close_prices()
 
-        equity_series = pd.Series(index=df.index, dtype=float)
-        active_trades = []
-        balance = self.strategy["start balance"]
+        times = df.index if start is None else df.index[df.index > start]
+        balance = self.strategy["start balance"] if start_balance is None else start_balance
         rpt = self.strategy["rpt"]
         lever = self.strategy["lever"]
-        
-    
-        for time in df.index:
-            price = df.loc[time, "Close"]
-            
+        # Balance ohne die am Ende zwangsgeschlossenen Trades (Stand für den Checkpoint)
+        forced = getattr(self, "_forced_ids", set())
+        self.realized_balance = balance
+        initial_balance = balance
+
+        # Nur Bars mit Ausstiegen ändern die Balance → über Exit-Bars statt über alle Bars laufen.
+        # Reihenfolge innerhalb eines Bars wie bisher: zuerst bereits offene Trades, dann nach Einstieg.
+        activated = list(open_trades)
+        seen = {id(t) for t in activated}
+        entry_pos = times.get_indexer(pd.DatetimeIndex([t["entry_time"] for t in trades])) if trades else []
+        activated += [t for t, pos in zip(trades, entry_pos) if pos >= 0 and id(t) not in seen]
+
+        exit_pos = times.get_indexer(pd.DatetimeIndex([t["exit_time"] for t in activated])) if activated else []
+        exits = sorted((pos, rank) for rank, pos in enumerate(exit_pos) if pos >= 0)
+
+        equity_at_exit = {}
+        k = 0
+        while k < len(exits):
+            bar = exits[k][0]
             expo = balance * rpt * lever
     
-            # ⏱ Trades aktivieren
-            for t in trades:
-                if t["entry_time"] == time:
-                    active_trades.append(t)
-    
             # 📤 Trades schließen
             closed_this_tick = []
-            for trade in active_trades[:]:  # Kopie zum sicheren Entfernen
-                if time == trade["exit_time"]:
-                    pnl = (
-                        trade["exit_price"] - trade["entry_price"]
-                        if trade["type"] == "buy"
-                        else trade["entry_price"] - trade["exit_price"]
-                    ) * expo
-                    trade["pnl"] = pnl
-                    trade["duration"] = trade["exit_time"] - trade["entry_time"]
-                    trade["exit_reason"] = trade.get("exit_reason", "unknown")
-                
-                    # prozentualer Return
-                    raw_return = (trade["exit_price"] - trade["entry_price"]) if trade["type"] == "buy" else (trade["entry_price"] - trade["exit_price"])
-                    trade["return_pct"] = round((raw_return / trade["entry_price"]) * 100, 4)
-                
-                    # Preisverlauf während Trade aktiv war
-                    sub_prices = df.loc[trade["entry_time"]:trade["exit_time"], "Close"]
-                    entry_price = trade["entry_price"]
-                    if trade["type"] == "buy":
-                        trade["max_favorable"] = ((sub_prices.max() - entry_price) / entry_price) * expo
-                        trade["max_adverse"]   = ((sub_prices.min() - entry_price) / entry_price) * expo
-                    else:
-                        trade["max_favorable"] = ((entry_price - sub_prices.min()) / entry_price) * expo
-                        trade["max_adverse"]   = ((entry_price - sub_prices.max()) / entry_price) * expo
-                
-                    balance += pnl
-                    active_trades.remove(trade)
+            while k < len(exits) and exits[k][0] == bar:
+                trade = activated[exits[k][1]]
+                k += 1
 
-                    closed_this_tick.append(trade)
-    
-            equity_series[time] = balance
+                pnl = (
+                    trade["exit_price"] - trade["entry_price"]
+                    if trade["type"] == "buy"
+                    else trade["entry_price"] - trade["exit_price"]
+                ) * expo
+                trade["pnl"] = pnl
+                trade["duration"] = trade["exit_time"] - trade["entry_time"]
+                trade["exit_reason"] = trade.get("exit_reason", "unknown")
+            
+                # prozentualer Return
+                raw_return = (trade["exit_price"] - trade["entry_price"]) if trade["type"] == "buy" else (trade["entry_price"] - trade["exit_price"])
+                trade["return_pct"] = round((raw_return / trade["entry_price"]) * 100, 4)
+            
+                # Preisverlauf während Trade aktiv war
+                sub_prices = close.loc[trade["entry_time"]:trade["exit_time"]]
+                entry_price = trade["entry_price"]
+                if trade["type"] == "buy":
+                    trade["max_favorable"] = ((sub_prices.max() - entry_price) / entry_price) * expo
+                    trade["max_adverse"]   = ((sub_prices.min() - entry_price) / entry_price) * expo
+                else:
+                    trade["max_favorable"] = ((entry_price - sub_prices.min()) / entry_price) * expo
+                    trade["max_adverse"]   = ((entry_price - sub_prices.max()) / entry_price) * expo
+            
+                balance += pnl
+                if trade["id"] not in forced:
+                    self.realized_balance += pnl
+
+                closed_this_tick.append(trade)
     
-        # 🧹 Lücken füllen
-        equity_series.ffill(inplace=True)
+            equity_at_exit[bar] = balance
+            if sink is not None:
+                sink.write_trades(closed_this_tick, forced=[t["id"] for t in closed_this_tick if t["id"] in forced])
+
+        # 🧹 Equity: Balance nach dem letzten Ausstieg bis zum nächsten fortschreiben
+        values = np.full(len(times), np.nan)
+        if equity_at_exit:
+            values[list(equity_at_exit)] = list(equity_at_exit.values())
+        last = np.maximum.accumulate(np.where(np.isnan(values), -1, np.arange(len(times))))
+        values = np.where(last >= 0, values[np.maximum(last, 0)], initial_balance)
+        equity_series = pd.Series(values, index=times, dtype=float)
+        if sink is not None:
+            sink.write_equity(equity_series)
+
+        # 📈 Mark-to-Market: offene Trades pro Bar zum Close bewertet (Ausstiegskurs von SL/TP/Trailing)
+        offset = len(df) - len(times)
+        bid = close.to_numpy(dtype=np.float64)[offset:]
+        entries = np.maximum(times.get_indexer(pd.DatetimeIndex([t["entry_time"] for t in activated])), 0) if activated else []
+        exits = np.where(np.asarray(exit_pos) >= 0, exit_pos, len(times)) if activated else []
+        mtm = mark_to_market(values, bid, activated, entries, exits, rpt * lever, initial_balance)
+        mtm_series = pd.Series(mtm, index=times, dtype=float)
     
         # 📊 Metriken berechnen
         closed_trades = [t for t in trades if t.get("exit_time")]
@@ -114,7 +191,10 @@ class Backtester:
             "Average Loss": round(avg_loss, 2),
             "Final Balance": round(balance, 2),
             "Average RRR": round(avg_rrr, 2),
+            **extended_metrics(equity_series, closed_trades, self.strategy["start balance"] if start_balance is None else start_balance),
+            **mtm_metrics(mtm_series),
             "Equity Curve": equity_series,
+            "Equity Curve (MTM)": downsample(mtm_series, getattr(self, "mtm_resolution", None)),
             "Trades": closed_trades
         }
     
@@ -124,31 +204,53 @@ class Backtester:
     
     
     
-    def run_backtest(self, strategy):
+    def run_backtest(self, strategy, limits=None, resume_from=None, sink=None, rule_results=None):
+        """
+        limits (optional) bricht den Lauf vorzeitig mit BacktestAborted ab:
+        - 'max_drawdown': maximaler Rückgang der realisierten Balance vom Hoch (Anteil, z. B. 0.3)
+        - 'max_trades':   maximale Anzahl eröffneter Trades
+
+        resume_from (Checkpoint-Dict oder Pfad, siehe save_checkpoint) setzt einen früheren Lauf fort:
+        simuliert werden nur Bars nach dessen letztem Zeitstempel, Indikatoren laufen über
+        den gespeicherten Warm-up-Ausschnitt. Trades/Equity/Metriken betreffen dann nur die neuen Bars.
+
+        sink (optional, z. B. export.ResultSink) erhält nach der Simulation die geschlossenen Trades
+        pro Bar und die Equity-Kurve; geschlossen wird er vom Aufrufer (mehrere Läufe können anhängen).
+
+        rule_results (optional): bereits ausgewertete Regeln (Regel-ID → Series auf dem Index von df,
+        z. B. eine Symbolspalte aus panel.evaluate_panel) – die Indikatoren werden dann nicht berechnet.
+        """
+        from tqdm import tqdm   # erst beim Lauf: hält den Import des Moduls für Worker klein
+
+        state = None
+        if resume_from is not None and rule_results is not None:
+            raise ValueError("rule_results passt nicht zu einem Checkpoint-Ausschnitt – nur eines von beiden angeben")
+        if resume_from is not None:
+            state = resume_from if isinstance(resume_from, dict) else self.load_checkpoint(resume_from)
+            self._check_checkpoint(state, strategy)
+            self.df = self._resume_frame(state)
+
         df = self.df
-        rule_results = {}
-        trade_id = 1
-        balance = strategy["start balance"]
+        trade_id = state["next_trade_id"] if state else 1
+        balance = state["balance"] if state else strategy["start balance"]
+        start = state["last_time"] if state else None
         rpt = strategy["rpt"]
     
-        # 1. Regeln auswerten
-        for rule in tqdm(strategy["rules"],desc="🔄 Regeln auswerten"):
-            rule_id = rule["id"]
-            left_series = _resolve_indicator(df, rule["left"])
-            right_series = (
-                _resolve_indicator(df, rule["right"])
-                if isinstance(rule["right"], dict)
-                else pd.Series([rule["right"]] * len(df), index=df.index)
-            )
-            cond_series = _resolve_trigger(rule["trigger"])(left_series, right_series)
-            rule_results[rule_id] = cond_series
-    
+        # 1. Regeln auswerten (kompilierter DAG: gemeinsame Indikatoren/Vergleiche nur einmal)
+        self.compiled = compile_strategy(strategy)
+        if rule_results is None:
+            rule_results = self.compiled.evaluate(df, dtype=np.float32 if self.compact else None,
+                                                  workers=self.rule_workers)
+
         # 2. Signale auswerten
-        signal_data = evaluate_signals(rule_results, strategy["entry_logic"])
+        signal_data = evaluate_signals(rule_results, strategy["entry_logic"], packed=self.compact)
+        if self.compact:
+            signal_data["signals"] = compact_signals(signal_data["signals"])
         resolved_df = signal_data["signals"]
         
     
         # 3. Backtest-Schleife
+        close = self._close_prices()
         trades = []
         active_trade = None
     
@@ -161,29 +263,73 @@ class Backtester:
         
         trades = []
         active_trades = []
+        open_at_start = []
+        if state:
+            open_at_start = copy.deepcopy(state["open_trades"])
+            trades = list(open_at_start)
+            active_trades = list(open_at_start)
+            saved = state["entry_manager"]
+            entry_manager = EntryManager(mode=saved["mode"],
+                                         cooldown=saved["cooldown"],
+                                         max_open_trades=saved["max_open_trades"],
+                                         exit_config=strategy.get("exit_config"))
+            entry_manager.active_trades = list(open_at_start)
+            entry_manager.last_entry_time = saved["last_entry_time"]
+
+        limits = limits or {}
+        max_drawdown = limits.get("max_drawdown")
+        max_trades = limits.get("max_trades")
+        # Realisierte Balance wie in evaluate_performance (Exposure zum Bar-Beginn) – nur für
+        # max_drawdown; 'balance' bleibt die Start-Balance für evaluate_performance
+        exposure_factor = strategy["rpt"] * strategy["lever"]
+        realized = balance
+        peak = realized
         
         
         
-        for time in tqdm(df.index, desc="🔄 Backtesting"):
+        # Warm-up: vor 'lookback' beruhen Regeln noch auf NaN-Indikatoren → nicht simulieren
+        # (nach einem Checkpoint liefert der gespeicherte Ausschnitt den Warm-up)
+        if start is None:
+            bars = df.index[min(self.compiled.requirements()["lookback"], len(df)):]
+        else:
+            bars = df.index[df.index > start]
+        if self.event_driven:
+            positions = self._event_positions(bars, resolved_df, close, rule_results, entry_manager,
+                                              active_trades, strategy.get("exit_config"))
+        else:
+            positions = range(len(bars))
+        for bar in tqdm(positions, desc="🔄 Backtesting", disable=not self.progress):
+            time = bars[bar]
             row = resolved_df.loc[time]
-            bid = df.loc[time, "Close"]
+            bid = close.loc[time]
             spread = df.loc[time, "Spread"] / 100000#13 if pd.isna(df.loc[time, "Spread"]) else df.loc[time, "Spread"] / 100000
             ask = bid + spread
             price = ask if row["signal"] == "sell" else bid
         
             # 🔁 Exit-Prüfung für alle offenen Trades
+            closed_pnl = 0.0
             for trade in active_trades[:]:
                 exit_now = entry_manager.should_exit(
                     position=trade,
                     current_signal=row["signal"],
                     rule_results=rule_results,
                     price=price,
-                    market_close=df.loc[time, "Close"]
+                    market_close=close.loc[time],
+                    time=time
                 )
 
                 if exit_now:
                     trade["exit_time"] = time
                     active_trades.remove(trade)
+                    if max_drawdown is not None:
+                        move = trade["exit_price"] - trade["entry_price"]
+                        closed_pnl += (move if trade["type"] == "buy" else -move) * realized * exposure_factor
+
+            if max_drawdown is not None and closed_pnl:
+                realized += closed_pnl
+                peak = max(peak, realized)
+                if peak > 0 and (peak - realized) / peak > max_drawdown:
+                    raise BacktestAborted(f"Drawdown > {max_drawdown:.0%}", time, bar + 1)
 
 
 
@@ -206,15 +352,22 @@ class Backtester:
                     active_trades.append(trade)
                     entry_manager.register_trade(trade)
                     trade_id += 1
+                    if max_trades is not None and len(trades) > max_trades:
+                        raise BacktestAborted(f"Mehr als {max_trades} Trades", time, bar + 1)
                 #else:
                     #print(f"❌ Entry abgelehnt um {time} für {row['signal']}", flush=True)
         
         # 🔚 Sauber abschließen
         final_time = df.index[-1]
-        final_price = df.loc[final_time, "Close"]
+        final_price = close.loc[final_time]
         spread_value = df.loc[final_time, "Spread"]
         spread = 13 / 100000 if pd.isna(spread_value) else spread_value / 100000
         
+        # Zustand vor dem Zwangsschließen für save_checkpoint merken
+        self._open_trades = copy.deepcopy(active_trades)
+        self._forced_ids = {trade["id"] for trade in active_trades}
+        self._next_trade_id = trade_id
+
         for trade in active_trades:
             exit_price = final_price if trade["type"] == "sell" else final_price + spread
 
@@ -223,7 +376,8 @@ class Backtester:
 
 
     
-        metrics = self.evaluate_performance(trades)
+        metrics = self.evaluate_performance(trades, start_balance=balance if state else None,
+                                            open_trades=open_at_start, start=start, sink=sink)
         
         self.trades = trades
         self.entry_mgr = entry_manager
@@ -232,6 +386,156 @@ class Backtester:
             
         return trades, rule_results, signal_data, metrics, resolved_df
 
+
+    # ------------------------------------------------------- Ereignis-Modus
+
+    @staticmethod
+    def _next_hit(bid, start, type_, sl_price, tp_price, chunk=256):
+        """
+        Erste Position ab 'start', an der der Bid SL oder TP erreicht (len(bid), falls nie).
+        Gleiche Vergleiche wie should_exit; gesucht wird in wachsenden Blöcken.
+        """
+        n = len(bid)
+        while start < n:
+            window = bid[start:start + chunk]
+            if type_ == "buy":
+                hit = window >= tp_price if sl_price is None else (window <= sl_price) | (window >= tp_price)
+            else:
+                hit = window <= tp_price if sl_price is None else (window >= sl_price) | (window <= tp_price)
+            found = np.flatnonzero(hit)
+            if len(found):
+                return start + int(found[0])
+            start += chunk
+            chunk *= 2
+        return n
+
+    def _event_positions(self, bars, resolved_df, close, rule_results, entry_manager, active_trades, exit_config):
+        """
+        Positionen (in 'bars') der Bars, an denen sich der Zustand ändern kann:
+        - Bars mit aufgelöstem Signal (Einstieg, Gegensignal)
+        - solange Trades offen sind: Bars mit wahrer Exit-Logik und der nächste SL/TP-Treffer
+          pro Trade (über Bid/Close, wie in Bars ohne Signal geprüft)
+        - bei Trailing-Stop und offenen Trades jede Bar (der Stop wandert pro Bar)
+        Liest active_trades bei jedem Schritt neu – der Generator folgt der laufenden Simulation.
+        """
+        offset = len(resolved_df) - len(bars)
+        n = len(bars)
+        signal_pos = np.flatnonzero(pd.notna(np.asarray(resolved_df["signal"], dtype=object)[offset:]))
+        exit_mask = entry_manager.exit_logic_mask(rule_results)
+        exit_pos = np.flatnonzero(exit_mask[offset:]) if exit_mask is not None else np.array([], dtype=np.int64)
+        trailing = bool((exit_config or {}).get("trailing"))
+        bid = close.to_numpy(dtype=np.float64)[offset:]
+        next_hit = {}                       # Trade-ID → nächste SL/TP-Position
+
+        def first_after(positions, pos):
+            i = np.searchsorted(positions, pos, side="right")
+            return int(positions[i]) if i < len(positions) else n
+
+        pos = -1
+        while True:
+            if trailing and active_trades:
+                nxt = pos + 1
+            else:
+                nxt = first_after(signal_pos, pos)
+                if active_trades:
+                    nxt = min(nxt, first_after(exit_pos, pos))
+                    for trade in active_trades:
+                        hit = next_hit.get(trade["id"])
+                        if hit is None or hit <= pos:
+                            sl_price, tp_price = entry_manager.levels(trade)
+                            hit = next_hit[trade["id"]] = self._next_hit(bid, pos + 1, trade["type"],
+                                                                         sl_price, tp_price)
+                        nxt = min(nxt, hit)
+            if nxt >= n:
+                return
+            yield nxt
+            pos = nxt
+
+    # ------------------------------------------------------------ Checkpoint
+
+    def _strategy_hash(self, strategy):
+        import hashlib
+        from result_cache import normalize_strategy
+        return hashlib.sha256(normalize_strategy(strategy).encode()).hexdigest()
+
+    def save_checkpoint(self, path, warmup_bars=1000):
+        """
+        Speichert den Stand am Ende des letzten Laufs (kompakte .npz):
+        offene Trades (vor dem Zwangsschließen), EntryManager-Zustand, realisierte Balance,
+        nächste Trade-ID, letzter Zeitstempel und die letzten Bars als Warm-up für Indikatoren.
+        Der Ausschnitt reicht mindestens bis zum Einstieg des ältesten offenen Trades
+        (für max_favorable/max_adverse). Indikatoren mit unendlichem Gedächtnis (EMA, OBV)
+        brauchen einen ausreichend langen Ausschnitt; kürzer als der Warm-up-Bedarf der
+        Strategie (CompiledStrategy.requirements) wird er nie.
+        """
+        import json
+        from result_cache import OHLC_COLUMNS, _encode
+
+        if not hasattr(self, "_open_trades"):
+            raise RuntimeError("Kein abgeschlossener Lauf – erst run_backtest() ausführen")
+
+        df = self.df
+        warmup_bars = max(warmup_bars, self.compiled.requirements()["bars"])
+        tail_start = len(df) - warmup_bars
+        if self._open_trades:
+            oldest = min(t["entry_time"] for t in self._open_trades)
+            tail_start = min(tail_start, df.index.searchsorted(oldest))
+        tail = df.iloc[max(tail_start, 0):][[c for c in OHLC_COLUMNS if c in df.columns]]
+
+        entry_mgr = self.entry_mgr
+        payload = {
+            "engine_version": ENGINE_VERSION,
+            "strategy_hash": self._strategy_hash(self.strategy),
+            "compact": self.compact,
+            "last_time": df.index[-1],
+            "balance": self.realized_balance,
+            "next_trade_id": self._next_trade_id,
+            "open_trades": self._open_trades,
+            "entry_manager": {
+                "mode": entry_mgr.mode,
+                "cooldown": entry_mgr.cooldown.total_seconds() / 60 if entry_mgr.cooldown else None,
+                "max_open_trades": entry_mgr.max_open_trades,
+                "last_entry_time": entry_mgr.last_entry_time,
+            },
+            "tail_columns": list(tail.columns),
+        }
+
+        arrays = {f"tail.{col}": tail[col].to_numpy() for col in tail.columns}
+        arrays["tail.index"] = tail.index.to_numpy()
+        arrays["payload"] = np.array(json.dumps(payload, default=_encode))
+        with open(path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        print(f"💾 Checkpoint gespeichert: {path} ({len(self._open_trades)} offene Trades, {len(tail)} Bars Warm-up)")
+
+    @staticmethod
+    def load_checkpoint(path):
+        import json
+        from result_cache import _decode
+
+        with np.load(path, allow_pickle=False) as data:
+            state = json.loads(data["payload"].item(), object_hook=_decode)
+            index = pd.DatetimeIndex(data["tail.index"], name="DateTime")
+            state["tail"] = pd.DataFrame({col: data[f"tail.{col}"] for col in state["tail_columns"]}, index=index)
+        return state
+
+    def _check_checkpoint(self, state, strategy):
+        if state["engine_version"] != ENGINE_VERSION:
+            raise ValueError(f"Checkpoint von Engine {state['engine_version']}, aktuell {ENGINE_VERSION}")
+        if state["strategy_hash"] != self._strategy_hash(strategy):
+            raise ValueError("Checkpoint passt nicht zur Strategie")
+        if state["compact"] != self.compact:
+            raise ValueError("Checkpoint und Lauf unterscheiden sich im compact-Modus")
+
+    def _resume_frame(self, state):
+        """Warm-up-Bars aus dem Checkpoint + neue Bars (alles nach last_time)."""
+        tail = state["tail"]
+        new_bars = self.df[self.df.index > state["last_time"]]
+        if new_bars.empty:
+            raise ValueError(f"Keine neuen Bars nach {state['last_time']}")
+        if tail.empty or tail.index[-1] != state["last_time"]:
+            raise ValueError("Warm-up-Ausschnitt endet nicht am letzten Zeitstempel des Checkpoints")
+        return pd.concat([tail, new_bars[tail.columns].astype(tail.dtypes)])
+
             
             
 
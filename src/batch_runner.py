@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Batch Runner: Headless-Ausführung von Strategien × Datensätzen.
+Nimmt Glob-Muster für Strategie-JSONs und CSV-Dateien, verteilt jede Kombination
+auf einen Prozess-Pool und schreibt eine konsolidierte Metrik-Tabelle sowie
+Artefakte pro Lauf (Trades, Equity, Metriken) – ohne Plots.
+
+Beispiel:
+    python batch_runner.py --strategies "strategies/*.json" --data "data/*.csv" --workers 8
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from backtester import Backtester
+from load_mt5_data import load_data
+from result_cache import ResultCache
+
+# Pro Worker-Prozess nur der zuletzt geladene Datensatz – Jobs sind nach Datensatz sortiert,
+# ein Worker hält so nie mehr als einen Datensatz im Speicher
+_DATASET = {}
+
+
+def load_strategy_file(path):
+    """Lädt das 'strategy'-Dict aus einer JSON-Datei."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if "strategy" not in data:
+        raise ValueError(f"Kein 'strategy'-Schlüssel in {Path(path).name}")
+    return data["strategy"]
+
+
+def expand_globs(patterns):
+    """Expandiert Glob-Muster zu einer sortierten, eindeutigen Dateiliste."""
+    paths = set()
+    for pattern in patterns:
+        paths.update(glob.glob(pattern))
+    return sorted(paths)
+
+
+def dataset_names(data_files):
+    """
+    Dateiname → Pfad. Läufe, Artefakte (runs/<Strategie>__<Name>) und Worker adressieren
+    Datensätze über den Namen – gleiche Namen (ohne Endung) in verschiedenen Verzeichnissen
+    sind ein Fehler (ValueError).
+    """
+    by_stem = {}
+    for path in data_files:
+        by_stem.setdefault(Path(path).stem, []).append(path)
+    duplicates = {stem: paths for stem, paths in by_stem.items() if len(paths) > 1}
+    if duplicates:
+        listed = "; ".join(f"{stem}: {', '.join(map(str, paths))}" for stem, paths in duplicates.items())
+        raise ValueError(f"Datensatz-Namen mehrfach vergeben ({listed})")
+    return {Path(path).name: path for path in data_files}
+
+
+def _dataset(data_path):
+    df = _DATASET.get(data_path)
+    if df is None:
+        _DATASET.clear()                 # vorherigen Datensatz freigeben, bevor der neue lädt
+        df = _DATASET[data_path] = load_data.metatrader_csv(data_path)
+    return df
+
+
+def _run_name(strategy_name, data_path):
+    return f"{strategy_name}__{Path(data_path).stem}"
+
+
+def scalar_metrics(metrics):
+    """Kennzahlen ohne Kurven/Listen – eine Zeile der Metrik-Tabelle."""
+    return {k: v for k, v in metrics.items() if not isinstance(v, (pd.Series, list))}
+
+
+def _write_artifacts(run_dir, trades, metrics, fmt="csv", signal_data=None):
+    run_dir.mkdir(parents=True, exist_ok=True)
+    if fmt != "csv":
+        from export import export_results
+        export_results(run_dir, trades, metrics, signal_data, fmt=fmt)
+        return
+
+    closed = [t for t in trades if t.get("exit_time")]
+    pd.DataFrame(closed).to_csv(run_dir / "trades.csv", index=False)
+
+    equity = metrics["Equity Curve"]
+    equity.rename("equity").to_csv(run_dir / "equity.csv")
+    if "Equity Curve (MTM)" in metrics:
+        metrics["Equity Curve (MTM)"].rename("equity").to_csv(run_dir / "equity_mtm.csv")
+
+    with open(run_dir / "metrics.json", "w", encoding="utf-8") as f:
+        json.dump(scalar_metrics(metrics), f, indent=2, default=float)
+
+
+def run_job(strategy_path, data_path, out_dir, cache_dir=None, fmt="csv"):
+    """
+    Führt eine Kombination aus und gibt eine Zeile für die Metrik-Tabelle zurück.
+    Fehler werden als Status protokolliert statt den ganzen Batch abzubrechen.
+    """
+    started = time.perf_counter()
+    row = {"strategy_file": Path(strategy_path).name, "dataset": Path(data_path).name}
+    try:
+        strategy = load_strategy_file(strategy_path)
+        name = strategy.get("name", Path(strategy_path).stem)
+        row["strategy"] = name
+
+        df = _dataset(data_path).copy()
+
+        cache = ResultCache(cache_dir) if cache_dir else None
+        cache_key = cache.key(strategy, df) if cache else None
+        cached = cache.get(cache_key) if cache else None
+        signal_data = None
+        if cached is not None:
+            trades, metrics = cached
+            row["cached"] = True
+        else:
+            bt = Backtester(df, strategy, event_driven=True, progress=False)
+            trades, _, signal_data, metrics, _ = bt.run_backtest(strategy)
+            if cache:
+                cache.put(cache_key, trades, metrics)
+            row["cached"] = False
+
+        _write_artifacts(Path(out_dir) / "runs" / _run_name(name, data_path), trades, metrics, fmt, signal_data)
+
+        row.update(scalar_metrics(metrics))
+        row["status"] = "ok"
+    except Exception as e:
+        row["status"] = f"error: {e}"
+
+    row["runtime_s"] = round(time.perf_counter() - started, 3)
+    return row
+
+
+def run_batch(strategy_patterns, data_patterns, out_dir="batch_results", workers=None, cache_dir=None, fmt="csv"):
+    """
+    Plant alle Kombinationen auf einem Prozess-Pool und schreibt 'metrics.csv'.
+    fmt: Artefakte pro Lauf als 'csv' oder spaltenweise als 'parquet'/'arrow' (inkl. Masken, siehe export.py).
+    Jobs sind nach Datensatz sortiert, damit Worker geladene Daten wiederverwenden.
+    Datensätze mit gleichem Namen (verschiedene Verzeichnisse) → ValueError, siehe dataset_names.
+    """
+    strategy_files = expand_globs(strategy_patterns)
+    data_files = expand_globs(data_patterns)
+    if not strategy_files or not data_files:
+        raise FileNotFoundError("Keine Strategien oder Datensätze zu den Mustern gefunden")
+    dataset_names(data_files)
+
+    jobs = [(s, d) for d in data_files for s in strategy_files]
+    workers = workers or os.cpu_count() or 1
+    print(f"🚀 {len(jobs)} Läufe ({len(strategy_files)} Strategien × {len(data_files)} Datensätze) auf {workers} Workern")
+
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_job, s, d, out_dir, cache_dir, fmt) for s, d in jobs]
+        for i, future in enumerate(as_completed(futures), 1):
+            row = future.result()
+            rows.append(row)
+            marker = "✅" if row["status"] == "ok" else "❌"
+            print(f"{marker} [{i}/{len(jobs)}] {row.get('strategy', row['strategy_file'])} × {row['dataset']} ({row['runtime_s']}s)", flush=True)
+
+    table = pd.DataFrame(rows).sort_values(["dataset", "strategy_file"]).reset_index(drop=True)
+    table.to_csv(Path(out_dir) / "metrics.csv", index=False)
+    print(f"📄 Metrik-Tabelle gespeichert: {Path(out_dir) / 'metrics.csv'}")
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless Batch-Backtests: Strategien × Datensätze")
+    parser.add_argument("--strategies", nargs="+", default=["./strategies/*.json"], help="Glob(s) für Strategie-JSONs")
+    parser.add_argument("--data", nargs="+", required=True, help="Glob(s) für MetaTrader-CSV-Dateien")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl Worker-Prozesse (Standard: CPU-Kerne)")
+    parser.add_argument("--out", default="batch_results", help="Ausgabeverzeichnis")
+    parser.add_argument("--cache-dir", default=None, help="Ergebnis-Cache verwenden (Verzeichnis)")
+    parser.add_argument("--format", choices=["csv", "parquet", "arrow"], default="csv", help="Format der Artefakte pro Lauf")
+    args = parser.parse_args(argv)
+
+    table = run_batch(args.strategies, args.data, args.out, args.workers, args.cache_dir, args.format)
+    failed = (table["status"] != "ok").sum()
+    if failed:
+        print(f"⚠️ {failed} Läufe fehlgeschlagen – siehe Spalte 'status'")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Bit-gepackte Masken: 8 Bars pro Byte statt 1 Byte (bool) bzw. 8 Byte (object) pro Bar.
+- &, |, ^, ~ arbeiten direkt auf den gepackten Bytes
+- Entpacken erst, wenn ein Verbraucher Werte pro Bar braucht (to_series/unpack)
+- Speichern/Laden mehrerer Masken als komprimierte .npz-Datei
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class PackedMask:
+    """
+    Bool-Maske als gepacktes uint8-Array (np.packbits, Bit-Reihenfolge 'big').
+    Der Index wird nur referenziert, nicht kopiert – viele Masken teilen sich einen Index.
+    """
+    __slots__ = ("words", "length", "index")
+    # Series & PackedMask / ndarray & PackedMask: pandas bzw. NumPy geben die Operation ab,
+    # damit __rand__/__ror__/__rxor__ greifen (sonst versucht pandas elementweise zu rechnen)
+    __pandas_priority__ = 5000
+    __array_ufunc__ = None
+
+    def __init__(self, words, length, index=None):
+        self.words = words
+        self.length = length
+        self.index = index
+
+    @classmethod
+    def from_bool(cls, values, index=None):
+        values = np.asarray(values).astype(bool)
+        return cls(np.packbits(values), len(values), index)
+
+    @classmethod
+    def from_series(cls, series):
+        return cls.from_bool(series.to_numpy(), series.index)
+
+    # ------------------------------------------------------------ Operatoren
+
+    def _coerce(self, other):
+        if isinstance(other, PackedMask):
+            if other.length != self.length:
+                raise ValueError(f"Maskenlängen verschieden: {self.length} vs. {other.length}")
+            return other.words
+        if isinstance(other, (pd.Series, np.ndarray)):
+            return PackedMask.from_bool(other).words
+        if isinstance(other, (bool, np.bool_)):
+            return np.full_like(self.words, 0xFF if other else 0x00)
+        return NotImplemented
+
+    def _combine(self, other, op):
+        words = self._coerce(other)
+        if words is NotImplemented:
+            return NotImplemented
+        result = PackedMask(op(self.words, words), self.length, self.index)
+        result._clear_padding()
+        return result
+
+    def __and__(self, other):
+        return self._combine(other, np.bitwise_and)
+
+    def __or__(self, other):
+        return self._combine(other, np.bitwise_or)
+
+    def __xor__(self, other):
+        return self._combine(other, np.bitwise_xor)
+
+    __rand__ = __and__
+    __ror__ = __or__
+    __rxor__ = __xor__
+
+    def __invert__(self):
+        result = PackedMask(np.invert(self.words), self.length, self.index)
+        result._clear_padding()
+        return result
+
+    def _clear_padding(self):
+        """Füllbits im letzten Byte bleiben 0 (sonst zählt count() nach ~ zu viel)."""
+        rest = self.length % 8
+        if rest and len(self.words):
+            self.words[-1] &= np.uint8((0xFF << (8 - rest)) & 0xFF)
+
+    # ------------------------------------------------------------- Zugriff
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError(i)
+        return bool((self.words[i >> 3] >> (7 - (i & 7))) & 1)
+
+    def __eq__(self, other):
+        return (isinstance(other, PackedMask) and self.length == other.length
+                and np.array_equal(self.words, other.words))
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"PackedMask(len={self.length}, true={self.count()}, bytes={self.nbytes})"
+
+    @property
+    def nbytes(self):
+        return self.words.nbytes
+
+    def count(self):
+        """Anzahl gesetzter Bars, ohne zu entpacken."""
+        return int(_POPCOUNT[self.words].sum())
+
+    def any(self):
+        return bool(self.words.any())
+
+    def unpack(self):
+        return np.unpackbits(self.words, count=self.length).astype(bool)
+
+    def to_series(self, name=None):
+        return pd.Series(self.unpack(), index=self.index, name=name)
+
+    def flatnonzero(self):
+        """Positionen der gesetzten Bars."""
+        return np.flatnonzero(self.unpack())
+
+
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+class MaskSet(dict):
+    """
+    dict Name → PackedMask mit gemeinsamem Index.
+    Ersatz für die bool-DataFrames (rule_mask_df, logic_mask_df, ...) im gepackten Modus.
+    """
+
+    def __init__(self, index=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.index = index
+
+    @property
+    def nbytes(self):
+        return sum(m.nbytes for m in {id(m): m for m in self.values()}.values())
+
+    def to_frame(self):
+        """Entpackt alle Masken in ein bool-DataFrame (wie im ungepackten Modus)."""
+        return pd.DataFrame({name: mask.unpack() for name, mask in self.items()}, index=self.index)
+
+    def save(self, path):
+        """Gepackte Bytes + Längen + Index als komprimierte .npz."""
+        names = list(self.keys())
+        arrays = {f"mask_{i}": self[name].words for i, name in enumerate(names)}
+        np.savez_compressed(
+            path,
+            names=np.array(names, dtype=str),
+            lengths=np.array([self[name].length for name in names], dtype=np.int64),
+            index=np.asarray(self.index) if self.index is not None else np.array([]),
+            **arrays
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            index = pd.Index(data["index"]) if len(data["index"]) else None
+            masks = cls(index)
+            for i, (name, length) in enumerate(zip(data["names"], data["lengths"])):
+                masks[str(name)] = PackedMask(data[f"mask_{i}"], int(length), index)
+        return masks
@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""
+Chart-Server für große Backtests: Zoom lädt Details nach, statt alles in eine HTML-Datei zu schreiben.
+
+- OHLCPyramid: vorab aggregierte Stufen (1, 4, 16, 64, … Bars pro Kerze) inkl. Equity
+- /api/range?start=…&end=… liefert für den sichtbaren Zeitraum die feinste Stufe mit
+  höchstens max_points Kerzen, dazu Trades, blockierte Einstiege (EntryManager.to_plotly_markers)
+  und die Equity-Kurve – ohne Parameter die Übersicht über den ganzen Datensatz
+- / liefert eine Seite mit plotly.js, die bei jedem Zoom/Pan /api/range neu abfragt
+
+Beispiel:
+    python chart_server.py strategies/example_strategie_bollinger_bands.json data/EURUSD_H1.csv
+"""
+
+import argparse
+import json
+import sys
+import threading
+import webbrowser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+# Aggregation pro Spalte beim Zusammenfassen von Bars
+AGGREGATION = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Equity": "last"}
+
+
+def _reduce(values, starts, how):
+    if how == "first":
+        return values[starts]
+    if how == "last":
+        return values[np.r_[starts[1:] - 1, len(values) - 1]]
+    if how == "max":
+        return np.fmax.reduceat(values, starts)
+    return np.fmin.reduceat(values, starts)
+
+
+def _times(values):
+    return np.datetime_as_string(values, unit="s").tolist()
+
+
+def _floats(values):
+    """JSON-taugliche Liste (NaN → null)."""
+    values = np.asarray(values, dtype=np.float64)
+    if np.isnan(values).any():
+        return [None if v != v else v for v in values.tolist()]
+    return values.tolist()
+
+
+class OHLCPyramid:
+    """
+    Mehrstufige OHLC-Aggregation: Stufe k fasst je 'factor' Kerzen der Stufe k-1 zusammen
+    (feste Bar-Anzahl statt Kalenderintervall – Wochenenden/Lücken erzeugen keine leeren Kerzen).
+    Speicher gesamt ≈ 1.33 × Rohdaten bei factor=4.
+    """
+
+    def __init__(self, df, equity=None, factor=4, min_bars=500):
+        columns = {col: df[col].to_numpy(dtype=np.float64) for col in ("Open", "High", "Low", "Close") if col in df}
+        if equity is not None:
+            columns["Equity"] = equity.reindex(df.index).ffill().to_numpy(dtype=np.float64)
+
+        times = df.index.to_numpy()
+        self.levels = [(1, times, columns)]
+        step = 1
+        while len(times) > min_bars:
+            starts = np.arange(0, len(times), factor)
+            columns = {col: _reduce(values, starts, AGGREGATION[col]) for col, values in columns.items()}
+            times = times[starts]
+            step *= factor
+            self.levels.append((step, times, columns))
+
+    @property
+    def bounds(self):
+        times = self.levels[0][1]
+        return (pd.Timestamp(times[0]), pd.Timestamp(times[-1])) if len(times) else (None, None)
+
+    def select(self, start=None, end=None, max_points=2000):
+        """
+        Feinste Stufe mit höchstens max_points Kerzen in [start, end].
+        Rückgabe: (Bars pro Kerze, Zeiten, dict Spalte → Werte)
+        """
+        for step, times, columns in self.levels:
+            lo = 0 if start is None else np.searchsorted(times, np.datetime64(start), side="left")
+            hi = len(times) if end is None else np.searchsorted(times, np.datetime64(end), side="right")
+            # eine Kerze davor, damit der linke Rand nicht leer beginnt
+            lo = max(lo - 1, 0)
+            if hi - lo <= max_points or step == self.levels[-1][0]:
+                return step, times[lo:hi], {col: values[lo:hi] for col, values in columns.items()}
+
+
+class ChartServer:
+    """
+    df:       OHLC-Daten des Backtests
+    trades:   Trades aus run_backtest (mit pnl)
+    entry_mgr: optional, für blockierte Einstiege
+    equity:   optional, metrics['Equity Curve']
+    """
+
+    def __init__(self, df, trades, entry_mgr=None, equity=None, max_points=2000, max_trades=500):
+        self.pyramid = OHLCPyramid(df, equity)
+        self.close = df["Close"]
+        self.entry_mgr = entry_mgr
+        self.max_points = max_points
+        self.max_trades = max_trades
+        self._server = None
+
+        closed = sorted((t for t in trades if t.get("exit_time") is not None), key=lambda t: t["entry_time"])
+        self._trades = closed
+        self._entry = pd.DatetimeIndex([t["entry_time"] for t in closed]).to_numpy()
+        self._exit = pd.DatetimeIndex([t["exit_time"] for t in closed]).to_numpy()
+        blocked = entry_mgr.blocked_signals if entry_mgr is not None else []
+        self._blocked = np.sort(pd.DatetimeIndex([b.time for b in blocked]).to_numpy())
+
+    # ---------------------------------------------------------------- Daten
+
+    def _trades_in(self, start, end):
+        """Trades, die [start, end] überlappen; bei zu vielen gleichmäßig ausgedünnt."""
+        mask = np.ones(len(self._trades), dtype=bool)
+        if end is not None:
+            mask &= self._entry <= np.datetime64(end)
+        if start is not None:
+            mask &= self._exit >= np.datetime64(start)
+        idx = np.flatnonzero(mask)
+        total = len(idx)
+        if total > self.max_trades:
+            idx = idx[np.linspace(0, total - 1, self.max_trades).astype(int)]
+        fields = ("id", "type", "entry_time", "exit_time", "entry_price", "exit_price", "pnl", "exit_reason")
+        rows = [{k: self._trades[i].get(k) for k in fields} for i in idx]
+        return rows, total
+
+    def _blocked_in(self, start, end):
+        """Marker blockierter Einstiege – erst, wenn der Ausschnitt höchstens max_trades davon enthält."""
+        lo = 0 if start is None else np.searchsorted(self._blocked, np.datetime64(start), side="left")
+        hi = len(self._blocked) if end is None else np.searchsorted(self._blocked, np.datetime64(end), side="right")
+        total = int(hi - lo)
+        if self.entry_mgr is None or total == 0 or total > self.max_trades:
+            return [], total
+        import plotly.io as pio
+        markers = self.entry_mgr.to_plotly_markers(y_level=self.close, start=start, end=end)
+        return [json.loads(pio.to_json(trace)) for trace in markers], total
+
+    def range_payload(self, start=None, end=None):
+        """JSON-Antwort für einen Zeitraum (None = ganzer Datensatz)."""
+        start = pd.Timestamp(start) if start else None
+        end = pd.Timestamp(end) if end else None
+        step, times, columns = self.pyramid.select(start, end, self.max_points)
+        trades, total = self._trades_in(start, end)
+        blocked, blocked_total = self._blocked_in(start, end)
+        payload = {
+            "bars_per_candle": step,
+            "time": _times(times),
+            "open": _floats(columns["Open"]),
+            "high": _floats(columns["High"]),
+            "low": _floats(columns["Low"]),
+            "close": _floats(columns["Close"]),
+            "trades": trades,
+            "trades_total": total,
+            "blocked": blocked,
+            "blocked_total": blocked_total,
+        }
+        if "Equity" in columns:
+            payload["equity"] = _floats(columns["Equity"])
+        return payload
+
+    # ---------------------------------------------------------------- Server
+
+    def serve(self, port=8050, host="127.0.0.1", open_browser=True, block=True):
+        """Startet den HTTP-Server; block=False läuft in einem Daemon-Thread."""
+        chart = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, body, content_type):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/api/range":
+                    query = parse_qs(url.query)
+                    try:
+                        payload = chart.range_payload(query.get("start", [None])[0], query.get("end", [None])[0])
+                    except ValueError as e:
+                        self.send_error(400, str(e))
+                        return
+                    self._send(json.dumps(payload, default=str).encode(), "application/json")
+                elif url.path == "/plotly.js":
+                    from plotly.offline import get_plotlyjs
+                    self._send(get_plotlyjs().encode(), "application/javascript")
+                elif url.path == "/":
+                    self._send(PAGE.encode(), "text/html; charset=utf-8")
+                else:
+                    self.send_error(404)
+
+            def log_message(self, *args):   # keine Zugriffslogs auf stderr
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        url = f"http://{host}:{self._server.server_address[1]}/"
+        print(f"📊 Chart unter {url}")
+        if open_browser:
+            webbrowser.open(url)
+        if not block:
+            threading.Thread(target=self._server.serve_forever, name="chart-server", daemon=True).start()
+            return self._server
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n🛑 Chart-Server beendet")
+        finally:
+            self._server.server_close()
+            self._server = None
+
+    def stop(self):
+        """Beendet einen mit block=False gestarteten Server."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Backtest-Chart</title>
+<script src="/plotly.js"></script>
+<style>body{margin:0;font-family:sans-serif} #info{padding:4px 8px;color:#555;font-size:13px}</style>
+</head><body>
+<div id="info">lade …</div>
+<div id="chart" style="height:92vh"></div>
+<script>
+const chart = document.getElementById("chart");
+const info = document.getElementById("info");
+let pending = null, request = 0;
+
+function tradeTrace(trades, win) {
+  const x = [], y = [], text = [];
+  for (const t of trades) {
+    if ((t.pnl > 0) !== win) continue;
+    x.push(t.entry_time, t.exit_time, null);
+    y.push(t.entry_price, t.exit_price, null);
+    const label = `<b>${t.id}</b> ${String(t.type).toUpperCase()}<br>PnL: ${Number(t.pnl).toFixed(2)}<br>Grund: ${t.exit_reason}`;
+    text.push(label, label, null);
+  }
+  return {type: "scatter", mode: "lines+markers", x, y, text, hoverinfo: "text",
+          name: win ? "Gewinner" : "Verlierer", line: {color: win ? "green" : "red", width: 2},
+          marker: {size: 6, color: win ? "green" : "red"}};
+}
+
+async function load(start, end) {
+  const id = ++request;
+  const query = start ? `?start=${encodeURIComponent(start)}&end=${encodeURIComponent(end)}` : "";
+  const d = await (await fetch("/api/range" + query)).json();
+  if (id !== request) return;                       // veraltete Antwort (weiter gezoomt)
+  const traces = [{type: "candlestick", x: d.time, open: d.open, high: d.high, low: d.low, close: d.close,
+                   name: `OHLC (${d.bars_per_candle} Bars/Kerze)`}];
+  traces.push(tradeTrace(d.trades, true), tradeTrace(d.trades, false));
+  if (d.equity) traces.push({type: "scatter", mode: "lines", x: d.time, y: d.equity, yaxis: "y2",
+                             name: "Equity", line: {color: "royalblue", dash: "dot"}});
+  traces.push(...d.blocked);
+  const layout = {template: "plotly_white", uirevision: "keep", hovermode: "closest",
+                  xaxis: {rangeslider: {visible: false}, title: "Zeit"}, yaxis: {title: "Preis"},
+                  yaxis2: {overlaying: "y", side: "right", title: "Equity", showgrid: false},
+                  legend: {orientation: "h", y: -0.1}, margin: {t: 20}};
+  if (start) layout.xaxis.range = [start, end];
+  await Plotly.react(chart, traces, layout);
+  info.textContent = `${d.time.length} Kerzen à ${d.bars_per_candle} Bars · ` +
+                     `${d.trades.length}/${d.trades_total} Trades · ` +
+                     (d.blocked.length || !d.blocked_total ? `${d.blocked_total} blockierte Einstiege`
+                                                           : `${d.blocked_total} blockierte Einstiege (zum Anzeigen zoomen)`);
+}
+
+load().then(() => chart.on("plotly_relayout", ev => {
+  clearTimeout(pending);
+  if (ev["xaxis.autorange"]) { pending = setTimeout(() => load(), 150); return; }
+  const start = ev["xaxis.range[0]"] ?? (ev["xaxis.range"] || [])[0];
+  const end = ev["xaxis.range[1]"] ?? (ev["xaxis.range"] || [])[1];
+  if (start && end) pending = setTimeout(() => load(start, end), 150);
+}));
+</script></body></html>
+"""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest ausführen und als Zoom-Chart bereitstellen")
+    parser.add_argument("strategy", help="Strategie-JSON")
+    parser.add_argument("data", help="MetaTrader-CSV")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--max-points", type=int, default=2000, help="Kerzen pro Ansicht")
+    parser.add_argument("--no-browser", action="store_true")
+    args = parser.parse_args(argv)
+
+    from backtester import Backtester
+    from load_mt5_data import load_data
+
+    with open(args.strategy, "r", encoding="utf-8") as f:
+        strategy = json.load(f)["strategy"]
+    df = load_data.metatrader_csv(args.data)
+    bt = Backtester(df, strategy)
+    trades, _, _, metrics, _ = bt.run_backtest(strategy)
+    ChartServer(df, trades, bt.entry_mgr, metrics["Equity Curve"], max_points=args.max_points).serve(
+        args.port, open_browser=not args.no_browser)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Kompakter Datenmodus (opt-in):
+- Preise und Indikatoren als float32
+- Volumen/Spread als kleinste passende Integer-Typen
+- Signal/Logik-ID als Categorical (int8-Codes), SL/TP numerisch statt object
+- Masken als bool bzw. bit-gepackt (bitmask.PackedMask)
+Dazu ein toleranzbasierter Abgleich der Metriken gegen den float64-Lauf.
+"""
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+COUNT_COLUMNS = ["TickVol", "Vol", "Spread"]
+
+
+def price_digits(values, max_digits=8):
+    """
+    Nachkommastellen der Kurse (z. B. 5 für EURUSD, 3 für USDJPY, 2 für XAUUSD): kleinste Stellenzahl,
+    bei der Runden jeden Wert höchstens um eine Einheit der letzten Stelle seines Typs verschiebt.
+    Funktioniert für float64-Quellen und für bereits nach float32 umgewandelte Kurse.
+    """
+    values = np.asarray(values)
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return max_digits
+    exact = values.astype(np.float64)
+    ulp = np.spacing(np.abs(values)).astype(np.float64)
+    for digits in range(max_digits + 1):
+        if np.all(np.abs(np.round(exact, digits) - exact) <= ulp):
+            return digits
+    return max_digits
+
+
+def compact_ohlc(df, digits=None):
+    """
+    Gibt eine Kopie mit float32-Preisen und kleinsten Integer-Typen zurück.
+    digits: Nachkommastellen der Kurse – eine float64-Preisspalte, die sich aus float32 nicht
+    exakt wiederherstellen lässt (zu viele signifikante Stellen), bleibt dann float64.
+    """
+    out = df.copy()
+    for col in PRICE_COLUMNS:
+        if col in out.columns:
+            compact = out[col].astype(np.float32)
+            if digits is not None and out[col].dtype == np.float64 and \
+                    not restore_prices(compact, digits).equals(out[col].round(digits)):
+                print(f"⚠️ {col}: float32 reicht für {digits} Nachkommastellen nicht – bleibt float64")
+                continue
+            out[col] = compact
+    for col in COUNT_COLUMNS:
+        if col in out.columns:
+            series = out[col]
+            if series.isna().any():
+                out[col] = series.astype(np.float32)
+            elif (series >= 0).all():
+                out[col] = pd.to_numeric(series, downcast="unsigned")
+            else:
+                out[col] = pd.to_numeric(series, downcast="integer")
+    return out
+
+
+def restore_prices(series, digits):
+    """
+    float32-Kurse → float64 auf 'digits' Nachkommastellen gerundet (siehe price_digits).
+    MT5-Kurse haben feste Stellen; so vergleicht die Simulation exakt wie im float64-Lauf
+    (z. B. Close == TP-Kurs), obwohl float32 gespeichert wird.
+    """
+    return series.astype(np.float64).round(digits)
+
+
+def compact_signals(resolved_df):
+    """
+    resolved_df (object-Spalten) → Categorical für 'logic_id'/'signal',
+    float64 für 'sl'/'tp' (NaN = kein Signal). sl/tp bleiben float64: EntryManager.levels
+    rechnet daraus die SL/TP-Kurse, und die müssen exakt wie im float64-Lauf treffen.
+    """
+    out = pd.DataFrame(index=resolved_df.index)
+    out["logic_id"] = resolved_df["logic_id"].astype("category")
+    out["signal"] = resolved_df["signal"].astype("category")
+    out["sl"] = pd.to_numeric(resolved_df["sl"]).astype(np.float64)
+    out["tp"] = pd.to_numeric(resolved_df["tp"]).astype(np.float64)
+    return out
+
+
+def frame_nbytes(df):
+    """Speicherbedarf inkl. Index (deep=True für object-Spalten)."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def compare_metrics(reference, candidate, rtol=1e-3, atol=1e-2):
+    """
+    Vergleicht skalare Metriken und Equity-Kurve zweier Läufe.
+    Rückgabe: (ok, abweichungen) – abweichungen: Name → (Referenz, Kandidat)
+    """
+    deviations = {}
+    for name, ref in reference.items():
+        if name == "Trades":
+            continue
+        cand = candidate.get(name)
+
+        if isinstance(ref, pd.Series):
+            if cand is None or len(cand) != len(ref):
+                deviations[name] = (len(ref), None if cand is None else len(cand))
+                continue
+            ref_values = ref.to_numpy(dtype=np.float64)
+            cand_values = cand.to_numpy(dtype=np.float64)
+            if not np.allclose(ref_values, cand_values, rtol=rtol, atol=atol, equal_nan=True):
+                worst = np.nanmax(np.abs(ref_values - cand_values))
+                deviations[name] = ("max. Abweichung", float(worst))
+            continue
+
+        if isinstance(ref, (int, float, np.number)):
+            if cand is None or not np.isclose(float(ref), float(cand), rtol=rtol, atol=atol):
+                deviations[name] = (ref, cand)
+
+    return not deviations, deviations
+
+
+def verify_compact(df, strategy, rtol=1e-3, atol=1e-2, digits=None):
+    """
+    Führt die Strategie im float64- und im kompakten Modus aus und prüft,
+    ob die Metriken innerhalb der Toleranz übereinstimmen.
+    digits: Kurse vorher ×100 skalieren und auf so viele Nachkommastellen runden
+    (z. B. 3 → JPY-artige Kurse wie 151.234), um andere Symbole mit denselben Daten nachzustellen.
+    """
+    from backtester import Backtester
+
+    if digits is not None:
+        df = df.copy()
+        for col in PRICE_COLUMNS:
+            if col in df.columns:
+                df[col] = (df[col] * 100).round(digits)
+
+    reference = Backtester(df.copy(), strategy).run_backtest(strategy)[3]
+    bt = Backtester(df.copy(), strategy, compact=True)
+    candidate = bt.run_backtest(strategy)[3]
+
+    ok, deviations = compare_metrics(reference, candidate, rtol=rtol, atol=atol)
+    if ok:
+        print(f"✅ Kompakter Modus innerhalb Toleranz (rtol={rtol}, atol={atol}, {bt.price_digits} Nachkommastellen)")
+    else:
+        for name, (ref, cand) in deviations.items():
+            print(f"⚠️ {name}: float64={ref} kompakt={cand}")
+    return ok, deviations
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Zeitlich partitionierter Datensatz-Speicher für OHLC-Daten.
+
+Layout pro Symbol:
+    <root>/<SYMBOL>/index.json                    Partitionen mit Verzeichnis, Zeitgrenzen und Zeilenzahl
+    <root>/<SYMBOL>/<YYYY-MM>.<uuid>/DateTime.npy  datetime64, aufsteigend
+    <root>/<SYMBOL>/<YYYY-MM>.<uuid>/<Spalte>.npy  eine Binärdatei pro Spalte
+
+- load(symbol, start, end) öffnet nur Partitionen, die den Zeitraum überlappen
+  (per Memory-Map) und schneidet über searchsorted auf den Zeitstempeln zu
+- append(symbol, df) schreibt nur die letzte Partition neu bzw. legt neue Monate an
+- ingest(symbol, df) führt beliebige Zeiträume zusammen (neue Bars gewinnen)
+
+Schreiben: jede geänderte Partition entsteht komplett in einem neuen Verzeichnis;
+umgeschaltet wird für alle Monate eines Aufrufs gemeinsam mit einem os.replace von
+index.json. Ein paralleles load() sieht damit entweder den alten oder den neuen Stand,
+nie Spalten verschiedener Stände. Ersetzte Verzeichnisse bleiben retire_seconds lang
+stehen (Index-Eintrag 'retired') und werden danach beim Schreiben gelöscht; ein noch
+langsamerer Leser liest den Index neu. Ein Schreiber pro Symbol.
+
+Beispiel:
+    python dataset_store.py import EURUSD data/EURUSD_H1.csv
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from load_mt5_data import OHLC_COLUMNS
+
+TIME_COLUMN = "DateTime"
+
+
+class DatasetStore:
+    """Monatlich partitionierte Spaltendateien pro Symbol."""
+
+    def __init__(self, root="datastore", retire_seconds=60):
+        self.root = Path(root)
+        self.retire_seconds = retire_seconds
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    # ----------------------------------------------------------------- Index
+
+    def _symbol_dir(self, symbol):
+        return self.root / symbol
+
+    def read_index(self, symbol):
+        path = self._symbol_dir(symbol) / "index.json"
+        if not path.exists():
+            return {"columns": {}, "partitions": {}}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_index(self, symbol, index):
+        path = self._symbol_dir(symbol) / "index.json"
+        tmp = path.with_name(f"index.{uuid.uuid4().hex}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)   # Spaltenreihenfolge bleibt erhalten
+        os.replace(tmp, path)
+
+    def symbols(self):
+        return sorted(p.name for p in self.root.iterdir() if (p / "index.json").exists())
+
+    def partitions(self, symbol):
+        """dict Monat → {'dir', 'start', 'end', 'rows'} (sortiert)."""
+        return dict(sorted(self.read_index(symbol)["partitions"].items()))
+
+    def bounds(self, symbol):
+        parts = self.partitions(symbol)
+        if not parts:
+            return None
+        return pd.Timestamp(parts[min(parts)]["start"]), pd.Timestamp(parts[max(parts)]["end"])
+
+    # --------------------------------------------------------------- Lesen
+
+    @staticmethod
+    def _partition_dir(month, meta):
+        return meta.get("dir", month)      # Speicher ohne 'dir': Verzeichnis = Monat
+
+    def _load_partition(self, symbol, part_dir, columns, mmap=True):
+        part_dir = self._symbol_dir(symbol) / part_dir
+        mode = "r" if mmap else None
+        times = np.load(part_dir / f"{TIME_COLUMN}.npy", mmap_mode=mode)
+        return times, {col: np.load(part_dir / f"{col}.npy", mmap_mode=mode) for col in columns}
+
+    def load(self, symbol, start=None, end=None, columns=None, mmap=True, retries=5):
+        """
+        Lädt [start, end] (inklusive) als DataFrame mit DatetimeIndex 'DateTime'.
+        Nur überlappende Partitionen werden geöffnet; Spaltenauswahl über 'columns'.
+        Liegt der Bereich in einer Partition, zeigen die Spalten direkt auf die Memory-Map.
+        """
+        for attempt in range(retries):
+            try:
+                return self._load(symbol, start, end, columns, mmap)
+            except FileNotFoundError:
+                # Partition wurde zwischen Index lesen und Öffnen ersetzt → neuer Index
+                if attempt == retries - 1:
+                    raise
+
+    def _load(self, symbol, start, end, columns, mmap):
+        index = self.read_index(symbol)
+        if not index["partitions"]:
+            raise KeyError(f"Symbol '{symbol}' nicht im Speicher")
+
+        columns = list(columns) if columns is not None else list(index["columns"])
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+
+        time_parts, column_parts = [], {col: [] for col in columns}
+        for month, meta in sorted(index["partitions"].items()):
+            if start is not None and pd.Timestamp(meta["end"]) < start:
+                continue
+            if end is not None and pd.Timestamp(meta["start"]) > end:
+                continue
+
+            times, values = self._load_partition(symbol, self._partition_dir(month, meta), columns, mmap)
+            lo = 0 if start is None else np.searchsorted(times, start.to_datetime64(), side="left")
+            hi = len(times) if end is None else np.searchsorted(times, end.to_datetime64(), side="right")
+            if lo >= hi:
+                continue
+            time_parts.append(times[lo:hi])
+            for col in columns:
+                column_parts[col].append(values[col][lo:hi])
+
+        dtypes = index["columns"]
+        if not time_parts:
+            return pd.DataFrame({col: np.array([], dtype=dtypes[col]) for col in columns},
+                                index=pd.DatetimeIndex([], name=TIME_COLUMN))
+
+        if len(time_parts) == 1:                     # ohne Kopie: ndarray-Sicht auf die Memory-Map
+            data = {col: parts[0].view(np.ndarray) for col, parts in column_parts.items()}
+            times = time_parts[0].view(np.ndarray)
+        else:
+            data = {col: np.concatenate(parts) for col, parts in column_parts.items()}
+            times = np.concatenate(time_parts)
+        return pd.DataFrame(data, index=pd.DatetimeIndex(times, name=TIME_COLUMN), copy=False)
+
+    # ------------------------------------------------------------ Schreiben
+
+    def _write_partition(self, symbol, month, frame):
+        """Schreibt die Partition in ein neues Verzeichnis – sichtbar erst über den Index."""
+        name = f"{month}.{uuid.uuid4().hex}"
+        part_dir = self._symbol_dir(symbol) / name
+        part_dir.mkdir(parents=True)
+        for col in frame.columns:
+            np.save(part_dir / f"{col}.npy", frame[col].to_numpy(), allow_pickle=False)
+        np.save(part_dir / f"{TIME_COLUMN}.npy", frame.index.to_numpy(), allow_pickle=False)
+        return {"dir": name, "start": frame.index[0].isoformat(), "end": frame.index[-1].isoformat(),
+                "rows": len(frame)}
+
+    def _retire(self, index, names):
+        """Merkt ersetzte Verzeichnisse mit Zeitpunkt vor; abgelaufene fallen aus dem Index."""
+        now = time.time()
+        retired = {name: since for name, since in index.get("retired", {}).items()
+                   if now - since < self.retire_seconds}
+        retired.update({name: now for name in names} if self.retire_seconds > 0 else {})
+        index["retired"] = retired
+
+    def _remove_unreferenced(self, symbol, index):
+        """Löscht Partitionsverzeichnisse, auf die weder Index noch Schonfrist zeigen.
+        Unter Windows bleibt ein noch gemapptes Verzeichnis stehen und fällt beim nächsten Schreiben weg."""
+        keep = {self._partition_dir(month, meta) for month, meta in index["partitions"].items()}
+        keep.update(index.get("retired", {}))
+        for path in self._symbol_dir(symbol).iterdir():
+            if path.is_dir() and path.name not in keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _prepare(self, df, index):
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise TypeError("DataFrame braucht einen DatetimeIndex")
+        columns = list(index["columns"]) or [c for c in OHLC_COLUMNS if c in df.columns]
+        missing = [c for c in columns if c not in df.columns]
+        if missing:
+            raise ValueError(f"Spalten fehlen: {missing}")
+        frame = df[columns]
+        frame = frame[~frame.index.duplicated(keep="last")]
+        if not frame.index.is_monotonic_increasing:
+            frame = frame.sort_index(kind="stable")
+        return frame
+
+    def _store_months(self, symbol, frame, index, merge):
+        index["columns"] = index["columns"] or {col: str(frame[col].dtype) for col in frame.columns}
+        replaced = []
+        for month, group in frame.groupby(frame.index.strftime("%Y-%m"), sort=True):
+            previous = index["partitions"].get(month)
+            if merge and previous is not None:
+                times, values = self._load_partition(symbol, self._partition_dir(month, previous),
+                                                     list(index["columns"]), mmap=False)
+                existing = pd.DataFrame(values, index=pd.DatetimeIndex(times, name=TIME_COLUMN))
+                group = pd.concat([existing, group])
+                group = group[~group.index.duplicated(keep="last")].sort_index(kind="stable")
+            if previous is not None:
+                replaced.append(self._partition_dir(month, previous))
+            group = group.astype(index["columns"])
+            index["partitions"][month] = self._write_partition(symbol, month, group)
+        self._retire(index, replaced)
+        self._write_index(symbol, index)              # ein Umschaltpunkt für alle Monate
+        self._remove_unreferenced(symbol, index)
+
+    def ingest(self, symbol, df):
+        """Übernimmt beliebige Zeiträume; überlappende Monate werden zusammengeführt (neue Bars gewinnen)."""
+        self._symbol_dir(symbol).mkdir(parents=True, exist_ok=True)
+        index = self.read_index(symbol)
+        frame = self._prepare(df, index)
+        if not frame.empty:
+            self._store_months(symbol, frame, index, merge=True)
+        return len(frame)
+
+    def append(self, symbol, df):
+        """
+        Hängt neue Bars an. Bars bis zum bisherigen Ende werden ignoriert;
+        geschrieben wird nur die letzte Partition (bzw. neue Monate).
+        """
+        index = self.read_index(symbol)
+        if not index["partitions"]:
+            return self.ingest(symbol, df)
+
+        frame = self._prepare(df, index)
+        last_end = pd.Timestamp(index["partitions"][max(index["partitions"])]["end"])
+        frame = frame[frame.index > last_end]
+        if not frame.empty:
+            self._store_months(symbol, frame, index, merge=True)
+        return len(frame)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Partitionierter OHLC-Datensatz-Speicher")
+    parser.add_argument("--root", default="datastore", help="Speicherverzeichnis")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="MetaTrader-CSV(s) in den Speicher übernehmen")
+    imp.add_argument("symbol")
+    imp.add_argument("files", nargs="+")
+
+    info = sub.add_parser("info", help="Partitionen eines Symbols anzeigen")
+    info.add_argument("symbol")
+    args = parser.parse_args(argv)
+
+    store = DatasetStore(args.root)
+    if args.command == "import":
+        from load_mt5_data import load_data
+        rows = store.ingest(args.symbol, load_data.metatrader_csv_parallel(args.files))
+        print(f"✅ {rows} Bars für {args.symbol} gespeichert ({len(store.partitions(args.symbol))} Partitionen)")
+    else:
+        for month, meta in store.partitions(args.symbol).items():
+            print(f"{month}: {meta['start']} → {meta['end']} ({meta['rows']} Bars)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
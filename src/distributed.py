@@ -0,0 +1,440 @@
+# -*- coding: utf-8 -*-
+"""
+Verteilte Sweeps ohne externe Dienste: ein Koordinator verteilt (Strategie-Variante, Datensatz)-
+Jobs über TCP (multiprocessing.managers), Worker auf beliebigen Rechnern holen sich Jobs in Batches.
+
+- Leases: jeder ausgegebene Job gehört einem Worker bis zur Frist; Worker verlängern sie per
+  Heartbeat. Läuft eine Frist ab (Worker abgestürzt, Netz weg), kommt der Job zurück in die
+  Warteschlange – nach max_attempts Fehlversuchen wird er als Fehler verbucht
+- Datensätze liefert der Koordinator in Blöcken aus; Worker legen sie unter ihrem SHA-256
+  im lokalen Cache-Verzeichnis ab und laden jeden Datensatz nur einmal pro Prozess
+- Ergebnisse (skalare Metriken pro Lauf) kommen sofort zurück und werden als JSON-Zeilen
+  mitgeschrieben (results.jsonl); am Ende entsteht metrics.csv wie beim Batch Runner
+
+Sicherheit: Manager-Verbindungen übertragen Pickles – wer den Schlüssel kennt, kann auf dem
+Koordinator Code ausführen. Einen Standardschlüssel gibt es deshalb nicht: --authkey oder
+BACKTESTER_AUTHKEY ist Pflicht. Der Koordinator lauscht ohne --host nur auf 127.0.0.1.
+
+Beispiel (Varianten aus einem Parameter-Grid, zwei Rechner):
+    python distributed.py coordinator --strategies "strategies/*.json" --data "data/*.csv" \\
+        --grid '{"entry_logic.*.sl": [100, 150, 200]}' --host 0.0.0.0 --port 50000 --authkey geheim
+    python distributed.py worker --connect koordinator:50000 --authkey geheim --processes 8
+
+Lokal testen (Koordinator startet selbst Worker-Prozesse auf localhost):
+    BACKTESTER_AUTHKEY=geheim python distributed.py coordinator --data "data/*.csv" --local-workers 4
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from multiprocessing import Process
+from multiprocessing.managers import BaseManager
+from pathlib import Path
+
+DEFAULT_PORT = 50000
+AUTHKEY_ENV = "BACKTESTER_AUTHKEY"
+CHUNK_BYTES = 8 * 1024 ** 2
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def resolve_authkey(authkey=None):
+    """Schlüssel aus Argument oder BACKTESTER_AUTHKEY als bytes; ohne beides ValueError."""
+    authkey = authkey or os.environ.get(AUTHKEY_ENV)
+    if not authkey:
+        raise ValueError(f"Kein Authkey: --authkey angeben oder {AUTHKEY_ENV} setzen")
+    return authkey.encode() if isinstance(authkey, str) else authkey
+
+
+def build_jobs(strategy_patterns, data_patterns, param_grid=None):
+    """
+    Jobs aus Strategie-JSONs × Datensätzen, optional je Strategie alle Varianten eines
+    Parameter-Grids (Pfade wie im Optimierer). Sortiert nach Datensatz.
+    Rückgabe: (Jobs, dict Datensatz-Name → Pfad)
+    Worker adressieren Datensätze über den Dateinamen – gleiche Namen in verschiedenen
+    Verzeichnissen sind deshalb ein Fehler (ValueError).
+    """
+    from batch_runner import dataset_names, expand_globs, load_strategy_file
+    from optimizer import apply_params, expand_grid
+
+    strategy_files = expand_globs(strategy_patterns)
+    data_files = expand_globs(data_patterns)
+    if not strategy_files or not data_files:
+        raise FileNotFoundError("Keine Strategien oder Datensätze zu den Mustern gefunden")
+
+    datasets = dataset_names(data_files)
+    variants = []
+    for path in strategy_files:
+        strategy = load_strategy_file(path)
+        name = strategy.get("name", Path(path).stem)
+        for params in (expand_grid(param_grid) if param_grid else [{}]):
+            variants.append((Path(path).name, name, params, apply_params(strategy, params)))
+
+    jobs = []
+    for dataset in datasets:
+        for strategy_file, name, params, strategy in variants:
+            jobs.append({"id": f"J{len(jobs) + 1:05}", "strategy_file": strategy_file, "strategy": strategy,
+                         "name": name, "params": params, "dataset": dataset})
+    return jobs, datasets
+
+
+# --------------------------------------------------------------- Koordinator
+
+class JobBoard:
+    """
+    Zustand des Koordinators; Worker rufen die Methoden über einen Manager-Proxy auf.
+    Der Manager bedient jede Verbindung in einem eigenen Thread → alles unter einem Lock.
+    """
+
+    def __init__(self, jobs, datasets, lease_timeout=300, max_attempts=3, results_path=None):
+        self.jobs = {job["id"]: job for job in jobs}
+        self.pending = deque(job["id"] for job in jobs)
+        self.leases = {}                 # Job-ID → (Worker-ID, Frist)
+        self.attempts = {}               # Job-ID → abgelaufene Leases
+        self.results = {}                # Job-ID → Ergebniszeile
+        self.workers = {}                # Worker-ID → letzter Kontakt
+        self.datasets = {name: {"path": path, "sha256": _sha256(path), "size": os.path.getsize(path)}
+                         for name, path in datasets.items()}
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.results_path = results_path
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        """Abgelaufene Leases zurück an den Anfang der Warteschlange (in ihrer bisherigen Reihenfolge)."""
+        requeue = []
+        for job_id, (worker_id, deadline) in list(self.leases.items()):
+            if deadline >= now:
+                continue
+            del self.leases[job_id]
+            self.attempts[job_id] = self.attempts.get(job_id, 0) + 1
+            if self.attempts[job_id] >= self.max_attempts:
+                self._record(job_id, worker_id, {"status": f"error: Lease {self.max_attempts}x abgelaufen"})
+            else:
+                requeue.append(job_id)
+                print(f"♻️ {job_id} zurück in die Warteschlange (Worker {worker_id} ohne Heartbeat)", flush=True)
+        self.pending.extendleft(reversed(requeue))
+
+    def _record(self, job_id, worker_id, row):
+        job = self.jobs[job_id]
+        row = {"job": job_id, "strategy_file": job["strategy_file"], "strategy": job["name"],
+               "dataset": job["dataset"], **{f"param:{k}": v for k, v in job["params"].items()},
+               **row, "worker": worker_id}
+        self.results[job_id] = row
+        if self.results_path:
+            with open(self.results_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(row, default=str) + "\n")
+
+    def lease(self, worker_id, n=1, cached=()):
+        """
+        Bis zu n Jobs für worker_id; Jobs auf bereits gecachten Datensätzen zuerst.
+        [] = gerade nichts frei (andere Leases laufen noch), None = alles erledigt.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.workers[worker_id] = now
+            self._expire(now)
+            if not self.pending and not self.leases:
+                return None
+            cached = set(cached)
+            preferred = [job_id for job_id in self.pending if self.jobs[job_id]["dataset"] in cached][:n]
+            taken = preferred + [job_id for job_id in self.pending if job_id not in preferred][:n - len(preferred)]
+            for job_id in taken:
+                self.pending.remove(job_id)
+                self.leases[job_id] = (worker_id, now + self.lease_timeout)
+            return [self.jobs[job_id] for job_id in taken]
+
+    def heartbeat(self, worker_id):
+        """Verlängert alle Leases des Workers."""
+        now = time.monotonic()
+        with self._lock:
+            self.workers[worker_id] = now
+            for job_id, (owner, _) in self.leases.items():
+                if owner == worker_id:
+                    self.leases[job_id] = (owner, now + self.lease_timeout)
+
+    def complete(self, worker_id, job_id, row):
+        """Ergebnis eines Jobs; verspätete Antworten auf neu vergebene Jobs zählen nur einmal."""
+        with self._lock:
+            self.workers[worker_id] = time.monotonic()
+            if job_id in self.results:
+                return False
+            self.leases.pop(job_id, None)
+            if job_id in self.pending:
+                self.pending.remove(job_id)
+            self._record(job_id, worker_id, row)
+            return True
+
+    def dataset_info(self, name):
+        info = self.datasets[name]
+        return {"sha256": info["sha256"], "size": info["size"]}
+
+    def dataset_chunk(self, name, offset, size=CHUNK_BYTES):
+        with open(self.datasets[name]["path"], "rb") as f:
+            f.seek(offset)
+            return f.read(size)
+
+    def status(self):
+        with self._lock:
+            self._expire(time.monotonic())
+            return {"total": len(self.jobs), "done": len(self.results), "pending": len(self.pending),
+                    "leased": len(self.leases), "workers": len(self.workers)}
+
+    def rows(self):
+        with self._lock:
+            return [self.results[job_id] for job_id in self.jobs if job_id in self.results]
+
+
+class _ServerManager(BaseManager):
+    pass
+
+
+class _ClientManager(BaseManager):
+    pass
+
+
+_ClientManager.register("board")
+
+
+class Coordinator:
+    """
+    Startet den TCP-Manager mit einem JobBoard und wartet, bis alle Jobs verbucht sind.
+    local_workers > 0 startet zusätzlich so viele Worker-Prozesse auf diesem Rechner.
+    """
+
+    def __init__(self, jobs, datasets, out_dir="sweep_results", host="127.0.0.1", port=DEFAULT_PORT,
+                 authkey=None, lease_timeout=300, max_attempts=3):
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        results_path = self.out_dir / "results.jsonl"
+        if results_path.exists():
+            results_path.unlink()
+        self.board = JobBoard(jobs, datasets, lease_timeout, max_attempts, results_path)
+        self.address = (host, port)
+        self.authkey = resolve_authkey(authkey)
+        self._server = None
+
+    def start(self):
+        _ServerManager.register("board", callable=lambda: self.board)
+        manager = _ServerManager(address=self.address, authkey=self.authkey)
+        self._server = manager.get_server()
+        self.address = self._server.address          # Port 0 → tatsächlich vergebener Port
+        threading.Thread(target=self._server.serve_forever, name="sweep-coordinator", daemon=True).start()
+        print(f"📡 Koordinator auf {self.address[0]}:{self.address[1]} – {len(self.board.jobs)} Jobs", flush=True)
+        return self.address
+
+    def run(self, local_workers=0, batch_size=4, cache_dir=".dataset_cache", poll=1.0):
+        import pandas as pd
+
+        if self._server is None:
+            self.start()
+        host = "127.0.0.1" if self.address[0] in ("0.0.0.0", "") else self.address[0]
+        processes = [Process(target=run_worker, args=((host, self.address[1]), self.authkey),
+                             kwargs={"batch_size": batch_size, "cache_dir": cache_dir}, daemon=True)
+                     for _ in range(local_workers)]
+        for process in processes:
+            process.start()
+
+        started = time.perf_counter()
+        last = None
+        while True:
+            status = self.board.status()
+            if status != last:
+                print(f"⏳ {status['done']}/{status['total']} fertig, {status['leased']} in Arbeit, "
+                      f"{status['workers']} Worker", flush=True)
+                last = status
+            if status["done"] == status["total"]:
+                break
+            time.sleep(poll)
+
+        for process in processes:
+            process.join(timeout=10)
+
+        table = pd.DataFrame(self.board.rows())
+        table.to_csv(self.out_dir / "metrics.csv", index=False)
+        print(f"📄 {len(table)} Ergebnisse in {time.perf_counter() - started:.1f}s: {self.out_dir / 'metrics.csv'}")
+        return table
+
+
+# -------------------------------------------------------------------- Worker
+
+class DatasetCache:
+    """Datensätze vom Koordinator, lokal unter ihrem SHA-256 abgelegt (überlebt Neustarts)."""
+
+    def __init__(self, board, cache_dir=".dataset_cache"):
+        self.board = board
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._frames = {}
+
+    def cached_names(self):
+        return list(self._frames)
+
+    def _fetch(self, name, info):
+        path = self.cache_dir / f"{info['sha256']}{Path(name).suffix}"
+        if path.exists() and path.stat().st_size == info["size"]:
+            return path
+        tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp, "wb") as f:
+            offset = 0
+            while offset < info["size"]:
+                chunk = self.board.dataset_chunk(name, offset)
+                if not chunk:
+                    raise IOError(f"Datensatz {name} unvollständig ({offset}/{info['size']} Bytes)")
+                f.write(chunk)
+                offset += len(chunk)
+        if _sha256(tmp) != info["sha256"]:
+            tmp.unlink()
+            raise IOError(f"Prüfsumme von {name} stimmt nicht")
+        os.replace(tmp, path)
+        return path
+
+    def get(self, name):
+        df = self._frames.get(name)
+        if df is None:
+            from load_mt5_data import load_data
+            df = load_data.metatrader_csv(str(self._fetch(name, self.board.dataset_info(name))))
+            self._frames[name] = df
+        return df
+
+
+def run_job(job, df):
+    """Ein Backtest; Fehler werden als Status zurückgemeldet (wie im Batch Runner)."""
+    from backtester import Backtester
+    from batch_runner import scalar_metrics
+
+    started = time.perf_counter()
+    try:
+        strategy = job["strategy"]
+        bt = Backtester(df.copy(), strategy, event_driven=True, progress=False)
+        _, _, _, metrics, _ = bt.run_backtest(strategy)
+        row = {**scalar_metrics(metrics), "status": "ok"}
+    except Exception as e:
+        row = {"status": f"error: {e}"}
+    row["runtime_s"] = round(time.perf_counter() - started, 3)
+    return row
+
+
+def _heartbeat(board, worker_id, stop, interval):
+    while not stop.wait(interval):
+        try:
+            board.heartbeat(worker_id)
+        except (OSError, EOFError):
+            return
+
+
+def run_worker(address, authkey=None, batch_size=4, cache_dir=".dataset_cache",
+               heartbeat=30, idle_poll=2.0, max_jobs=None):
+    """
+    Holt Jobs in Batches vom Koordinator, bis alles erledigt ist.
+    Ein Heartbeat-Thread hält die Leases, solange ein Batch läuft.
+    max_jobs (optional): nach so vielen Jobs beenden (z. B. zum Testen von Ausfällen).
+    """
+    manager = _ClientManager(address=tuple(address), authkey=resolve_authkey(authkey))
+    manager.connect()
+    board = manager.board()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    datasets = DatasetCache(board, cache_dir)
+
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(board, worker_id, stop, heartbeat), daemon=True).start()
+    done = 0
+    try:
+        while max_jobs is None or done < max_jobs:
+            n = batch_size if max_jobs is None else min(batch_size, max_jobs - done)
+            batch = board.lease(worker_id, n, datasets.cached_names())
+            if batch is None:
+                break
+            if not batch:
+                time.sleep(idle_poll)
+                continue
+            for job in batch:
+                try:
+                    df = datasets.get(job["dataset"])
+                except Exception as e:
+                    row = {"status": f"error: {e}", "runtime_s": 0.0}
+                else:
+                    row = run_job(job, df)
+                board.complete(worker_id, job["id"], row)
+                done += 1
+    finally:
+        stop.set()
+    print(f"👷 Worker {worker_id}: {done} Jobs erledigt", flush=True)
+    return done
+
+
+# ----------------------------------------------------------------------- CLI
+
+def _address(text):
+    host, _, port = text.rpartition(":")
+    return (host or "127.0.0.1", int(port))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verteilte Sweeps: Koordinator und Worker über TCP")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    coord = sub.add_parser("coordinator", help="Jobs verteilen und Ergebnisse sammeln")
+    coord.add_argument("--strategies", nargs="+", default=["./strategies/*.json"], help="Glob(s) für Strategie-JSONs")
+    coord.add_argument("--data", nargs="+", required=True, help="Glob(s) für MetaTrader-CSV-Dateien")
+    coord.add_argument("--grid", default=None, help="JSON-dict Pfad → Werteliste oder Pfad zu einer JSON-Datei")
+    coord.add_argument("--host", default="127.0.0.1", help="Bind-Adresse (0.0.0.0 für Worker auf anderen Rechnern)")
+    coord.add_argument("--port", type=int, default=DEFAULT_PORT)
+    coord.add_argument("--authkey", default=None, help=f"Gemeinsamer Schlüssel (sonst {AUTHKEY_ENV})")
+    coord.add_argument("--out", default="sweep_results", help="Ausgabeverzeichnis")
+    coord.add_argument("--lease-timeout", type=float, default=300, help="Sekunden ohne Heartbeat bis zur Neuvergabe")
+    coord.add_argument("--max-attempts", type=int, default=3, help="Abgelaufene Leases pro Job bis zum Fehler")
+    coord.add_argument("--local-workers", type=int, default=0, help="Worker-Prozesse auf diesem Rechner")
+    coord.add_argument("--batch-size", type=int, default=4, help="Jobs pro Lease (lokale Worker)")
+
+    work = sub.add_parser("worker", help="Jobs vom Koordinator abarbeiten")
+    work.add_argument("--connect", required=True, help="host:port des Koordinators")
+    work.add_argument("--authkey", default=None, help=f"Gemeinsamer Schlüssel (sonst {AUTHKEY_ENV})")
+    work.add_argument("--processes", type=int, default=1, help="Worker-Prozesse auf diesem Rechner")
+    work.add_argument("--batch-size", type=int, default=4, help="Jobs pro Lease")
+    work.add_argument("--cache-dir", default=".dataset_cache", help="Lokaler Datensatz-Cache")
+    args = parser.parse_args(argv)
+    try:
+        authkey = resolve_authkey(args.authkey)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.mode == "worker":
+        processes = [Process(target=run_worker, args=(_address(args.connect), authkey),
+                             kwargs={"batch_size": args.batch_size, "cache_dir": args.cache_dir})
+                     for _ in range(args.processes)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        return 0
+
+    grid = None
+    if args.grid:
+        grid = json.load(open(args.grid, encoding="utf-8")) if os.path.exists(args.grid) else json.loads(args.grid)
+    jobs, datasets = build_jobs(args.strategies, args.data, grid)
+    coordinator = Coordinator(jobs, datasets, args.out, args.host, args.port, authkey,
+                              args.lease_timeout, args.max_attempts)
+    table = coordinator.run(args.local_workers, args.batch_size)
+    failed = (table["status"] != "ok").sum()
+    if failed:
+        print(f"⚠️ {failed} Läufe fehlgeschlagen – siehe Spalte 'status'")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
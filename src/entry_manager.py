@@ -17,6 +17,8 @@ class EntryManager:
         self.last_entry_time = None
         self.blocked_signals = []
         self.exit_config = exit_config or {}
+        self._mask_source = None         # rule_results, zu denen _mask_cache gehört
+        self._mask_cache = {}
 
 
     def allow_entry(self, time, signal, active_positions):
@@ -49,17 +51,55 @@ class EntryManager:
 
 
 
-    def should_exit(self, position, current_signal=None, rule_results=None, price=None, market_close=None):
+    def _mask(self, expr, rule_results):
+        """Maske eines Logikausdrucks – pro Ausdruck und rule_results nur einmal berechnet."""
+        if self._mask_source is not rule_results:
+            self._mask_source = rule_results
+            self._mask_cache = {}
+        mask = self._mask_cache.get(expr)
+        if mask is None:
+            mask = self._mask_cache[expr] = StrategyLogicParser(rule_results).parse_expression(expr)
+        return mask
+
+
+    def _mask_at(self, expr, rule_results, time=None):
+        """Wert eines Logikausdrucks an Bar 'time' (Backtest) bzw. an der letzten Bar (Live)."""
+        mask = self._mask(expr, rule_results)
+        return mask.loc[time] if time is not None else mask.iloc[-1]
+
+
+    def levels(self, position):
+        """Klassische SL/TP-Preise einer Position (ohne Trailing)."""
+        entry = position["entry_price"]
+        sign = 1 if position["type"] == "buy" else -1
+        sl_price = entry - sign * position["sl"] / 100000 if position["sl"] is not None else None
+        return sl_price, entry + sign * position["tp"] / 100000
+
+
+    def exit_logic_mask(self, rule_results):
+        """
+        ODER aller Exit-Logikmasken als bool-Array (None ohne Exit-Logik).
+        Für den ereignisgesteuerten Backtest: Bars, an denen eine Logik-Exit-Prüfung greifen kann.
+        """
+        import numpy as np
+
+        combined = None
+        for logic in self.exit_config.get("logic", []):
+            mask = self._mask(logic["when"], rule_results)
+            values = mask.unpack() if hasattr(mask, "unpack") else np.asarray(mask, dtype=bool)
+            combined = values if combined is None else combined | values
+        return combined
+
+
+    def should_exit(self, position, current_signal=None, rule_results=None, price=None, market_close=None, time=None):
         entry = position["entry_price"]
-        sl_pips = position["sl"]
-        tp_pips = position["tp"]
         type_ = position["type"]
     
         trailing = self.exit_config.get("trailing", None)
         trigger_mode = trailing.get("trigger") if trailing else None
         trail_active = trailing is not None
     
-        tp_price = entry + tp_pips / 100000 if type_ == "buy" else entry - tp_pips / 100000
+        sl_price, tp_price = self.levels(position)
         price_direction_positive = price > entry if type_ == "buy" else price < entry
     
     
@@ -76,9 +116,7 @@ class EntryManager:
             elif trigger_mode == "custom":
                 custom_logic = trailing.get("when")
                 if custom_logic and rule_results:
-                    parser = StrategyLogicParser(rule_results)
-                    mask = parser.parse_expression(custom_logic) # Maske zwischenspeichern nicht neu berechnen jedes mal
-                    if not mask.iloc[-1]:
+                    if not self._mask_at(custom_logic, rule_results, time):
                         skip_update = True
     
             elif trigger_mode == "stepwise":
@@ -106,7 +144,6 @@ class EntryManager:
     
         else:
             # Klassischer SL
-            sl_price = entry - sl_pips / 100000 if type_ == "buy" else entry + sl_pips / 100000
             if (type_ == "buy" and price <= sl_price) or (type_ == "sell" and price >= sl_price):
                 position["exit_reason"] = "stop_loss"
                 position["exit_price"] = market_close or price
@@ -134,9 +171,7 @@ class EntryManager:
     
         # Logikmasken
         for logic in self.exit_config.get("logic", []):
-            parser = StrategyLogicParser(rule_results)
-            mask = parser.parse_expression(logic["when"])
-            if mask.iloc[-1]:
+            if self._mask_at(logic["when"], rule_results, time):
                 position["exit_reason"] = logic.get("ID", "custom_exit")
                 position["exit_price"] = price
                 return True
@@ -153,16 +188,28 @@ class EntryManager:
     def get_blocked_signals(self):
         return self.blocked_signals
 
-    def to_plotly_markers(self, y_level=None):
+    def to_plotly_markers(self, y_level=None, start=None, end=None):
+        """
+        Marker für blockierte Einstiege.
+        y_level: None, eine Zahl oder eine Preis-Series (Wert zur letzten Bar ≤ Signalzeit)
+        start/end: nur Signale im Zeitraum (für Ausschnitte großer Backtests)
+        """
         import plotly.graph_objects as go
 
-        if not self.blocked_signals:
+        blocked = [b for b in self.blocked_signals
+                   if (start is None or b.time >= start) and (end is None or b.time <= end)]
+        if not blocked:
             return []
 
-        times = [b.time for b in self.blocked_signals]
-        labels = [f"{b.signal.upper()} blockiert<br>{b.reason}" for b in self.blocked_signals]
+        times = [b.time for b in blocked]
+        labels = [f"{b.signal.upper()} blockiert<br>{b.reason}" for b in blocked]
 
-        y = [None] * len(times) if y_level is None else y_level
+        if y_level is None:
+            y = [None] * len(times)
+        elif hasattr(y_level, "asof"):
+            y = y_level.asof(times).tolist()
+        else:
+            y = [y_level] * len(times)
 
         return [go.Scatter(
             x=times,
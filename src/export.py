@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""
+Spaltenorientierter Export der Backtest-Ergebnisse nach Parquet bzw. Arrow (IPC).
+
+- trades:       eine Zeile pro Trade, festes Schema (Zeiten, Preise, PnL, Exit-Grund, ...)
+- equity:       Balance pro Bar (DateTime, equity)
+- rule_masks /
+  logic_masks:  bool-Spalte pro Regel bzw. Logik-ID
+
+Schon spaltenförmige Daten werden ohne Umweg über Python-Objekte übergeben:
+numpy-Arrays der Equity-Kurve direkt, PackedMasks als Arrow-Bitmaps (nur Bit-Reihenfolge
+pro Byte gedreht, kein Entpacken auf 1 Byte/Bar).
+
+ResultSink schreibt das Ergebnis eines Laufs in Row-Groups: run_backtest(..., sink=ResultSink(dir))
+übergibt nach der Simulation (in evaluate_performance, wenn PnL feststeht) die geschlossenen
+Trades bar-weise und die Equity-Kurve. Mehrere fortgesetzte Läufe (resume_from) hängen an
+dieselben Dateien an – so wächst eine Ergebnisdatei über Checkpoints hinweg, ohne frühere
+Läufe neu zu schreiben. Die Trades eines Laufs hält der Backtester bis zum Ende im Speicher.
+Gelesen wird spaltenweise und lazy über read_frame().
+
+pyarrow wird erst beim ersten Export importiert (optionale Abhängigkeit).
+
+Beispiel:
+    python export.py strategies/example_strategie_rsi.json data/EURUSD_H1.csv --out results/rsi
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# Trade-Felder in Schema-Reihenfolge (fehlende Felder → null)
+TRADE_FIELDS = [
+    ("id", "string"), ("logic_id", "string"), ("type", "string"),
+    ("entry_time", "timestamp"), ("entry_price", "float64"),
+    ("sl", "float64"), ("tp", "float64"),
+    ("exit_time", "timestamp"), ("exit_price", "float64"), ("exit_reason", "string"),
+    ("pnl", "float64"), ("duration", "duration"), ("return_pct", "float64"),
+    ("max_favorable", "float64"), ("max_adverse", "float64"),
+    ("sl_trailing", "float64"), ("forced", "bool"),
+]
+
+# Bit-Umkehr pro Byte: PackedMask (np.packbits, 'big') → Arrow-Bitmap ('little')
+_BIT_REVERSE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1)[:, ::-1]
+_BIT_REVERSE = np.packbits(_BIT_REVERSE, axis=1).ravel()
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("Export benötigt pyarrow: pip install pyarrow") from e
+    return pa
+
+
+def _arrow_type(pa, kind):
+    return {
+        "string": pa.string(),
+        "float64": pa.float64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("ns"),
+        "duration": pa.duration("ns"),
+    }[kind]
+
+
+def trade_schema():
+    pa = _pyarrow()
+    return pa.schema([(name, _arrow_type(pa, kind)) for name, kind in TRADE_FIELDS])
+
+
+# ------------------------------------------------------------------ Tabellen
+
+def trades_table(trades, forced=()):
+    """Liste von Trade-dicts → Arrow-Tabelle (spaltenweise aufgebaut, ein Durchlauf pro Feld)."""
+    pa = _pyarrow()
+    forced = set(forced)
+    columns = []
+    for name, kind in TRADE_FIELDS:
+        if name == "forced":
+            values = [t["id"] in forced or bool(t.get("forced", False)) for t in trades]
+        else:
+            values = [t.get(name) for t in trades]
+        if kind in ("timestamp", "duration"):
+            # pandas → datetime64/timedelta64 (NaT → null), Einheit wie im Schema
+            values = (pd.to_datetime(values) if kind == "timestamp" else pd.to_timedelta(values)).as_unit("ns")
+            columns.append(pa.array(values.to_numpy(), type=_arrow_type(pa, kind), from_pandas=True))
+        elif kind == "float64":
+            columns.append(pa.array(np.array([np.nan if v is None else v for v in values], dtype=np.float64),
+                                    from_pandas=True))
+        elif kind == "string":
+            columns.append(pa.array([None if v is None else str(v) for v in values], type=pa.string()))
+        else:
+            columns.append(pa.array(values, type=_arrow_type(pa, kind)))
+    return pa.Table.from_arrays(columns, schema=trade_schema())
+
+
+def equity_table(equity):
+    """Equity-Series (DatetimeIndex) → Tabelle DateTime/equity; float64-Werte ohne Kopie."""
+    pa = _pyarrow()
+    times = equity.index.as_unit("ns").to_numpy() if isinstance(equity.index, pd.DatetimeIndex) \
+        else np.asarray(equity.index)
+    values = np.ascontiguousarray(equity.to_numpy(dtype=np.float64))
+    return pa.table({"DateTime": pa.array(times, type=pa.timestamp("ns")), "equity": pa.array(values)})
+
+
+def _packed_to_arrow(pa, mask):
+    """PackedMask → Arrow-BooleanArray über den gepackten Puffer (Länge/8 Bytes)."""
+    bitmap = _BIT_REVERSE[mask.words]
+    return pa.Array.from_buffers(pa.bool_(), mask.length, [None, pa.py_buffer(bitmap)])
+
+
+def mask_table(masks):
+    """
+    bool-DataFrame (rule_mask_df, logic_mask_df) oder MaskSet → Tabelle mit DateTime + einer
+    bool-Spalte pro Maske.
+    """
+    pa = _pyarrow()
+    index = masks.index
+    arrays = {}
+    if index is not None and len(index):
+        arrays["DateTime"] = pa.array(pd.DatetimeIndex(index).as_unit("ns").to_numpy(), type=pa.timestamp("ns"))
+    for name in (masks.columns if isinstance(masks, pd.DataFrame) else masks.keys()):
+        mask = masks[name]
+        if hasattr(mask, "words"):
+            arrays[str(name)] = _packed_to_arrow(pa, mask)
+        else:
+            arrays[str(name)] = pa.array(np.asarray(mask, dtype=bool))
+    return pa.table(arrays)
+
+
+# ---------------------------------------------------------------- Schreiben
+
+class TableWriter:
+    """
+    Inkrementeller Writer für eine Datei: jede write()-Tabelle wird zu einer Row-Group (Parquet)
+    bzw. einem Record-Batch (Arrow). Das Schema kommt aus der ersten Tabelle.
+    """
+
+    def __init__(self, path, fmt="parquet", compression="zstd"):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unbekanntes Format '{fmt}' (erlaubt: {', '.join(FORMATS)})")
+        self.path = Path(path)
+        self.fmt = fmt
+        self.compression = compression
+        self.rows = 0
+        self._writer = None
+        self._sink = None
+
+    def _open(self, schema):
+        pa = _pyarrow()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(self.path, schema, compression=self.compression)
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=self.compression)
+            self._sink = pa.OSFile(str(self.path), "wb")
+            self._writer = pa.ipc.new_file(self._sink, schema, options=options)
+
+    def write(self, table):
+        if table.num_rows == 0:
+            return
+        if self._writer is None:
+            self._open(table.schema)
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+
+class ResultSink:
+    """
+    Hängt Trades und Equity eines oder mehrerer (fortgesetzter) Läufe an <out_dir>/trades.*
+    und equity.* an.
+
+    Gefüttert wird nach der Simulation (evaluate_performance), nicht während der Bar-Schleife.
+    Trades werden gepuffert und ab 'batch_rows' Zeilen als eigene Row-Group geschrieben – die
+    Arrow-Tabelle entsteht so nie für alle Trades auf einmal. Am Ende zwangsgeschlossene
+    Trades (siehe Backtester.save_checkpoint) tragen forced=True.
+    """
+
+    def __init__(self, out_dir, fmt="parquet", compression="zstd", batch_rows=10_000):
+        self.out_dir = Path(out_dir)
+        self.fmt = fmt
+        self.batch_rows = batch_rows
+        self.trades = TableWriter(self.out_dir / f"trades{FORMATS[fmt]}", fmt, compression)
+        self.equity = TableWriter(self.out_dir / f"equity{FORMATS[fmt]}", fmt, compression)
+        self._pending = []
+
+    def write_trades(self, trades, forced=()):
+        """
+        Geschlossene Trades eines Bars (closed_this_tick) übernehmen.
+        Kopiert pro Trade: ein fortgesetzter Lauf schließt dieselbe ID später erneut.
+        """
+        forced = set(forced)
+        self._pending.extend(dict(t, forced=t["id"] in forced) for t in trades)
+        if len(self._pending) >= self.batch_rows:
+            self.flush()
+
+    def write_equity(self, equity):
+        self.equity.write(equity_table(equity))
+
+    def flush(self):
+        if self._pending:
+            self.trades.write(trades_table(self._pending))
+            self._pending = []
+
+    def close(self):
+        self.flush()
+        self.trades.close()
+        self.equity.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_table(table, path, fmt="parquet", compression="zstd"):
+    writer = TableWriter(path, fmt, compression)
+    try:
+        writer.write(table)
+    finally:
+        writer.close()
+    return writer.path
+
+
+def export_results(out_dir, trades, metrics, signal_data=None, fmt="parquet", compression="zstd",
+                   forced=()):
+    """
+    Schreibt die Ergebnisse eines abgeschlossenen Laufs:
+    trades, equity, equity_mtm, optional rule_masks/logic_masks (aus evaluate_signals) und metrics.json.
+    Rückgabe: dict Name → Pfad
+    """
+    out_dir = Path(out_dir)
+    ext = FORMATS.get(fmt, "")
+    paths = {"trades": write_table(trades_table(trades, forced), out_dir / f"trades{ext}", fmt, compression)}
+    if "Equity Curve" in metrics:
+        paths["equity"] = write_table(equity_table(metrics["Equity Curve"]), out_dir / f"equity{ext}",
+                                      fmt, compression)
+    if "Equity Curve (MTM)" in metrics:
+        paths["equity_mtm"] = write_table(equity_table(metrics["Equity Curve (MTM)"]), out_dir / f"equity_mtm{ext}",
+                                          fmt, compression)
+    if signal_data is not None:
+        for key, name in (("rule_mask_df", "rule_masks"), ("logic_mask_df", "logic_masks")):
+            if key in signal_data:
+                paths[name] = write_table(mask_table(signal_data[key]), out_dir / f"{name}{ext}", fmt, compression)
+
+    scalars = {k: v for k, v in metrics.items() if not isinstance(v, (pd.Series, list))}
+    paths["metrics"] = out_dir / "metrics.json"
+    with open(paths["metrics"], "w", encoding="utf-8") as f:
+        json.dump(scalars, f, indent=2, default=float)
+    return paths
+
+
+# ------------------------------------------------------------------- Lesen
+
+def read_frame(path, columns=None, filters=None):
+    """
+    Liest eine exportierte Datei als DataFrame – nur die angefragten Spalten
+    (Parquet zusätzlich mit Row-Group-Filtern, z. B. [("exit_reason", "=", "stop_loss")]).
+    """
+    path = Path(path)
+    if path.suffix == FORMATS["arrow"]:
+        pa = _pyarrow()
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+    else:
+        _pyarrow()
+        import pyarrow.parquet as pq
+        table = pq.read_table(path, columns=columns, filters=filters)
+    frame = table.to_pandas()
+    if "DateTime" in frame.columns:
+        frame = frame.set_index("DateTime")
+    return frame
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest ausführen und Ergebnisse spaltenweise exportieren")
+    parser.add_argument("strategy", help="Strategie-JSON")
+    parser.add_argument("data", help="MetaTrader-CSV")
+    parser.add_argument("--out", default="results", help="Ausgabeverzeichnis")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="parquet")
+    parser.add_argument("--compression", default="zstd")
+    parser.add_argument("--no-masks", action="store_true", help="Regel-/Logikmasken nicht exportieren")
+    args = parser.parse_args(argv)
+
+    from backtester import Backtester
+    from load_mt5_data import load_data
+
+    with open(args.strategy, "r", encoding="utf-8") as f:
+        strategy = json.load(f)["strategy"]
+    df = load_data.metatrader_csv(args.data)
+    bt = Backtester(df, strategy)
+    trades, _, signal_data, metrics, _ = bt.run_backtest(strategy)
+    paths = export_results(args.out, trades, metrics, None if args.no_masks else signal_data,
+                           fmt=args.format, compression=args.compression, forced=bt._forced_ids)
+    for name, path in paths.items():
+        print(f"💾 {name}: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Gemeinsamer Live-Datenfeed für mehrere Strategien.
+- pro (Symbol, Timeframe) ein Abruf je Bar – Länge = größter Warm-up-Bedarf der Abonnenten
+- alle Regeln der Abonnenten in einem gemeinsamen DAG: gleiche Indikatoren und Vergleiche
+  (z. B. rsi(period=14) in fünf Strategien) werden pro Zyklus nur einmal berechnet
+- jede Strategie behält ihren LiveTrader mit eigenem EntryManager, eigenen Orders und Metriken;
+  der Hub reicht Daten und Regelergebnisse nur durch (LiveTrader.on_feed)
+
+Beispiel:
+    hub = FeedHub()
+    for i, strategy in enumerate(strategies):
+        hub.subscribe(LiveTrader(strategy, "EURUSD", mt5.TIMEFRAME_H1, magic=123456 + i))
+    hub.connect()
+    hub.start_metrics()              # ein /metrics-Endpunkt für alle Strategien
+    hub.start_loop()
+"""
+
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from strategy_compiler import CompiledStrategy
+
+
+class Feed:
+    """Ein (Symbol, Timeframe): ein Datenabruf und ein Regel-DAG für alle Abonnenten."""
+
+    def __init__(self, symbol, timeframe):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.compiled = CompiledStrategy()
+        self.subscribers = []        # (LiveTrader, dict Regel-ID der Strategie → Knoten-ID)
+        self.history_size = 0
+        self.df = pd.DataFrame()
+        self.next_due = 0.0          # time.monotonic() des nächsten Abrufs
+
+    def add(self, trader):
+        # Regel-IDs pro Strategie eindeutig machen ('R1' gibt es in jeder) – die Knoten selbst
+        # werden über ihre kanonischen Schlüssel geteilt
+        prefix = f"S{len(self.subscribers)}"
+        nodes = {rule["id"]: self.compiled.add_rule({**rule, "id": f"{prefix}.{rule['id']}"})
+                 for rule in trader.strategy["rules"]}
+        self.subscribers.append((trader, nodes))
+        self.history_size = max(self.history_size, trader.history_size)
+
+    def evaluate(self, df, workers=None):
+        """Ein Durchlauf über den gemeinsamen DAG → [(Trader, Regel-ID → Series), …]."""
+        values = self.compiled.evaluate_nodes(df, workers=workers)
+        return [(trader, {rule_id: values[nid] for rule_id, nid in nodes.items()})
+                for trader, nodes in self.subscribers]
+
+    def summary(self):
+        shared = sum(node.kind == "indicator" for node in self.compiled.nodes.values())
+        separate = sum(sum(node.kind == "indicator" for node in trader.compiled.nodes.values())
+                       for trader, _ in self.subscribers)
+        return {"symbol": self.symbol, "timeframe": self.timeframe, "strategies": len(self.subscribers),
+                "history_size": self.history_size, "indicator_calls": shared,
+                "indicator_calls_separate": separate}
+
+
+class FeedHub:
+    """
+    Verteilt Daten und Regelergebnisse pro (Symbol, Timeframe) an die abonnierten LiveTrader.
+    fetch(symbol, timeframe, count) → DataFrame; Standard: live_trader.fetch_rates (MT5).
+    rule_workers > 1 wertet den gemeinsamen DAG auf einem Thread-Pool aus.
+    """
+
+    def __init__(self, fetch=None, rule_workers=None):
+        self.feeds = {}
+        self.rule_workers = rule_workers
+        self._fetch = fetch
+
+    def subscribe(self, trader):
+        key = (trader.symbol, trader.timeframe)
+        feed = self.feeds.get(key)
+        if feed is None:
+            feed = self.feeds[key] = Feed(*key)
+        if any(other.magic == trader.magic for other, _ in feed.subscribers):
+            raise ValueError(f"Magic-Nummer {trader.magic} auf {trader.symbol} bereits vergeben – "
+                             "Positionen der Strategien wären nicht unterscheidbar")
+        feed.add(trader)
+        return feed
+
+    def traders(self):
+        return [trader for feed in self.feeds.values() for trader, _ in feed.subscribers]
+
+    def start_metrics(self, port=9108, log_path="live_metrics.jsonl"):
+        """
+        Ein Prometheus-Endpunkt für alle Abonnenten (Reihen über die Labels symbol/magic/strategy
+        getrennt) und ein gemeinsames rotierendes JSON-Log (Labels in jeder Zeile).
+        """
+        from live_metrics import serve_metrics
+        traders = self.traders()
+        server = serve_metrics([trader.metrics for trader in traders], port) if port is not None else None
+        if log_path:
+            for trader in traders:
+                trader.metrics.log_to(log_path)
+        return server
+
+    def connect(self):
+        for trader in self.traders():
+            trader.connect()
+
+    def fetch(self, feed):
+        if self._fetch is None:
+            from live_trader import fetch_rates
+            self._fetch = fetch_rates
+        return self._fetch(feed.symbol, feed.timeframe, feed.history_size)
+
+    def update(self, feed):
+        """Ein Abruf und eine Regelauswertung für den Feed, danach ein Zyklus je Abonnent."""
+        df = self.fetch(feed)
+        if df.empty or "Close" not in df.columns:
+            print(f"⚠️ Ungültige oder leere Marktdaten für {feed.symbol}")
+            return False
+        feed.df = df
+        for trader, rule_results in feed.evaluate(df, self.rule_workers):
+            try:
+                trader.on_feed(df, rule_results)
+            except Exception as e:       # eine Strategie darf die anderen nicht aufhalten
+                print(f"❌ Fehler im Zyklus ({trader.strategy.get('name', trader.symbol)}): {e}")
+        return True
+
+    def run_once(self):
+        """Alle Feeds mit geöffnetem Markt einmal aktualisieren."""
+        for feed in self.feeds.values():
+            if feed.subscribers[0][0].is_market_tradable():
+                self.update(feed)
+
+    def _interval(self, feed):
+        trader = feed.subscribers[0][0]
+        return trader.timeframe_secounds.get(feed.timeframe) or trader.timeframe_to_timedelta().total_seconds()
+
+    def start_loop(self):
+        for summary in (feed.summary() for feed in self.feeds.values()):
+            print(f"🚀 Feed {summary['symbol']}: {summary['strategies']} Strategien, "
+                  f"{summary['indicator_calls']} statt {summary['indicator_calls_separate']} Indikator-Aufrufe, "
+                  f"{summary['history_size']} Bars")
+        while True:
+            now = time.monotonic()
+            for feed in self.feeds.values():
+                if feed.next_due > now:
+                    continue
+                feed.next_due = now + self._interval(feed)
+                try:
+                    if feed.subscribers[0][0].is_market_tradable():
+                        self.update(feed)
+                    else:
+                        print(f"⛔ {feed.symbol}: Markt geschlossen – {datetime.utcnow():%H:%M} UTC")
+                except Exception as e:
+                    print(f"❌ Fehler im Feed {feed.symbol}: {e}")
+            time.sleep(max(min(feed.next_due for feed in self.feeds.values()) - time.monotonic(), 1.0))
@@ -7,8 +7,38 @@ Multi-Output: dict mit pd.Series
 
 import pandas as pd
 import numpy as np
+import kernels
+from registry import indicator
 
+# Restgewicht des Startwerts, ab dem eine EMA als eingeschwungen gilt (warmup-Metadaten)
+EMA_WARMUP_TOLERANCE = 1e-4
 
+
+def _wrap(values, like):
+    """NumPy-Ergebnis zurück in Series (bzw. DataFrame bei Panel-Daten) mit Index von 'like'."""
+    if isinstance(like, pd.DataFrame):
+        return pd.DataFrame(values, index=like.index, columns=like.columns)
+    return pd.Series(values, index=like.index)
+
+
+def _true_range(df):
+    """True Range – gemeinsam genutzt von ATR und ADX."""
+    high = kernels.as_float(df["High"])
+    low = kernels.as_float(df["Low"])
+    prev_close = kernels.shift(df["Close"])
+    # fmax ignoriert NaN (erste Zeile: nur High-Low), wie pandas max(axis=1)
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def _ema_warmup(span):
+    """Bars, bis das Gewicht des ersten Werts einer EMA (adjust=False) unter EMA_WARMUP_TOLERANCE fällt."""
+    alpha = 2 / (span + 1)
+    if alpha >= 1:
+        return 0
+    return int(np.ceil(np.log(EMA_WARMUP_TOLERANCE) / np.log(1 - alpha)))
+
+
+@indicator
 def price(df: pd.DataFrame, field: str = "Close") -> pd.Series:
     """
     Gibt die angegebene Spalte des DataFrames zurück.
@@ -16,26 +46,31 @@ def price(df: pd.DataFrame, field: str = "Close") -> pd.Series:
     return df[field]
 
 
+@indicator(lookback=lambda period, **_: period - 1)
 def sma(df: pd.DataFrame, period: int) -> pd.Series:
     """
     Simple Moving Average (SMA)
     """
-    return df["Close"].rolling(window=period).mean()
+    return _wrap(kernels.rolling_mean(df["Close"], period), df["Close"])
 
 
+@indicator(lookback=lambda period, **_: period - 1,
+           warmup=lambda period, **_: period)        # erste Differenz fehlt (0 statt NaN)
 def rsi(df: pd.DataFrame, period: int) -> pd.Series:
     """
     Relative Strength Index (RSI)
     """
-    delta = df["Close"].diff()
-    gain  = delta.where(delta > 0, 0.0)
-    loss  = -delta.where(delta < 0, 0.0)
-    avg_gain = gain.rolling(window=period).mean()
-    avg_loss = loss.rolling(window=period).mean()
-    rs = avg_gain / avg_loss
-    return 100 - (100 / (1 + rs))
+    delta = kernels.diff(df["Close"])
+    gain  = np.where(delta > 0, delta, 0.0)
+    loss  = np.where(delta < 0, -delta, 0.0)
+    avg_gain = kernels.rolling_mean(gain, period)
+    avg_loss = kernels.rolling_mean(loss, period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        return _wrap(100 - (100 / (1 + rs)), df["Close"])
 
 
+@indicator(warmup=lambda period, **_: _ema_warmup(period))
 def ema(df: pd.DataFrame, period: int) -> pd.Series:
     """
     Exponential Moving Average (EMA)
@@ -43,6 +78,7 @@ def ema(df: pd.DataFrame, period: int) -> pd.Series:
     return df["Close"].ewm(span=period, adjust=False).mean()
 
 
+@indicator(warmup=lambda fast, slow, signal, **_: _ema_warmup(max(fast, slow)) + _ema_warmup(signal))
 def macd(df: pd.DataFrame,
          fast: int = 12,
          slow: int = 26,
@@ -63,6 +99,7 @@ def macd(df: pd.DataFrame,
     }
 
 
+@indicator(lookback=lambda period, **_: period - 1)
 def bollinger_bands(df: pd.DataFrame,
                     period: int = 20,
                     std_dev: float = 2.0) -> dict:
@@ -70,39 +107,38 @@ def bollinger_bands(df: pd.DataFrame,
     Bollinger-Bänder
     Gibt dict mit keys: 'upper', 'middle', 'lower'
     """
-    mid   = df["Close"].rolling(window=period).mean()
-    sd    = df["Close"].rolling(window=period).std()
+    mid, sd = kernels.rolling_mean_std(df["Close"], period)   # ein Durchlauf
     upper = mid + std_dev * sd
     lower = mid - std_dev * sd
     return {
-        "upper":  upper,
-        "middle": mid,
-        "lower":  lower
+        "upper":  _wrap(upper, df["Close"]),
+        "middle": _wrap(mid, df["Close"]),
+        "lower":  _wrap(lower, df["Close"])
     }
 
 
+@indicator(lookback=lambda period, **_: period - 1,
+           warmup=lambda period, **_: period)        # erste True Range ohne Vorschlusskurs
 def atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
     """
     Average True Range (ATR)
     """
-    high_low = df["High"] - df["Low"]
-    high_close = (df["High"] - df["Close"].shift()).abs()
-    low_close  = (df["Low"]  - df["Close"].shift()).abs()
-    true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    return true_range.rolling(window=period).mean()
+    return _wrap(kernels.rolling_mean(_true_range(df), period), df["Close"])
 
 
+@indicator(lookback=lambda period, **_: period - 1)
 def cci(df: pd.DataFrame, period: int = 20) -> pd.Series:
     """
     Commodity Channel Index (CCI)
     """
-    tp     = (df["High"] + df["Low"] + df["Close"]) / 3
-    sma_tp = tp.rolling(window=period).mean()
-    mad    = tp.rolling(window=period) \
-               .apply(lambda x: np.fabs(x - x.mean()).mean(), raw=True)
-    return (tp - sma_tp) / (0.015 * mad)
+    tp     = kernels.as_float((df["High"] + df["Low"] + df["Close"]) / 3)
+    sma_tp = kernels.rolling_mean(tp, period)
+    mad    = kernels.rolling_mad(tp, period, mean=sma_tp)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _wrap((tp - sma_tp) / (0.015 * mad), df["Close"])
 
 
+@indicator(lookback=lambda k_period, d_period, **_: k_period + d_period - 2)
 def stochastic_oscillator(df: pd.DataFrame,
                           k_period: int = 14,
                           d_period: int = 3) -> dict:
@@ -110,16 +146,18 @@ def stochastic_oscillator(df: pd.DataFrame,
     Stochastischer Oszillator
     Gibt dict mit keys: 'percent_k', 'percent_d'
     """
-    low_min  = df["Low"].rolling(window=k_period).min()
-    high_max = df["High"].rolling(window=k_period).max()
-    percent_k = 100 * ((df["Close"] - low_min) / (high_max - low_min))
-    percent_d = percent_k.rolling(window=d_period).mean()
+    low_min  = kernels.rolling_min(df["Low"], k_period)
+    high_max = kernels.rolling_max(df["High"], k_period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent_k = 100 * ((kernels.as_float(df["Close"]) - low_min) / (high_max - low_min))
+    percent_d = kernels.rolling_mean(percent_k, d_period)
     return {
-        "percent_k": percent_k,
-        "percent_d": percent_d
+        "percent_k": _wrap(percent_k, df["Close"]),
+        "percent_d": _wrap(percent_d, df["Close"])
     }
 
 
+@indicator              # kumulativ: das Niveau hängt immer vom Beginn der Historie ab
 def obv(df: pd.DataFrame) -> pd.Series:
     """
     On-Balance Volume (OBV)
@@ -128,23 +166,22 @@ def obv(df: pd.DataFrame) -> pd.Series:
     return (direction * df["Volume"]).cumsum()
 
 
+@indicator(lookback=lambda period, **_: 2 * period - 2,
+           warmup=lambda period, **_: 2 * period - 1)
 def adx(df: pd.DataFrame, period: int = 14) -> pd.Series:
     """
     Average Directional Index (ADX)
     """
-    up = df["High"].diff()
-    dn = df["Low"].shift() - df["Low"]
-    plus_dm  = up.where((up > dn) & (up > 0), 0.0)
-    minus_dm = dn.where((dn > up) & (dn > 0), 0.0)
+    up = kernels.diff(df["High"])
+    dn = -kernels.diff(df["Low"])
+    plus_dm  = np.where((up > dn) & (up > 0), up, 0.0)
+    minus_dm = np.where((dn > up) & (dn > 0), dn, 0.0)
 
-    high_low   = df["High"] - df["Low"]
-    high_close = (df["High"] - df["Close"].shift()).abs()
-    low_close  = (df["Low"]  - df["Close"].shift()).abs()
-    true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    atr_series = true_range.rolling(window=period).mean()
+    atr_values = kernels.rolling_mean(_true_range(df), period)
 
-    plus_di  = 100 * (plus_dm.rolling(window=period).mean()  / atr_series)
-    minus_di = 100 * (minus_dm.rolling(window=period).mean() / atr_series)
-    dx = (np.abs(plus_di - minus_di) / (plus_di + minus_di)) * 100
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di  = 100 * (kernels.rolling_mean(plus_dm, period)  / atr_values)
+        minus_di = 100 * (kernels.rolling_mean(minus_dm, period) / atr_values)
+        dx = (np.abs(plus_di - minus_di) / (plus_di + minus_di)) * 100
 
-    return dx.rolling(window=period).mean()
+    return _wrap(kernels.rolling_mean(dx, period), df["Close"])
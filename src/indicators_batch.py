@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Gebündelte Indikatoren für Parameter-Sweeps.
+Jede Funktion nimmt eine Liste von Parameterwerten und liefert ein 2D-Array
+(Bars × Varianten); Spalte j gehört zu params[j]. Gemeinsame Zwischenschritte
+(Konvertierungen, Close-Differenzen, Gewinne/Verluste, True Range, typischer Preis,
+Directional Movement, EMAs gleicher Spanne) werden nur einmal berechnet, Fenstersummen
+aller Perioden kommen aus einer kumulierten Summe (kernels.rolling_sums).
+
+Multi-Output-Indikatoren liefern ein dict mit 2D-Arrays (gleiche Keys wie indicators.py).
+variants() übersetzt zurück in das Format der Einzelindikatoren – so nutzt der Optimierer
+die Batches für alle Kandidaten einer Runde (optimizer.precompute_indicators).
+Die Werte stimmen mit den Einzelindikatoren bis auf Rundung (~1e-12 relativ) überein.
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+import kernels
+from indicators import _true_range
+
+
+def _stack(columns, n):
+    return np.column_stack(columns) if columns else np.empty((n, 0))
+
+
+def sma_batch(df: pd.DataFrame, periods: list) -> np.ndarray:
+    close = kernels.as_float(df["Close"])
+    sums = kernels.rolling_sums(close, periods, centered=True)
+    return _stack([s / p for s, p in zip(sums, periods)], len(close))
+
+
+def _ema(close, span):
+    return close.ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def ema_batch(df: pd.DataFrame, periods: list) -> np.ndarray:
+    close = df["Close"].astype(np.float64)
+    return _stack([_ema(close, p) for p in periods], len(close))
+
+
+def rsi_batch(df: pd.DataFrame, periods: list) -> np.ndarray:
+    """Gewinne/Verluste aus Close.diff() einmal, Fenstersummen aller Perioden aus je einer cumsum."""
+    delta = kernels.diff(df["Close"])
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+
+    columns = []
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for p, gains, losses in zip(periods, kernels.rolling_sums(gain, periods), kernels.rolling_sums(loss, periods)):
+            rs = (gains / p) / (losses / p)
+            columns.append(100 - (100 / (1 + rs)))
+    return _stack(columns, len(delta))
+
+
+def macd_batch(df: pd.DataFrame, params: list) -> dict:
+    """
+    params: Liste von (fast, slow, signal). Jede EMA-Spanne des Close wird nur einmal berechnet,
+    die Signallinie einmal pro (fast, slow, signal).
+    """
+    close = df["Close"].astype(np.float64)
+    spans = {span: _ema(close, span) for span in dict.fromkeys(s for fast, slow, _ in params for s in (fast, slow))}
+
+    macd_lines, signals, hists = [], [], []
+    for fast, slow, signal in params:
+        line = spans[fast] - spans[slow]
+        signal_line = pd.Series(line).ewm(span=signal, adjust=False).mean().to_numpy()
+        macd_lines.append(line)
+        signals.append(signal_line)
+        hists.append(line - signal_line)
+    n = len(close)
+    return {
+        "macd":      _stack(macd_lines, n),
+        "signal":    _stack(signals, n),
+        "histogram": _stack(hists, n),
+    }
+
+
+def bollinger_bands_batch(df: pd.DataFrame, periods: list, std_devs: list) -> dict:
+    """
+    Raster period × std_dev; Spaltenreihenfolge = itertools.product(periods, std_devs).
+    Mittel/Std pro Periode aus zwei cumsums, die Bänder pro std_dev per Broadcast.
+    """
+    y, ref = kernels.center(df["Close"])
+    factors = np.asarray(std_devs, dtype=np.float64)
+
+    upper, middle, lower = [], [], []
+    for p, s1, s2 in zip(periods, kernels.rolling_sums(y, periods), kernels.rolling_sums(y * y, periods)):
+        mid, sd = kernels.mean_std_from_sums(s1, s2, ref, p)
+        upper.append(mid[:, None] + factors * sd[:, None])
+        middle.append(np.repeat(mid[:, None], len(factors), axis=1))
+        lower.append(mid[:, None] - factors * sd[:, None])
+
+    n = len(y)
+    return {
+        "upper":  np.hstack(upper) if upper else np.empty((n, 0)),
+        "middle": np.hstack(middle) if middle else np.empty((n, 0)),
+        "lower":  np.hstack(lower) if lower else np.empty((n, 0)),
+    }
+
+
+def atr_batch(df: pd.DataFrame, periods: list) -> np.ndarray:
+    true_range = _true_range(df)
+    sums = kernels.rolling_sums(true_range, periods)
+    return _stack([s / p for s, p in zip(sums, periods)], len(true_range))
+
+
+def adx_batch(df: pd.DataFrame, periods: list) -> np.ndarray:
+    """Directional Movement und True Range einmal, deren Fenstersummen aus je einer cumsum."""
+    up = kernels.diff(df["High"])
+    dn = -kernels.diff(df["Low"])
+    plus_dm = np.where((up > dn) & (up > 0), up, 0.0)
+    minus_dm = np.where((dn > up) & (dn > 0), dn, 0.0)
+    true_range = _true_range(df)
+
+    columns = []
+    sums = zip(periods, kernels.rolling_sums(true_range, periods),
+               kernels.rolling_sums(plus_dm, periods), kernels.rolling_sums(minus_dm, periods))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for p, tr_sum, plus_sum, minus_sum in sums:
+            atr_values = tr_sum / p
+            plus_di = 100 * ((plus_sum / p) / atr_values)
+            minus_di = 100 * ((minus_sum / p) / atr_values)
+            dx = (np.abs(plus_di - minus_di) / (plus_di + minus_di)) * 100
+            columns.append(kernels.rolling_mean(dx, p))
+    return _stack(columns, len(true_range))
+
+
+def cci_batch(df: pd.DataFrame, periods: list) -> np.ndarray:
+    tp = kernels.as_float((df["High"] + df["Low"] + df["Close"]) / 3)
+    columns = []
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for p, tp_sum in zip(periods, kernels.rolling_sums(tp, periods, centered=True)):
+            sma_tp = tp_sum / p
+            columns.append((tp - sma_tp) / (0.015 * kernels.rolling_mad(tp, p, mean=sma_tp)))
+    return _stack(columns, len(tp))
+
+
+def stochastic_oscillator_batch(df: pd.DataFrame, k_periods: list, d_period: int = 3) -> dict:
+    close = kernels.as_float(df["Close"])
+    low = kernels.as_float(df["Low"])
+    high = kernels.as_float(df["High"])
+    percent_k, percent_d = [], []
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for k in k_periods:
+            low_min = kernels.rolling_min(low, k)
+            high_max = kernels.rolling_max(high, k)
+            pk = 100 * ((close - low_min) / (high_max - low_min))
+            percent_k.append(pk)
+            percent_d.append(kernels.rolling_mean(pk, d_period))
+    return {
+        "percent_k": _stack(percent_k, len(close)),
+        "percent_d": _stack(percent_d, len(close)),
+    }
+
+
+# Indikatoren mit genau einem Perioden-Parameter
+_PERIOD_BATCHES = {"sma": sma_batch, "ema": ema_batch, "rsi": rsi_batch, "atr": atr_batch,
+                   "adx": adx_batch, "cci": cci_batch}
+
+
+def variants(df, name, param_sets):
+    """
+    Alle Varianten eines Indikators in einem Aufruf.
+    param_sets: Liste vollständiger Parameter-dicts (inkl. Defaults)
+    Rückgabe: Liste wie indicators.<name>(df, **params) – Series bzw. dict von Series –
+              oder None, wenn es keine Batch-Variante gibt.
+    """
+    def series(values):
+        return pd.Series(values, index=df.index)
+
+    def split(result, columns):
+        return [{key: series(values[:, j]) for key, values in result.items()} for j in columns]
+
+    if name in _PERIOD_BATCHES:
+        values = _PERIOD_BATCHES[name](df, [params["period"] for params in param_sets])
+        return [series(values[:, j]) for j in range(len(param_sets))]
+
+    if name == "macd":
+        result = macd_batch(df, [(p["fast"], p["slow"], p["signal"]) for p in param_sets])
+        return split(result, range(len(param_sets)))
+
+    if name == "bollinger_bands":
+        periods = list(dict.fromkeys(p["period"] for p in param_sets))
+        std_devs = list(dict.fromkeys(p["std_dev"] for p in param_sets))
+        grid = {key: j for j, key in enumerate(itertools.product(periods, std_devs))}
+        result = bollinger_bands_batch(df, periods, std_devs)
+        return split(result, [grid[(p["period"], p["std_dev"])] for p in param_sets])
+
+    if name == "stochastic_oscillator":
+        out = [None] * len(param_sets)
+        for d_period in dict.fromkeys(p["d_period"] for p in param_sets):
+            members = [i for i, p in enumerate(param_sets) if p["d_period"] == d_period]
+            result = stochastic_oscillator_batch(df, [param_sets[i]["k_period"] for i in members], d_period)
+            for i, value in zip(members, split(result, range(len(members)))):
+                out[i] = value
+        return out
+
+    return None
+
+
+def batch_frame(values, df, name, params):
+    """2D-Batch-Ergebnis als DataFrame mit Spalten wie '<name>_<param>' (z. B. für Sweeps/Plots)."""
+    columns = [f"{name}_{'_'.join(map(str, p)) if isinstance(p, tuple) else p}" for p in params]
+    return pd.DataFrame(values, index=df.index, columns=columns)
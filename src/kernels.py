@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Rolling-Window-Kernels auf rohen NumPy-Arrays (1D oder 2D, Fenster entlang Achse 0).
+
+- Summe/Mittelwert/Min/Max: Block-Prefix/Suffix-Scans (van Herk/Gil-Werman),
+  O(n) unabhängig von der Fensterlänge und numerisch lokal (keine globale cumsum-Drift)
+- Varianz/Std: aus Summe und Quadratsumme eines zentrierten Signals, ein Durchlauf
+- rolling_sums: viele Fensterlängen aus einer kumulierten Summe (Batch-Sweeps, indicators_batch)
+- MAD: nicht exakt per cumsum/Deque lösbar → vektorisiert über Sliding-Window-Views
+  in Blöcken (O(n·p), aber ohne Python-Overhead pro Fenster)
+
+Semantik wie pandas rolling(window) mit min_periods=window:
+die ersten window-1 Werte und jedes Fenster mit NaN ergeben NaN.
+"""
+
+import warnings
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def as_float(x):
+    return np.asarray(x, dtype=np.float64)
+
+
+def _windowed_scan(x, window, op, identity):
+    """
+    Ergebnis für jedes vollständige Fenster über Prefix-Scan (Blockanfang → e)
+    und Suffix-Scan (s → Blockende) mit Blockgröße = Fensterlänge.
+    """
+    x = as_float(x)
+    n = x.shape[0]
+    out = np.full(x.shape, np.nan)
+    if window < 1 or n < window:
+        return out
+
+    n_blocks = -(-n // window)
+    pad = n_blocks * window - n
+    padded = np.concatenate([x, np.full((pad,) + x.shape[1:], identity)]) if pad else x
+    blocks = padded.reshape((n_blocks, window) + x.shape[1:])
+
+    prefix = op.accumulate(blocks, axis=1).reshape(padded.shape)
+    suffix = op.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(padded.shape)
+
+    starts = np.arange(n - window + 1)
+    ends = starts + window - 1
+    # Fenster exakt auf einem Block → nur Suffix (sonst würde die Summe doppelt zählen)
+    aligned = (starts % window == 0).reshape((-1,) + (1,) * (x.ndim - 1))
+    out[window - 1:] = np.where(aligned, suffix[starts], op(suffix[starts], prefix[ends]))
+    return out
+
+
+def rolling_sum(x, window):
+    return _windowed_scan(x, window, np.add, 0.0)
+
+
+def rolling_mean(x, window):
+    return rolling_sum(x, window) / window
+
+
+def rolling_max(x, window):
+    return _windowed_scan(x, window, np.maximum, -np.inf)
+
+
+def rolling_min(x, window):
+    return _windowed_scan(x, window, np.minimum, np.inf)
+
+
+def rolling_sums(x, windows, centered=False):
+    """
+    Fenstersummen für mehrere Fensterlängen aus einer kumulierten Summe → Liste (eine pro Fenster).
+    Anders als rolling_sum nicht block-lokal: die Abweichung zum Einzellauf liegt im Bereich der
+    Rundung der kumulierten Summe; centered=True hält sie bei Kursen klein. Nicht-negative Signale
+    (Gewinne, True Range) bleiben unzentriert – Fenster nur aus Nullen ergeben dann exakt 0.
+    """
+    x = as_float(x)
+    ref = 0.0
+    if centered:
+        x, ref = center(x)
+    n = x.shape[0]
+    missing = np.isnan(x)
+    zeros = np.zeros((1,) + x.shape[1:])
+    total = np.concatenate([zeros, np.cumsum(np.where(missing, 0.0, x), axis=0)])
+    count = np.concatenate([zeros, np.cumsum(missing, axis=0)])
+
+    sums = []
+    for window in windows:
+        out = np.full(x.shape, np.nan)
+        if 1 <= window <= n:
+            window_sum = total[window:] - total[:-window] + window * ref
+            out[window - 1:] = np.where(count[window:] - count[:-window] > 0, np.nan, window_sum)
+        sums.append(out)
+    return sums
+
+
+def center(x):
+    """
+    Zentriert das Signal um seinen Mittelwert → (y, ref).
+    Verhindert Auslöschung in Σx² − (Σx)²/n bei Kursen um 1.1 und Varianzen um 1e-6.
+    """
+    x = as_float(x)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)   # Spalten nur aus NaN
+        ref = np.nan_to_num(np.nanmean(x, axis=0))
+    return x - ref, ref
+
+
+def mean_std_from_sums(s1, s2, ref, window, ddof=1):
+    """Mittelwert/Std aus Fenstersummen des zentrierten Signals (s1 = Σy, s2 = Σy²)."""
+    mean = s1 / window + ref
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = (s2 - s1 * s1 / window) / (window - ddof)
+    var = np.where(var < 0, 0.0, var)   # Rundungsreste bei konstanten Fenstern
+    return mean, np.sqrt(var)
+
+
+def rolling_mean_std(x, window, ddof=1):
+    """Mittelwert und Standardabweichung in einem Durchlauf."""
+    y, ref = center(x)
+    return mean_std_from_sums(rolling_sum(y, window), rolling_sum(y * y, window), ref, window, ddof)
+
+
+def rolling_std(x, window, ddof=1):
+    return rolling_mean_std(x, window, ddof)[1]
+
+
+def rolling_mad(x, window, mean=None, max_bytes=32 * 1024 ** 2):
+    """
+    Mittlere absolute Abweichung vom Fenstermittel (wie CCI sie braucht).
+    Optional mit vorberechnetem rolling_mean, Verarbeitung blockweise (max_bytes).
+    """
+    x = as_float(x)
+    n = x.shape[0]
+    out = np.full(x.shape, np.nan)
+    if window < 1 or n < window:
+        return out
+
+    if mean is None:
+        mean = rolling_mean(x, window)
+    windows = sliding_window_view(x, window, axis=0)          # (n-w+1, [cols], w)
+    row_bytes = window * 8 * (x.shape[1] if x.ndim > 1 else 1)
+    chunk = max(1, max_bytes // row_bytes)
+
+    for i in range(0, windows.shape[0], chunk):
+        block = windows[i:i + chunk]
+        m = mean[window - 1 + i: window - 1 + i + block.shape[0]]
+        out[window - 1 + i: window - 1 + i + block.shape[0]] = np.abs(block - m[..., None]).mean(axis=-1)
+    return out
+
+
+def shift(x, periods=1):
+    x = as_float(x)
+    out = np.full(x.shape, np.nan)
+    if periods < x.shape[0]:
+        out[periods:] = x[:-periods]
+    return out
+
+
+def diff(x):
+    return as_float(x) - shift(x)
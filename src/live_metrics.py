@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+Metriken für den Live-Zyklus.
+- Histogramme pro Phase (fetch, indicators, evaluate, order, cycle) mit festen Buckets
+- Zähler (cycles, signals, entries_rejected, errors, overruns, ...)
+- Prometheus-Textformat über einen lokalen HTTP-Endpunkt (/metrics)
+- rotierendes JSON-Log mit einer Zeile pro Zyklus
+- mehrere LiveTrader (FeedHub) teilen sich Endpunkt und Log: serve_metrics() führt die
+  Reihen zusammen, getrennt über die Labels (symbol, magic, strategy)
+
+Kosten pro Messung: ein perf_counter-Paar, eine Bucket-Suche (bisect) und ein Lock.
+"""
+
+import bisect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging.handlers import RotatingFileHandler
+
+# Sekunden: 1 ms … 2 min (Bar-Intervalle ab M1 werden so noch aufgelöst)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _escape(value):
+    """Label-Wert im Prometheus-Textformat (z. B. Strategienamen mit Anführungszeichen)."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """Bucket-Zähler wie Prometheus (Ausgabe kumulativ, intern pro Bucket)."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)   # letzter = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Näherung: obere Bucket-Grenze, in der das q-Quantil liegt."""
+        if not self.count:
+            return None
+        target = q * self.count
+        running = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            running += n
+            if running >= target:
+                return bound
+        return float("inf")
+
+
+class LiveMetrics:
+    """
+    Sammelt Phasenzeiten und Zähler eines LiveTraders.
+    Mit serve() als Prometheus-Endpunkt, mit log_to() als rotierendes JSON-Log.
+    """
+
+    def __init__(self, prefix="backtester_live", buckets=DEFAULT_BUCKETS, labels=None):
+        self.prefix = prefix
+        self.buckets = buckets
+        self.labels = labels or {}
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self._current = {}             # Phasenzeiten des laufenden Zyklus
+        self._lock = threading.Lock()
+        self._server = None
+        self._log = None
+
+    # ---------------------------------------------------------------- Erfassen
+
+    def observe(self, name, seconds):
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = Histogram(self.buckets)
+            hist.observe(seconds)
+            self._current[name] = self._current.get(name, 0.0) + seconds
+
+    def inc(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    @contextmanager
+    def cycle(self, interval=None):
+        """
+        Umschließt einen run_once-Durchlauf: Zyklusdauer, Überläufe (> interval),
+        Fehlerzähler und eine JSON-Logzeile mit den Phasenzeiten dieses Zyklus.
+        """
+        with self._lock:
+            self._current = {}
+        self.inc("cycles")
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = e
+            self.inc("errors")
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            self.observe("cycle", duration)
+            if interval and duration > interval:
+                self.inc("overruns")
+            self.set_gauge("last_cycle_timestamp", time.time())
+            if self._log:
+                self._write_log(duration, error)
+
+    # ----------------------------------------------------------------- Export
+
+    def _label_str(self, extra=None):
+        labels = dict(self.labels, **(extra or {}))
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+    def families(self):
+        """Metrik-Name → (Typ, Zeilen dieser Instanz) – Grundlage für render_prometheus."""
+        with self._lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            histograms = {name: (h.buckets, list(h.counts), h.sum, h.count) for name, h in self.histograms.items()}
+
+        families = {}
+        for name, value in sorted(counters.items()):
+            metric = f"{self.prefix}_{name}_total"
+            families[metric] = ("counter", [f"{metric}{self._label_str()} {value}"])
+        for name, value in sorted(gauges.items()):
+            metric = f"{self.prefix}_{name}"
+            families[metric] = ("gauge", [f"{metric}{self._label_str()} {value}"])
+        for name, (buckets, counts, total, count) in sorted(histograms.items()):
+            metric = f"{self.prefix}_{name}_seconds"
+            lines = []
+            running = 0
+            for bound, n in zip(buckets + (float("inf"),), counts):
+                running += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{metric}_bucket{self._label_str({'le': le})} {running}")
+            lines.append(f"{metric}_sum{self._label_str()} {total}")
+            lines.append(f"{metric}_count{self._label_str()} {count}")
+            families[metric] = ("histogram", lines)
+        return families
+
+    def render_prometheus(self):
+        """Alle Metriken im Prometheus-Textformat (Version 0.0.4)."""
+        return render_prometheus([self])
+
+    def snapshot(self):
+        """Labels, Zähler, Gauges und Histogramm-Zusammenfassung als dict (für JSON)."""
+        with self._lock:
+            return {
+                "labels": dict(self.labels),
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "histograms": {name: {"count": h.count, "sum": round(h.sum, 6),
+                                      "p50": h.quantile(0.5), "p99": h.quantile(0.99)}
+                               for name, h in self.histograms.items()},
+            }
+
+    def serve(self, port=9108, host="127.0.0.1"):
+        """Startet den HTTP-Endpunkt (/metrics Prometheus, /metrics.json) in einem Daemon-Thread."""
+        self._server = serve_metrics([self], port, host)
+        return self._server
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    # ------------------------------------------------------------------- Log
+
+    def log_to(self, path, max_bytes=10 * 1024 ** 2, backups=5):
+        """Rotierendes JSON-Lines-Log (eine Zeile pro Zyklus)."""
+        logger = logging.getLogger(f"{self.prefix}.{path}")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        if not logger.handlers:
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+        self._log = logger
+
+    def _write_log(self, duration, error):
+        with self._lock:
+            record = {
+                "time": datetime.utcnow().isoformat(timespec="milliseconds"),
+                "labels": self.labels,
+                "cycle_s": round(duration, 6),
+                "phases_s": {k: round(v, 6) for k, v in self._current.items() if k != "cycle"},
+                "counters": dict(self.counters),
+            }
+        if error is not None:
+            record["error"] = str(error)
+        self._log.info(json.dumps(record, default=str))
+
+
+# ------------------------------------------------------- Mehrere Trader
+
+def render_prometheus(sources):
+    """Prometheus-Text über mehrere LiveMetrics: eine TYPE-Zeile pro Metrik, Reihen aller Quellen darunter."""
+    merged = {}
+    for source in sources:
+        for metric, (kind, lines) in source.families().items():
+            merged.setdefault(metric, (kind, []))[1].extend(lines)
+    out = []
+    for metric, (kind, lines) in sorted(merged.items()):
+        out.append(f"# TYPE {metric} {kind}")
+        out.extend(lines)
+    return "\n".join(out) + "\n"
+
+
+def serve_metrics(sources, port=9108, host="127.0.0.1"):
+    """
+    Ein HTTP-Endpunkt für alle 'sources' (Liste von LiveMetrics) in einem Daemon-Thread:
+    /metrics (Prometheus, Reihen über Labels getrennt), /metrics.json (Liste der Snapshots).
+    Mit nur einer Quelle liefert /metrics.json deren Snapshot direkt.
+    """
+    sources = list(sources)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/metrics.json"):
+                snapshots = [source.snapshot() for source in sources]
+                body = json.dumps(snapshots[0] if len(snapshots) == 1 else snapshots, default=str).encode()
+                content_type = "application/json"
+            elif self.path.startswith("/metrics"):
+                body = render_prometheus(sources).encode()
+                content_type = "text/plain; version=0.0.4"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):   # keine Zugriffslogs auf stderr
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="live-metrics", daemon=True).start()
+    print(f"📈 Metriken unter http://{host}:{server.server_address[1]}/metrics ({len(sources)} Trader)")
+    return server
@@ -1,10 +1,14 @@
 # live_trader.py
 import pandas as pd
 import MetaTrader5 as mt5
-from strategy_core import _resolve_indicator, evaluate_live_row
+from strategy_core import evaluate_live_row
+from strategy_compiler import compile_strategy
 from datetime import datetime, time, timedelta
 import time
 from entry_manager import EntryManager
+from order_pipeline import OrderPipeline
+from live_metrics import LiveMetrics
+from online_stats import OnlineStats
 import json
 
 from market_time_utils import (
@@ -15,12 +19,32 @@ from market_time_utils import (
     get_next_open_timestamp
 )
 
+
+def fetch_rates(symbol, timeframe, count):
+    """Die letzten 'count' Bars von MT5 als DataFrame (Index: Time, Spalten Open/High/…)."""
+    rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
+    if rates is None or len(rates) == 0:
+        raise ValueError("Konnte keine historischen Daten abrufen")
+
+    df = pd.DataFrame(rates)
+    df.columns = [col.capitalize() for col in df.columns]  # Wandelt z. B. 'close' → 'Close'
+    df["Time"] = pd.to_datetime(df["Time"], unit="s")
+    df.set_index("Time", inplace=True)
+    return df
+
  
 class LiveTrader:
-    def __init__(self, strategy, symbol="EURUSD", timeframe=mt5.TIMEFRAME_H1, history_size=250):
+    def __init__(self, strategy, symbol="EURUSD", timeframe=mt5.TIMEFRAME_H1, history_size=None, order_workers=2,
+                 magic=123456):
         self.strategy = strategy
         self.symbol = symbol
         self.timeframe = timeframe
+        self.magic = magic               # trennt die Positionen mehrerer Strategien auf einem Symbol
+        self.compiled = compile_strategy(strategy)
+        self.rule_results = {}
+        # Ohne Angabe genau so viele Bars, wie die Indikatoren der Strategie zum Einschwingen brauchen
+        if history_size is None:
+            history_size = self.compiled.requirements()["bars"]
         self.history_size = history_size
         self.df = pd.DataFrame()
         self.connected = False
@@ -33,8 +57,20 @@ class LiveTrader:
         self.entry_mgr = EntryManager(
             mode="pyramiding",           
             cooldown=15,                 
-            max_open_trades=3            
+            max_open_trades=3,
+            exit_config=strategy.get("exit_config")
         )
+
+        # Orders laufen über Worker-Threads – run_once wartet nicht auf order_send
+        self.orders = OrderPipeline(mt5, workers=order_workers)
+        # magic/strategy trennen die Reihen mehrerer Trader auf einem Symbol (FeedHub)
+        self.metrics = LiveMetrics(labels={"symbol": symbol, "magic": magic,
+                                           "strategy": strategy.get("name", "unbenannt")})
+
+        # Laufende Performance-Statistik (Snapshot überlebt Neustarts)
+        self.stats_path = f"live_stats_{symbol}.json" if magic == 123456 else f"live_stats_{symbol}_{magic}.json"
+        self.stats_interval = 300
+        self.stats = None
         
         self.timeframe_secounds = {
             
@@ -98,50 +134,71 @@ class LiveTrader:
         if account_info is None:
             raise RuntimeError("Keine Verbindung zum MetaTrader-Konto")
         print(f"🔌 Verbunden mit Konto {account_info.login}, Balance: {account_info.balance}")
+
+        self.stats = OnlineStats.load(self.stats_path, start_balance=account_info.balance)
+        if self.stats.count:
+            print(f"📊 Statistik fortgesetzt: {self.stats.count} Trades, Balance {self.stats.balance:.2f}")
     
     
+    def start_metrics(self, port=9108, log_path="live_metrics.jsonl"):
+        """Prometheus-Endpunkt (/metrics) und rotierendes JSON-Log für die Zyklus-Metriken."""
+        if port is not None:
+            self.metrics.serve(port)
+        if log_path:
+            self.metrics.log_to(log_path)
+
+
     def get_active_positions(self):
         positions = mt5.positions_get(symbol=self.symbol)
         if positions is None:
             return []
-        return list(positions)
+        return [pos for pos in positions if pos.magic == self.magic]
 
     
 
     def fetch_data(self):
-        rates = mt5.copy_rates_from_pos(self.symbol, self.timeframe, 0, self.history_size)
-        if rates is None or len(rates) == 0:
-            raise ValueError("Konnte keine historischen Daten abrufen")
-
-        df = pd.DataFrame(rates)
-        df.columns = [col.capitalize() for col in df.columns]  # Wandelt z. B. 'close' → 'Close'
-        df["Time"] = pd.to_datetime(df["Time"], unit="s")
-        df.set_index("Time", inplace=True)
-        self.df = df
+        self.df = fetch_rates(self.symbol, self.timeframe, self.history_size)
         
 
     def compute_indicators(self):
-        for rule in self.strategy["rules"]:
-            for side in ["left", "right"]:
-                spec = rule.get(side)
-                
-                if isinstance(spec, dict):
-                    _resolve_indicator(self.df, spec)
+        """Regeln über den kompilierten DAG – gleiche Indikatoren nur einmal, Spalten landen in self.df."""
+        self.rule_results = self.compiled.evaluate(self.df)
 
 
     def evaluate_signal(self):
-        return evaluate_live_row(self.df, self.strategy["rules"], self.strategy["entry_logic"])
+        return evaluate_live_row(self.df, self.strategy["rules"], self.strategy["entry_logic"],
+                                 rule_results=self.rule_results)
 
 
-    def place_order(self, signal_info):
+    @staticmethod
+    def _position_view(pos):
+        """MT5-Position → Trade-Dict wie im Backtest (SL/TP in Punkten, fehlende Marke nie erreicht)."""
+        return {
+            "type": "buy" if pos.type == mt5.POSITION_TYPE_BUY else "sell",
+            "entry_price": pos.price_open,
+            "sl": abs(pos.price_open - pos.sl) * 100000 if pos.sl else float("inf"),
+            "tp": abs(pos.tp - pos.price_open) * 100000 if pos.tp else float("inf"),
+        }
+
+
+    def _tick_prices(self):
+        """Ein Tick-Abruf für Bid und Ask."""
+        tick = mt5.symbol_info_tick(self.symbol)
+        if tick is None:
+            raise ValueError(f"Kein Tick für {self.symbol}")
+        return tick.bid, tick.ask
+
+
+    def place_order(self, signal_info, signal_time=None):
         signal = signal_info["signal"]
         sl = signal_info.get("sl")
         tp = signal_info.get("tp")
 
         # Preise und Orderrichtung
-        price = mt5.symbol_info_tick(self.symbol).ask if signal == "buy" else mt5.symbol_info_tick(self.symbol).bid
+        bid, ask = self._tick_prices()
+        price = ask if signal == "buy" else bid
         order_type = mt5.ORDER_TYPE_BUY if signal == "buy" else mt5.ORDER_TYPE_SELL
-        volume = 0.1  # z. B. 0.1 Lot
+        volume = 0.1  # z. B. 0.1 Lot
 
         # SL/TP Berechnung (in Punkten)
         sl_price = price - sl / 100000 if signal == "buy" else price + sl / 100000
@@ -156,24 +213,30 @@ class LiveTrader:
             "sl": round(sl_price, 5),
             "tp": round(tp_price, 5),
             "deviation": 10,
-            "magic": 123456,
+            "magic": self.magic,
             "comment": f"{signal.upper()} via LiveTrader",
             "type_time": mt5.ORDER_TIME_GTC,
             "type_filling": mt5.ORDER_FILLING_IOC
         }
 
-        result = mt5.order_send(request)
-        if result.retcode != mt5.TRADE_RETCODE_DONE:
-            print(f"⚠️ Orderfehler: {result.retcode}, Kommentar: {result.comment}")
-        else:
-            print(f"✅ {signal.upper()} Order platziert @ {price}")
-            self.position_id = result.order
-            self.last_signal = signal
+        def on_done(ticket):
+            result = ticket.result
+            if ticket.status != "done":
+                print(f"⚠️ Orderfehler: {ticket.retcode}, Kommentar: {getattr(result, 'comment', ticket.status)}")
+            else:
+                print(f"✅ {signal.upper()} Order platziert @ {ticket.request['price']} "
+                      f"({ticket.attempts} Versuch(e), Signal→Fill {ticket.latency('signal_to_fill') * 1000:.1f} ms)")
+                self.position_id = result.order
+                self.last_signal = signal
+            self._record_order(ticket)
+
+        return self.orders.submit(request, kind="open", signal_time=signal_time, on_done=on_done)
         
         
-    def close_position(self, position):
+    def close_position(self, position, signal_time=None):
         opposite_type = mt5.ORDER_TYPE_SELL if position.type == mt5.POSITION_TYPE_BUY else mt5.ORDER_TYPE_BUY
-        price = mt5.symbol_info_tick(self.symbol).bid if opposite_type == mt5.ORDER_TYPE_SELL else mt5.symbol_info_tick(self.symbol).ask
+        bid, ask = self._tick_prices()
+        price = bid if opposite_type == mt5.ORDER_TYPE_SELL else ask
     
         close_request = {
             "action": mt5.TRADE_ACTION_DEAL,
@@ -188,40 +251,107 @@ class LiveTrader:
             "type_time": mt5.ORDER_TIME_GTC,
             "type_filling": mt5.ORDER_FILLING_IOC
         }
-    
-        result = mt5.order_send(close_request)
-        if result.retcode != mt5.TRADE_RETCODE_DONE:
-            print(f"❌ Schließen fehlgeschlagen für Position {position.ticket}: {result.retcode}")
-        else:
-            print(f"✅ Position {position.ticket} geschlossen @ {price}")
+
+        def on_done(ticket):
+            if ticket.status != "done":
+                print(f"❌ Schließen fehlgeschlagen für Position {position.ticket}: {ticket.retcode}")
+            else:
+                print(f"✅ Position {position.ticket} geschlossen @ {ticket.request['price']}")
+            self._record_order(ticket)
+
+        return self.orders.submit(close_request, kind="close", signal_time=signal_time, on_done=on_done)
+
+
+    def update_stats(self):
+        """
+        Verbucht neu geschlossene Deals dieses Symbols (O(1) je Deal) und speichert
+        periodisch einen Snapshot. Bereits verbuchte Deals werden über die Ticketnummer übersprungen.
+        """
+        if self.stats is None:
+            return
+        # Ab der letzten Abfrage (oder 7 Tage zurück) – nie die ganze Historie
+        since, until = self.stats.deal_window()
+        deals = mt5.history_deals_get(since, until) or ()
+        closing = {mt5.DEAL_ENTRY_OUT, getattr(mt5, "DEAL_ENTRY_OUT_BY", mt5.DEAL_ENTRY_OUT)}
+        for deal in sorted(deals, key=lambda d: d.ticket):
+            if deal.symbol != self.symbol or deal.magic != self.magic or deal.entry not in closing or deal.ticket <= self.stats.last_deal_ticket:
+                continue
+            self.stats.update(deal.profit + deal.commission + deal.swap, deal_ticket=deal.ticket)
+            self.metrics.inc("positions_closed")
+
+        self.metrics.set_gauge("balance", self.stats.balance)
+        self.metrics.set_gauge("drawdown_pct", self.stats.drawdown_pct)
+        self.stats.maybe_save(self.stats_path, self.stats_interval)
+
+
+    def _record_order(self, ticket):
+        self.metrics.inc(f"orders_{ticket.status}")
+        if ticket.status == "done":
+            self.metrics.observe("order_signal_to_fill", ticket.latency("signal_to_fill"))
+            self.metrics.observe("order_submit_to_ack", ticket.latency("submit_to_ack"))
 
 
     def run_once(self):
+        with self.metrics.cycle(interval=self.timeframe_secounds.get(self.timeframe)):
+            self._run_cycle()
+
+
+    def on_feed(self, df, rule_results):
+        """Ein Zyklus mit Daten und Regeln vom FeedHub (kein eigener Abruf, keine eigenen Indikatoren)."""
+        with self.metrics.cycle(interval=self.timeframe_secounds.get(self.timeframe)):
+            self.process_bar(df, rule_results)
+
+
+    def _run_cycle(self):
         if not self.is_market_tradable():
             print("⛔ Markt geschlossen – Warte auf Öffnung...")
             return
     
-        self.fetch_data()
+        with self.metrics.phase("fetch"):
+            self.fetch_data()
+
+        self.process_bar()
+
+
+    def process_bar(self, df=None, rule_results=None):
+        """
+        Statistik, Regeln, Signal und Orders für die aktuelle Bar.
+        df/rule_results: bereits abgerufen bzw. ausgewertet (FeedHub) – sonst aus self.df berechnet.
+        """
+        if df is not None:
+            self.df = df
+
+        with self.metrics.phase("stats"):
+            self.update_stats()
         
         if self.df.empty or "Close" not in self.df.columns:          
             print("⚠️ Ungültige oder leere Marktdaten")
             return
         
-        self.compute_indicators()
+        with self.metrics.phase("indicators"):
+            if rule_results is None:
+                self.compute_indicators()
+            else:
+                self.rule_results = rule_results
         
         
-        signal_info = self.evaluate_signal()
+        with self.metrics.phase("evaluate"):
+            signal_info = self.evaluate_signal()
+        signal_time = time.perf_counter()
         if signal_info:
+            self.metrics.inc("signals")
             
             active_positions = self.get_active_positions()
             now = datetime.utcnow()
             
             if not self.entry_mgr.allow_entry(now, signal_info["signal"], active_positions):
                 print(f"🚫 Entry abgelehnt laut EntryManager ({signal_info['signal']})")
+                self.metrics.inc("entries_rejected")
                 return
 
 
-            self.place_order(signal_info)
+            with self.metrics.phase("order"):
+                self.place_order(signal_info, signal_time=signal_time)
             self.entry_mgr.register_trade({
                 "type": signal_info["signal"],
                 "entry_time": now,
@@ -229,16 +359,19 @@ class LiveTrader:
             })
 
 
+            bid, ask = self._tick_prices()
             for pos in active_positions:
+                view = self._position_view(pos)
                 if self.entry_mgr.should_exit(
-                    position=pos,
+                    position=view,
                     current_signal=signal_info["signal"],                   # zum Vergleich
-                    exit_logic=self.strategy.get("exit_logic"),             # optional
-                    rule_results=self.rule_results                          # nur nötig für exit_logic2
+                    rule_results=self.rule_results,                         # für Exit-Logik
+                    price=bid if view["type"] == "buy" else ask,
+                    time=self.df.index[-1]
                 ):
-                    self.close_position(pos)
-                    pos["exit_time"] = now
-                    print(f"🚪 Position {pos['type']} geschlossen (Exit-Kriterium erfüllt)")
+                    with self.metrics.phase("order"):
+                        self.close_position(pos, signal_time=signal_time)
+                    print(f"🚪 Position {view['type']} geschlossen ({view['exit_reason']})")
 
         else:
             print("🧘 Kein aktives Signal – abwarten...")
@@ -4,26 +4,116 @@ Created on Sun Jun 29 14:46:22 2025
 
 @author: hjzfuz
 """
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
+from compact_dtypes import compact_ohlc
+
+CSV_COLUMNS = ["Date", "Time", "Open", "High", "Low", "Close", "TickVol", "Vol", "Spread"]
+OHLC_COLUMNS = ["Open", "High", "Low", "Close", "TickVol", "Vol", "Spread"]
+DATETIME_FORMAT = "%Y.%m.%d %H:%M:%S"     # MetaTrader-Export: 2024.01.02<TAB>00:00:00
+
+
+def _csv_engine():
+    """Arrow-Parser (multithreaded) falls installiert, sonst der C-Parser."""
+    try:
+        import pyarrow  # noqa: F401
+        return "pyarrow"
+    except ImportError:
+        return "c"
+
+
+def _frame_from_csv(source, engine):
+    df = pd.read_csv(
+        source,
+        sep="\t",
+        names=CSV_COLUMNS,
+        header=None,
+        dtype={"Date": str, "Time": str},
+        engine=engine
+    )
+    df.index = pd.to_datetime(df["Date"] + " " + df["Time"], format=DATETIME_FORMAT)
+    df.index.name = "DateTime"
+    return df[OHLC_COLUMNS]
+
+
+def _line_chunks(filepath, chunk_bytes):
+    """
+    Teilt eine Datei in Byte-Bereiche, die immer an Zeilenenden beginnen/enden.
+    Eine MT5-Kopfzeile ('<DATE>...') wird übersprungen.
+    """
+    size = os.path.getsize(filepath)
+    with open(filepath, "rb") as f:
+        header = f.read(1) == b"<"
+        f.seek(0)
+        start = len(f.readline()) if header else 0
+        chunks = []
+        while start < size:
+            end = min(start + chunk_bytes, size)
+            if end < size:
+                f.seek(end)
+                end += len(f.readline())   # bis zum nächsten Zeilenende
+            chunks.append((filepath, start, end))
+            start = end
+    return chunks
+
+
+def _parse_chunk(args):
+    filepath, start, end, engine = args
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return _frame_from_csv(io.BytesIO(data), engine)
+
 
 class load_data():
-    
+
     def __init__(self):
         self.filepath = ''
-    
-    def metatrader_csv(filepath):
+
+    def metatrader_csv(filepath, compact=False):
         df = pd.read_csv(
             filepath,
             sep="\t",
-            names=["Date", "Time", "Open", "High", "Low", "Close", "TickVol", "Vol", "Spread"],
+            names=CSV_COLUMNS,
             header=None,
             skiprows=1,
-            engine='python'
+            dtype={"Date": str, "Time": str},
+            engine='c'
         )
-        
-        df['DateTime'] = pd.to_datetime(df['Date'].astype(str) + ' ' + df['Time'].astype(str))
+
+        df['DateTime'] = pd.to_datetime(df['Date'] + ' ' + df['Time'], format=DATETIME_FORMAT)
         df.set_index("DateTime", inplace=True)
         df.drop(['Date', 'Time'], axis=1, inplace=True)  # Aufräumen
-        return df[["Open", "High", "Low", "Close", "TickVol", "Vol", "Spread"]]
-        
-        
\ No newline at end of file
+        df = df[OHLC_COLUMNS]
+        return compact_ohlc(df) if compact else df
+
+    def metatrader_csv_parallel(filepaths, workers=None, chunk_bytes=64 * 1024 ** 2, compact=False):
+        """
+        Paralleler Import großer MT5-Exporte (Tick/M1).
+        - jede Datei wird an Zeilengrenzen in Blöcke geteilt, die Blöcke auf allen Kernen geparst
+        - mehrere Dateien aufeinanderfolgender Zeiträume werden zusammengeführt;
+          Überlappungen an den Grenzen werden entfernt (spätere Datei gewinnt)
+        """
+        if isinstance(filepaths, (str, os.PathLike)):
+            filepaths = [filepaths]
+
+        engine = _csv_engine()
+        jobs = [chunk + (engine,) for path in filepaths for chunk in _line_chunks(path, chunk_bytes)]
+
+        if len(jobs) <= 1 or workers == 1:
+            frames = [_parse_chunk(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                frames = list(pool.map(_parse_chunk, jobs))   # Reihenfolge bleibt erhalten
+
+        if not frames:
+            return pd.DataFrame(columns=OHLC_COLUMNS, index=pd.DatetimeIndex([], name="DateTime"))
+
+        df = pd.concat(frames)
+        df = df[~df.index.duplicated(keep="last")]
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index(kind="stable")
+        return compact_ohlc(df) if compact else df
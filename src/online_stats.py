@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Laufende Performance-Statistik für lange Live-Sessions.
+O(1) pro geschlossener Position:
+- Mittelwert/Varianz der Trade-Renditen (Welford)
+- Balance, laufendes Hoch, aktueller und maximaler Drawdown
+- Win-Rate, Brutto-Gewinn/-Verlust, Profit Factor, Expectancy
+Snapshots als JSON (atomar), damit ein Neustart ohne Historien-Scan weiterzählt.
+Deal-Abfragen beginnen bei der letzten Abfrage (deal_window) – auch in Wochen ohne Trades
+bleibt das Abfragefenster klein.
+"""
+
+import json
+import math
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+
+def _parse_utc(text):
+    """ISO-Zeitstempel → aware UTC (ältere Snapshots ohne Zeitzone gelten als UTC)."""
+    if not text:
+        return None
+    value = datetime.fromisoformat(text)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class OnlineStats:
+
+    FIELDS = ("count", "wins", "losses", "total_pnl", "gross_profit", "gross_loss",
+              "mean", "m2", "balance", "peak", "max_drawdown", "max_drawdown_pct",
+              "last_deal_ticket", "last_update", "last_poll")
+
+    def __init__(self, start_balance=0.0):
+        self.count = 0
+        self.wins = 0
+        self.losses = 0
+        self.total_pnl = 0.0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.mean = 0.0            # Welford: Mittelwert der Renditen
+        self.m2 = 0.0              # Welford: Summe der quadrierten Abweichungen
+        self.balance = float(start_balance)
+        self.peak = float(start_balance)
+        self.max_drawdown = 0.0
+        self.max_drawdown_pct = 0.0
+        self.last_deal_ticket = 0  # zuletzt verbuchter Deal (keine Doppelzählung nach Neustart)
+        self.last_update = None
+        self.last_poll = None      # letzte Deal-Abfrage (siehe deal_window)
+        self._last_save = 0.0
+
+    # ---------------------------------------------------------------- Update
+
+    def update(self, pnl, ret=None, deal_ticket=None):
+        """
+        Verbucht eine geschlossene Position.
+        ret: Rendite der Position (Standard: pnl relativ zur Balance vor dem Trade)
+        """
+        if ret is None:
+            ret = pnl / self.balance if self.balance else 0.0
+
+        self.count += 1
+        delta = ret - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (ret - self.mean)
+
+        self.total_pnl += pnl
+        if pnl > 0:
+            self.wins += 1
+            self.gross_profit += pnl
+        else:
+            self.losses += 1
+            self.gross_loss -= pnl
+
+        self.balance += pnl
+        self.peak = max(self.peak, self.balance)
+        self.max_drawdown = max(self.max_drawdown, self.drawdown)
+        self.max_drawdown_pct = max(self.max_drawdown_pct, self.drawdown_pct)
+
+        if deal_ticket is not None:
+            self.last_deal_ticket = max(self.last_deal_ticket, int(deal_ticket))
+        self.last_update = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    def deal_window(self, now=None, overlap=timedelta(days=1), first=timedelta(days=7)):
+        """
+        (von, bis) für die nächste Deal-Abfrage und merkt sie als letzte Abfrage vor.
+        Ab der letzten Abfrage minus 'overlap' (Serverzeit-Versatz; doppelte Deals fallen über
+        last_deal_ticket weg), ohne frühere Abfrage 'first' zurück.
+        """
+        now = now or datetime.now(timezone.utc)
+        last = _parse_utc(self.last_poll) or _parse_utc(self.last_update)
+        since = last - overlap if last else now - first
+        self.last_poll = now.isoformat(timespec="seconds")
+        return since, now + overlap
+
+    # ------------------------------------------------------------- Kennzahlen
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def drawdown(self):
+        return self.peak - self.balance
+
+    @property
+    def drawdown_pct(self):
+        return self.drawdown / self.peak * 100 if self.peak > 0 else 0.0
+
+    @property
+    def win_rate(self):
+        return self.wins / self.count * 100 if self.count else 0.0
+
+    @property
+    def profit_factor(self):
+        if self.gross_loss > 0:
+            return self.gross_profit / self.gross_loss
+        return float("inf") if self.gross_profit > 0 else 0.0
+
+    @property
+    def expectancy(self):
+        return self.total_pnl / self.count if self.count else 0.0
+
+    def summary(self):
+        """Aktuelle Kennzahlen (gleiche Namen wie evaluate_performance, wo vorhanden)."""
+        return {
+            "Total Trades": self.count,
+            "Wins": self.wins,
+            "Losses": self.losses,
+            "Win Rate (%)": round(self.win_rate, 2),
+            "Total Profit": round(self.total_pnl, 2),
+            "Balance": round(self.balance, 2),
+            "Drawdown (%)": round(self.drawdown_pct, 2),
+            "Max Drawdown": round(self.max_drawdown, 2),
+            "Max Drawdown (%)": round(self.max_drawdown_pct, 2),
+            "Profit Factor": round(self.profit_factor, 3),
+            "Expectancy": round(self.expectancy, 2),
+            "Mean Return (%)": round(self.mean * 100, 4),
+            "Std Return (%)": round(self.std * 100, 4),
+            "Sharpe (Trade)": round(self.mean / self.std, 3) if self.std > 0 else 0.0,
+        }
+
+    # ------------------------------------------------------------ Persistenz
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        for field in cls.FIELDS:
+            if field in data:
+                setattr(stats, field, data[field])
+        return stats
+
+    def save(self, path):
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp, path)
+        self._last_save = time.monotonic()
+
+    def maybe_save(self, path, interval=300):
+        """Speichert höchstens alle 'interval' Sekunden."""
+        if time.monotonic() - self._last_save >= interval:
+            self.save(path)
+            return True
+        return False
+
+    @classmethod
+    def load(cls, path, start_balance=0.0):
+        """Snapshot laden – fehlt er, beginnt eine neue Statistik mit start_balance."""
+        if not os.path.exists(path):
+            return cls(start_balance)
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
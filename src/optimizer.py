@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+Adaptiver Optimierer (Successive Halving) über Strategie-Parameter.
+- alle Kandidaten laufen zunächst auf einem kurzen Datenanfang
+- pro Runde bleibt das beste 1/eta, die Datenspanne wächst um Faktor eta
+- die letzte Runde nutzt den vollständigen Datensatz
+- Läufe, die ein Limit (max_drawdown, max_trades) verletzen, werden mitten in der
+  Simulation abgebrochen (BacktestAborted) und scheiden aus
+- Indikatorvarianten aller Kandidaten einer Runde (z. B. rsi mit period 7…28) werden
+  gebündelt über indicators_batch berechnet; die letzte Runde rechnet wie ein Einzellauf
+Bericht: eingesparte Bar-Auswertungen gegenüber dem vollständigen Grid.
+
+Parameterpfade (Punkt-getrennt, Listen über Index, ID/id oder '*' für alle Einträge):
+    "entry_logic.*.sl", "entry_logic.L1.tp", "rules.*.left.params.period",
+    "exit_config.trailing.distance"
+
+Beispiel:
+    python optimizer.py --strategy strategies/example_strategie_rsi.json --data data/EURUSD_H1.csv \\
+        --grid '{"entry_logic.*.sl": [100, 150, 200], "entry_logic.*.tp": [200, 300, 400]}'
+"""
+
+import argparse
+import copy
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+
+from backtester import Backtester, BacktestAborted
+from batch_runner import load_strategy_file
+from load_mt5_data import load_data
+from strategy_compiler import compile_strategy
+
+
+def _children(node, key):
+    """Alle Ziele eines Pfadelements: dict-Schlüssel, Listenindex, ID/id oder '*'."""
+    if isinstance(node, dict):
+        if key == "*":
+            return list(node.keys())
+        return [key]
+    if isinstance(node, list):
+        if key == "*":
+            return list(range(len(node)))
+        if key.lstrip("-").isdigit():
+            return [int(key)]
+        matches = [i for i, item in enumerate(node)
+                   if isinstance(item, dict) and key in (item.get("ID"), item.get("id"))]
+        if not matches:
+            raise KeyError(f"Kein Listeneintrag mit ID '{key}'")
+        return matches
+    raise KeyError(f"Pfadelement '{key}' passt nicht zu {type(node).__name__}")
+
+
+def set_path(strategy, path, value):
+    """Setzt einen Wert in der Strategie (in-place) – fehlende dict-Ebenen werden angelegt."""
+    keys = path.split(".")
+    nodes = [strategy]
+    for key in keys[:-1]:
+        next_nodes = []
+        for node in nodes:
+            for child in _children(node, key):
+                if isinstance(node, dict) and child not in node:
+                    node[child] = {}
+                next_nodes.append(node[child])
+        nodes = next_nodes
+    for node in nodes:
+        for child in _children(node, keys[-1]):
+            node[child] = value
+    return strategy
+
+
+def expand_grid(param_grid):
+    """dict Pfad → Werteliste → Liste von dicts Pfad → Wert (kartesisches Produkt)."""
+    paths = list(param_grid.keys())
+    return [dict(zip(paths, values)) for values in itertools.product(*param_grid.values())]
+
+
+def apply_params(strategy, params):
+    candidate = copy.deepcopy(strategy)
+    for path, value in params.items():
+        set_path(candidate, path, value)
+    return candidate
+
+
+def _spans(n_bars, n_candidates, eta, min_bars):
+    """Datenspannen pro Runde: … n/eta², n/eta, n – so viele Runden, wie Kandidaten halbiert werden können."""
+    rounds = max(1, int(math.floor(math.log(max(n_candidates, 1), eta))) + 1)
+    spans = [int(n_bars / eta ** (rounds - 1 - r)) for r in range(rounds)]
+    spans = [s for s in spans if s >= min_bars] or [n_bars]
+    spans[-1] = n_bars
+    return spans
+
+
+def precompute_indicators(df, strategies):
+    """
+    Indikatoraufrufe aller Strategien gebündelt: pro Indikator mit mehreren Parametersätzen
+    ein Aufruf von indicators_batch.variants.
+    Rückgabe: Indikator-Knoten-ID → Ergebnis (für CompiledStrategy.evaluate(precomputed=...))
+    """
+    from indicators_batch import variants
+    from registry import get_indicator
+    from strategy_compiler import _canonical_params
+
+    calls = {}   # Name → Knoten-ID → vollständige Parameter
+    for strategy in strategies:
+        for node in compile_strategy(strategy).nodes.values():
+            if node.kind == "indicator":
+                name = node.attrs["name"]
+                calls.setdefault(name, {})[node.id] = dict(_canonical_params(name, node.attrs["params"]))
+
+    values = {}
+    for name, nodes in calls.items():
+        # nur eingebaute Indikatoren – ein per Registry ersetzter Name rechnet anders
+        if len(nodes) < 2 or get_indicator(name).__module__ != "indicators":
+            continue
+        results = variants(df, name, list(nodes.values()))
+        if results is not None:
+            values.update(zip(nodes, results))
+    return values
+
+
+def evaluate_candidate(df, strategy, params, span, metric, limits=None, indicator_values=None):
+    """
+    Ein Backtest auf den ersten 'span' Bars.
+    indicator_values: vorberechnete Indikatoren auf df.iloc[:span] (siehe precompute_indicators)
+    Rückgabe: (score, metrics | None, simulierte Bars, Abbruchgrund | None)
+    """
+    candidate = apply_params(strategy, params)
+    data = df.iloc[:span].copy()
+    try:
+        bt = Backtester(data, candidate, event_driven=True, progress=False)   # identische Trades, nur Ereignis-Bars
+        rule_results = None
+        if indicator_values:
+            rule_results = compile_strategy(candidate).evaluate(data, precomputed=indicator_values)
+        _, _, _, metrics, _ = bt.run_backtest(candidate, limits=limits, rule_results=rule_results)
+    except BacktestAborted as e:
+        return -math.inf, None, e.bars, e.reason
+    return float(metrics[metric]), metrics, span, None
+
+
+def successive_halving(df, strategy, param_grid, metric="Total Profit", eta=3,
+                       min_bars=500, limits=None, max_candidates=None, seed=None, batch_indicators=True):
+    """
+    Sucht die beste Parameterkombination mit Successive Halving.
+
+    param_grid: dict Pfad → Werteliste (siehe Modul-Docstring)
+    metric:     zu maximierende Kennzahl aus evaluate_performance
+    eta:        Reduktionsfaktor pro Runde (behält 1/eta der Kandidaten)
+    limits:     Abbruchgrenzen für run_backtest (z. B. {'max_drawdown': 0.3, 'max_trades': 500})
+    max_candidates: zufällige Stichprobe aus dem Grid (None = alle)
+    batch_indicators: Indikatorvarianten der Vorrunden gebündelt berechnen (indicators_batch);
+                    die letzte Runde rechnet immer einzeln, ihre Metriken gleichen einem Einzellauf
+
+    Rückgabe: dict mit 'best', 'leaderboard', 'rounds' und Bar-Zählern;
+              'best' ist None, wenn alle Kandidaten einer Runde ein Limit verletzt haben
+    """
+    candidates = expand_grid(param_grid)
+    if max_candidates is not None and len(candidates) > max_candidates:
+        candidates = random.Random(seed).sample(candidates, max_candidates)
+    if not candidates:
+        raise ValueError("Leeres Parameter-Grid")
+
+    n_bars = len(df)
+    spans = _spans(n_bars, len(candidates), eta, min_bars)
+    bars_full_grid = len(candidates) * n_bars
+    bars_evaluated = 0
+    rounds = []
+    alive = list(range(len(candidates)))
+    results = {}
+    started = time.perf_counter()
+
+    print(f"🔎 {len(candidates)} Kandidaten, {len(spans)} Runden, Spannen: {spans}")
+    for r, span in enumerate(spans):
+        scored = []
+        aborted = 0
+        last = r == len(spans) - 1
+        indicator_values = None
+        if batch_indicators and not last:
+            indicator_values = precompute_indicators(
+                df.iloc[:span], [apply_params(strategy, candidates[i]) for i in alive])
+        for i in alive:
+            score, metrics, bars, reason = evaluate_candidate(df, strategy, candidates[i], span, metric, limits,
+                                                              indicator_values)
+            bars_evaluated += bars
+            aborted += reason is not None
+            results[i] = {"params": candidates[i], "score": score, "bars": bars,
+                          "metrics": metrics, "aborted": reason}
+            scored.append((score, i))
+
+        # Stabil: bei gleichem Score gewinnt die frühere Kombination
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        keep = len(scored) if last else max(1, math.ceil(len(scored) / eta))
+        survivors = [i for score, i in scored[:keep] if score > -math.inf]
+        rounds.append({"round": r, "span": span, "candidates": len(alive),
+                       "aborted": aborted, "survivors": len(survivors)})
+        print(f"   Runde {r}: {len(alive)} Kandidaten × {span} Bars → {len(survivors)} weiter"
+              f"{f' ({aborted} abgebrochen)' if aborted else ''}")
+        alive = survivors
+        if not alive:
+            break
+
+    leaderboard = sorted((results[i] for i in alive), key=lambda res: -res["score"])
+    bars_saved = bars_full_grid - bars_evaluated
+    saved_pct = 100 * bars_saved / bars_full_grid if bars_full_grid else 0.0
+    best = leaderboard[0] if leaderboard else None
+
+    if best is None:
+        print(f"❌ Kein zulässiger Kandidat – alle in Runde {len(rounds) - 1} abgebrochen (Limits: {limits})")
+    else:
+        print(f"🏆 Beste Kombination: {best['params']} → {metric} = {best['score']}")
+    print(f"⚡ Bar-Auswertungen: {bars_evaluated:,} statt {bars_full_grid:,} "
+          f"({saved_pct:.1f}% eingespart) in {time.perf_counter() - started:.1f}s")
+
+    return {
+        "best": best,
+        "leaderboard": leaderboard,
+        "rounds": rounds,
+        "bars_evaluated": bars_evaluated,
+        "bars_full_grid": bars_full_grid,
+        "bars_saved": bars_saved,
+        "saved_pct": round(saved_pct, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Successive-Halving-Optimierung einer Strategie")
+    parser.add_argument("--strategy", required=True, help="Strategie-JSON")
+    parser.add_argument("--data", required=True, help="MetaTrader-CSV")
+    parser.add_argument("--grid", required=True, help="JSON-dict Pfad → Werteliste oder Pfad zu einer JSON-Datei")
+    parser.add_argument("--metric", default="Total Profit", help="Zu maximierende Kennzahl")
+    parser.add_argument("--eta", type=int, default=3, help="Reduktionsfaktor pro Runde")
+    parser.add_argument("--min-bars", type=int, default=500, help="Minimale Datenspanne der ersten Runde")
+    parser.add_argument("--max-drawdown", type=float, default=None, help="Abbruch ab diesem Drawdown (Anteil)")
+    parser.add_argument("--max-trades", type=int, default=None, help="Abbruch ab dieser Trade-Anzahl")
+    parser.add_argument("--sample", type=int, default=None, help="Zufällige Stichprobe aus dem Grid")
+    parser.add_argument("--no-batch-indicators", action="store_true",
+                        help="Indikatorvarianten nicht gebündelt vorberechnen")
+    parser.add_argument("--out", default=None, help="Ergebnis als JSON speichern")
+    args = parser.parse_args(argv)
+
+    if os.path.isfile(args.grid):
+        with open(args.grid, "r", encoding="utf-8") as f:
+            param_grid = json.load(f)
+    else:
+        param_grid = json.loads(args.grid)
+
+    limits = {k: v for k, v in {"max_drawdown": args.max_drawdown, "max_trades": args.max_trades}.items()
+              if v is not None}
+    result = successive_halving(
+        load_data.metatrader_csv(args.data), load_strategy_file(args.strategy), param_grid,
+        metric=args.metric, eta=args.eta, min_bars=args.min_bars, limits=limits or None,
+        max_candidates=args.sample, batch_indicators=not args.no_batch_indicators
+    )
+
+    if args.out:
+        summary = {k: v for k, v in result.items() if k != "leaderboard"}
+        summary["best"] = result["best"] and {k: v for k, v in result["best"].items() if k != "metrics"}
+        summary["leaderboard"] = [{k: v for k, v in res.items() if k != "metrics"} for res in result["leaderboard"]]
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, default=str)
+        print(f"📄 Ergebnis gespeichert: {args.out}")
+    return 0 if result["best"] is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+Order-Pipeline für den LiveTrader.
+- begrenzte Warteschlange + Worker-Threads: ein langsamer order_send blockiert
+  weder run_once noch die Exit-Prüfung der übrigen Positionen
+- Wiederholung bei Requote / Off-Quotes / Preisänderung mit frischem Tick-Preis,
+  Wartezeit wächst pro Versuch (retry_delay · retry_backoff^n)
+- pro Order Zeitstempel: Signal erkannt → übermittelt → Broker-Bestätigung → Fill
+- Latenz-Perzentile über die letzten 'history' abgeschlossenen Orders (feste Obergrenze
+  für Prozesse, die monatelang laufen)
+
+Der Broker ist jedes Objekt mit order_send(request) und symbol_info_tick(symbol) –
+das MetaTrader5-Modul selbst oder FakeBroker für lokale Tests:
+    python order_pipeline.py
+"""
+
+import itertools
+import queue
+import random
+import threading
+import time
+from collections import deque, namedtuple
+from datetime import datetime, timezone
+
+import numpy as np
+
+# MetaTrader5-Konstanten (hier gespiegelt, damit die Pipeline ohne MT5 importierbar ist)
+TRADE_RETCODE_REQUOTE = 10004
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_PRICE_CHANGED = 10020
+TRADE_RETCODE_PRICE_OFF = 10021
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+
+RETRY_RETCODES = (TRADE_RETCODE_REQUOTE, TRADE_RETCODE_PRICE_CHANGED, TRADE_RETCODE_PRICE_OFF)
+
+LATENCY_SEGMENTS = {
+    "signal_to_submit": ("signal_time", "submitted"),
+    "submit_to_ack": ("submitted", "acked"),
+    "ack_to_fill": ("acked", "filled"),
+    "signal_to_fill": ("signal_time", "filled"),
+}
+
+
+class OrderTicket:
+    """
+    Eine Order auf dem Weg durch die Pipeline.
+    Zeitstempel in time.perf_counter()-Sekunden; status: queued, sending, done, failed, rejected
+    submitted = erster Sendeversuch, acked = Antwort auf den letzten Versuch (inkl. Wiederholungen)
+    """
+    _ids = itertools.count(1)
+
+    def __init__(self, request, kind="open", signal_time=None, on_done=None):
+        self.id = next(self._ids)
+        self.request = request
+        self.kind = kind
+        self.created_at = datetime.now(timezone.utc)
+        self.signal_time = signal_time if signal_time is not None else time.perf_counter()
+        self.submitted = None
+        self.acked = None
+        self.filled = None
+        self.attempts = 0
+        self.retcode = None
+        self.result = None
+        self.status = "queued"
+        self.on_done = on_done
+        self.done = threading.Event()
+
+    def latency(self, segment):
+        start, end = LATENCY_SEGMENTS[segment]
+        a, b = getattr(self, start), getattr(self, end)
+        return None if a is None or b is None else b - a
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+    def __repr__(self):
+        return f"OrderTicket(#{self.id} {self.kind} {self.status}, Versuche={self.attempts}, retcode={self.retcode})"
+
+
+class OrderPipeline:
+    """
+    broker:      MetaTrader5-Modul oder FakeBroker
+    workers:     Anzahl Sende-Threads
+    max_queue:   Größe der Warteschlange (voll → Order wird abgelehnt statt run_once zu blockieren)
+    max_retries: Wiederholungen bei RETRY_RETCODES (Wartezeit retry_delay · retry_backoff^(Versuch − 1))
+    history:     Anzahl abgeschlossener Orders für latency_stats (ältere fallen heraus)
+    """
+
+    def __init__(self, broker, workers=2, max_queue=32, max_retries=3, retry_delay=0.05, retry_backoff=2.0,
+                 retry_retcodes=RETRY_RETCODES, history=10000):
+        self.broker = broker
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.retry_backoff = retry_backoff
+        self.retry_retcodes = set(retry_retcodes)
+        self.done_code = getattr(broker, "TRADE_RETCODE_DONE", TRADE_RETCODE_DONE)
+        self.buy_type = getattr(broker, "ORDER_TYPE_BUY", ORDER_TYPE_BUY)
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self.completed = deque(maxlen=history)
+        self._threads = [threading.Thread(target=self._worker, name=f"order-worker-{i}", daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    # --------------------------------------------------------------- Einreichen
+
+    def submit(self, request, kind="open", signal_time=None, on_done=None):
+        """Stellt eine Order ein und kehrt sofort zurück (OrderTicket)."""
+        ticket = OrderTicket(request, kind, signal_time, on_done)
+        try:
+            self._queue.put_nowait(ticket)
+        except queue.Full:
+            ticket.status = "rejected"
+            print(f"⚠️ Order-Warteschlange voll – {kind}-Order #{ticket.id} verworfen")
+            self._finish(ticket)
+        return ticket
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def join(self):
+        """Wartet, bis alle eingestellten Orders abgearbeitet sind."""
+        self._queue.join()
+
+    def shutdown(self, wait=True):
+        for _ in self._threads:
+            self._queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    # ----------------------------------------------------------------- Worker
+
+    def _refresh_price(self, request):
+        tick = self.broker.symbol_info_tick(request["symbol"])
+        if tick is not None:
+            request["price"] = tick.ask if request["type"] == self.buy_type else tick.bid
+
+    def _send(self, ticket):
+        ticket.status = "sending"
+        while True:
+            ticket.attempts += 1
+            if ticket.submitted is None:
+                ticket.submitted = time.perf_counter()
+            result = self.broker.order_send(ticket.request)
+            ticket.acked = time.perf_counter()
+            ticket.result = result
+            ticket.retcode = getattr(result, "retcode", None)
+
+            if ticket.retcode == self.done_code:
+                ticket.filled = ticket.acked   # Market-Deal: Fill mit der Bestätigung
+                ticket.status = "done"
+                return
+            if ticket.retcode in self.retry_retcodes and ticket.attempts <= self.max_retries:
+                time.sleep(self.retry_delay * self.retry_backoff ** (ticket.attempts - 1))
+                self._refresh_price(ticket.request)
+                continue
+            ticket.status = "failed"
+            return
+
+    def _worker(self):
+        while True:
+            ticket = self._queue.get()
+            if ticket is None:
+                self._queue.task_done()
+                return
+            try:
+                self._send(ticket)
+            except Exception as e:
+                ticket.status = "failed"
+                print(f"❌ Order #{ticket.id} Ausnahme: {e}")
+            finally:
+                self._finish(ticket)
+                self._queue.task_done()
+
+    def _finish(self, ticket):
+        with self._lock:
+            self.completed.append(ticket)
+        ticket.done.set()
+        if ticket.on_done:
+            try:
+                ticket.on_done(ticket)
+            except Exception as e:
+                print(f"⚠️ on_done für Order #{ticket.id} fehlgeschlagen: {e}")
+
+    # ---------------------------------------------------------------- Bericht
+
+    def latency_stats(self, percentiles=(50, 90, 99)):
+        """
+        Latenz-Perzentile in Millisekunden pro Abschnitt (nur erfolgreiche Orders)
+        + Zähler nach Status und durchschnittliche Versuche – über die letzten 'history' Orders.
+        """
+        with self._lock:
+            tickets = list(self.completed)
+
+        stats = {"count": len(tickets),
+                 "status": {s: sum(t.status == s for t in tickets) for s in {t.status for t in tickets}},
+                 "avg_attempts": round(float(np.mean([t.attempts for t in tickets])), 2) if tickets else 0.0}
+        done = [t for t in tickets if t.status == "done"]
+        for segment in LATENCY_SEGMENTS:
+            values = [t.latency(segment) for t in done]
+            values = np.array([v for v in values if v is not None]) * 1000
+            stats[segment] = ({f"p{p}": round(float(np.percentile(values, p)), 3) for p in percentiles}
+                              if len(values) else {})
+        return stats
+
+    def print_latency_report(self):
+        stats = self.latency_stats()
+        print(f"📊 Orders: {stats['count']} {stats['status']}, Ø Versuche {stats['avg_attempts']}")
+        for segment in LATENCY_SEGMENTS:
+            values = ", ".join(f"{k}={v} ms" for k, v in stats[segment].items())
+            print(f"   {segment:<17} {values or '–'}")
+
+
+# --------------------------------------------------------------------- Fake-Broker
+
+Tick = namedtuple("Tick", ["bid", "ask", "time"])
+OrderResult = namedtuple("OrderResult", ["retcode", "order", "price", "comment"])
+
+
+class FakeBroker:
+    """
+    Lokaler Ersatz für MetaTrader5 (order_send/symbol_info_tick).
+    latency:      (min, max) Sekunden pro order_send
+    requote_rate: Anteil der Sendungen mit Requote/Off-Quotes
+    fail_rate:    Anteil endgültiger Ablehnungen (retcode 10006)
+    """
+    TRADE_RETCODE_DONE = TRADE_RETCODE_DONE
+    ORDER_TYPE_BUY = ORDER_TYPE_BUY
+    ORDER_TYPE_SELL = ORDER_TYPE_SELL
+
+    def __init__(self, bid=1.10000, spread=0.00015, latency=(0.005, 0.02), requote_rate=0.1,
+                 fail_rate=0.0, seed=None):
+        self.bid = bid
+        self.spread = spread
+        self.latency = latency
+        self.requote_rate = requote_rate
+        self.fail_rate = fail_rate
+        self.sent = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._orders = itertools.count(1)
+
+    def symbol_info_tick(self, symbol):
+        with self._lock:
+            self.bid = round(self.bid + self._rng.gauss(0, 0.00005), 5)
+            return Tick(self.bid, round(self.bid + self.spread, 5), time.time())
+
+    def order_send(self, request):
+        with self._lock:
+            delay = self._rng.uniform(*self.latency)
+            roll = self._rng.random()
+            self.sent.append(dict(request))
+        time.sleep(delay)
+        if roll < self.fail_rate:
+            return OrderResult(10006, 0, 0.0, "rejected")
+        if roll < self.fail_rate + self.requote_rate:
+            return OrderResult(self._rng.choice(RETRY_RETCODES), 0, 0.0, "requote")
+        return OrderResult(TRADE_RETCODE_DONE, next(self._orders), request.get("price", 0.0), "done")
+
+
+if __name__ == "__main__":
+    broker = FakeBroker(requote_rate=0.2, fail_rate=0.02, seed=1)
+    with OrderPipeline(broker, workers=4, max_queue=64) as pipeline:
+        for i in range(100):
+            tick = broker.symbol_info_tick("EURUSD")
+            buy = i % 2 == 0
+            pipeline.submit({"symbol": "EURUSD", "type": ORDER_TYPE_BUY if buy else ORDER_TYPE_SELL,
+                             "price": tick.ask if buy else tick.bid, "volume": 0.1})
+            time.sleep(0.004)
+        pipeline.join()
+        pipeline.print_latency_report()
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Panel-Modus: eine Strategie über viele Symbole mit einem Indikator-Aufruf pro Knoten.
+
+Ein Panel ist ein DataFrame mit Spalten (Feld, Symbol) auf einem gemeinsamen Zeitindex –
+panel["Close"] ist dann eine Matrix Zeit × Symbol. Die Funktionen in indicators.py
+(Kernels entlang Achse 0) und triggers.py rechnen darauf unverändert spaltenweise, Regel-
+und Logikmasken entstehen als bool-Matrizen. Simuliert wird weiter pro Symbol: jeder
+Backtester bekommt seine Spalte der Regelmasken (run_backtest(rule_results=...)).
+
+join='inner' (Standard) nutzt nur Zeitpunkte, die alle Symbole haben – die Masken sind dann
+identisch zu Einzelläufen auf diesem Index. join='outer' behält alle Bars; Lücken sind NaN,
+Fenster über eine Lücke ergeben NaN (keine Signale), simuliert wird nur über echte Bars.
+Hat ein Symbol innerhalb seines eigenen Zeitraums Lücken (z. B. nur jede zweite Bar der
+anderen), verliert es so die meisten Signale – make_panel warnt dann pro Symbol (panel_gaps).
+
+Beispiel:
+    python panel.py --strategy strategies/example_strategie_rsi.json --data "data/*.csv"
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from strategy_compiler import compile_strategy
+
+
+def make_panel(frames, join="inner"):
+    """dict Symbol → OHLC-DataFrame → Panel mit Spalten (Feld, Symbol); Felder, die alle Symbole haben."""
+    if not frames:
+        raise ValueError("Keine Datensätze für das Panel")
+    symbols = list(frames)
+    fields = [col for col in frames[symbols[0]].columns if all(col in df.columns for df in frames.values())]
+    panel = pd.concat({symbol: frames[symbol][fields] for symbol in symbols}, axis=1, join=join)
+    panel = panel.swaplevel(axis=1)
+    panel = panel[pd.MultiIndex.from_product([fields, symbols])].sort_index()
+    if join == "outer":
+        for symbol, gaps in panel_gaps(panel).items():
+            own = int(panel[("Close", symbol)].notna().sum())
+            print(f"⚠️ {symbol}: {gaps} Lücken im eigenen Zeitraum ({own} eigene Bars) – Fenster über "
+                  f"Lücken liefern NaN, Signale fallen weg; join='inner' oder Einzellauf verwenden")
+    return panel
+
+
+def panel_gaps(panel):
+    """Symbol → Anzahl NaN-Zeilen zwischen erster und letzter eigener Bar (nur Symbole mit Lücken)."""
+    gaps = {}
+    for symbol in symbols(panel):
+        present = panel[("Close", symbol)].notna().to_numpy()
+        own = present.nonzero()[0]
+        if len(own):
+            missing = int((~present[own[0]:own[-1] + 1]).sum())
+            if missing:
+                gaps[symbol] = missing
+    return gaps
+
+
+def symbols(panel):
+    return list(panel.columns.get_level_values(1).unique())
+
+
+def symbol_frame(panel, symbol, dropna=True):
+    """Ein Symbol als gewöhnlicher DataFrame (inkl. berechneter Indikatorspalten), ohne Lückenzeilen."""
+    frame = panel.xs(symbol, axis=1, level=1)
+    return frame[frame["Close"].notna()] if dropna else frame
+
+
+def evaluate_panel(panel, strategy, workers=None):
+    """
+    Wertet Regeln und Logiken einmal über alle Symbole aus.
+    Rückgabe: {'rules': Regel-ID → DataFrame[bool], 'entry_logic'/'exit_logic': Logik-ID → DataFrame[bool],
+               'panel': Panel inkl. Indikatorspalten (Name, Symbol), 'compiled': CompiledStrategy} – Spalten = Symbole.
+    """
+    compiled = compile_strategy(strategy)
+    values = compiled.evaluate_nodes(panel, include_logic=True, workers=workers)
+    # Indikatorspalten in einem concat anhängen – einzeln eingefügt kostet jede Spalte ein
+    # Umkopieren des MultiIndex, bei vielen Symbolen mehr als die Indikatoren selbst
+    columns = {}
+    for nid, node in compiled.nodes.items():
+        if node.kind == "output":
+            for col in compiled.output_columns(node, values[node.inputs[0]]):
+                columns[col] = values[nid]
+    if columns:
+        panel = pd.concat([panel.drop(columns=list(columns), level=0, errors="ignore"),
+                           pd.concat(columns, axis=1)], axis=1)
+    return {
+        "rules": {rule_id: values[nid] for rule_id, nid in compiled.rules.items()},
+        "entry_logic": {lid: values[nid].astype(bool) for lid, nid in compiled.entry_logic.items()},
+        "exit_logic": {eid: values[nid].astype(bool) for eid, nid in compiled.exit_logic.items()},
+        "panel": panel,
+        "compiled": compiled,
+    }
+
+
+def symbol_masks(masks, symbol, index=None):
+    """Spalte eines Symbols aus einem dict ID → DataFrame (optional auf 'index' eingeschränkt)."""
+    columns = {key: frame[symbol] for key, frame in masks.items()}
+    if index is not None:
+        columns = {key: series.loc[index] for key, series in columns.items()}
+    return columns
+
+
+def run_panel(frames, strategy, join="inner", event_driven=True, workers=None, progress=True):
+    """
+    Backtests einer Strategie über alle Symbole; Signale aus einer Panel-Auswertung.
+    Rückgabe: dict Symbol → Ergebnis von run_backtest (trades, rule_results, signal_data, metrics, resolved_df)
+    """
+    from backtester import Backtester
+
+    evaluated = evaluate_panel(make_panel(frames, join), strategy, workers)
+    panel = evaluated["panel"]
+    results = {}
+    for symbol in symbols(panel):
+        df = symbol_frame(panel, symbol)
+        bt = Backtester(df, strategy, event_driven=event_driven, progress=progress)
+        results[symbol] = bt.run_backtest(strategy, rule_results=symbol_masks(evaluated["rules"], symbol, df.index))
+    return results
+
+
+def main(argv=None):
+    from batch_runner import expand_globs, load_strategy_file, scalar_metrics
+    from load_mt5_data import load_data
+
+    parser = argparse.ArgumentParser(description="Eine Strategie über viele Symbole im Panel-Modus")
+    parser.add_argument("--strategy", required=True, help="Strategie-JSON")
+    parser.add_argument("--data", nargs="+", required=True, help="Glob(s) für MetaTrader-CSV-Dateien (Symbol = Dateiname)")
+    parser.add_argument("--join", choices=["inner", "outer"], default="inner", help="Gemeinsamer Index")
+    parser.add_argument("--workers", type=int, default=None, help="Threads für die Regelauswertung")
+    args = parser.parse_args(argv)
+
+    strategy = load_strategy_file(args.strategy)
+    frames = {Path(path).stem: load_data.metatrader_csv(path) for path in expand_globs(args.data)}
+
+    started = time.perf_counter()
+    results = run_panel(frames, strategy, args.join, workers=args.workers, progress=False)
+    print(f"⏱️ {len(results)} Symbole in {time.perf_counter() - started:.2f}s")
+    table = pd.DataFrame({symbol: scalar_metrics(result[3]) for symbol, result in results.items()}).T
+    print(table[["Total Trades", "Total Profit", "Win Rate (%)", "Max Drawdown (%)"]].to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Erweiterte Kennzahlen aus Equity-Kurve und Trades – vektorisiert, O(n) in Bars und Trades:
+Max Drawdown (Betrag, %, Dauer), Underwater-Kurve, Sharpe/Sortino auf Bar- und Tagesrenditen,
+CAGR, Profit Factor, Expectancy und Time in Market.
+
+Annualisierung über die tatsächliche Zahl der Perioden pro Jahr im Datensatz
+(Forex-H1 ≈ 6000 Bars/Jahr, nicht 24·365).
+
+Mark-to-Market-Equity: realisierte Balance plus unrealisierter PnL aller offenen Trades
+pro Bar – über Positions-Deltas an Ein-/Ausstiegen (np.add.at + cumsum) statt Bars × Trades.
+"""
+
+import numpy as np
+import pandas as pd
+
+YEAR = pd.Timedelta(days=365.25)
+
+
+def drawdown(equity):
+    """
+    Underwater-Kurve (Anteil unter dem bisherigen Hoch, ≤ 0) und Index des letzten Hochs pro Bar.
+    """
+    peak = np.maximum.accumulate(equity)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        underwater = np.where(peak > 0, equity / peak - 1.0, 0.0)
+    positions = np.arange(len(equity))
+    last_peak = np.maximum.accumulate(np.where(equity >= peak, positions, 0))
+    return underwater, peak, last_peak
+
+
+def _ratio(returns, periods_per_year):
+    """(Sharpe, Sortino) annualisiert; 0.0 bei zu wenigen Daten oder Streuung 0."""
+    if len(returns) < 2 or not periods_per_year:
+        return 0.0, 0.0
+    mean = returns.mean()
+    std = returns.std(ddof=1)
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+    scale = np.sqrt(periods_per_year)
+    sharpe = mean / std * scale if std > 0 else 0.0
+    sortino = mean / downside * scale if downside > 0 else 0.0
+    return float(sharpe), float(sortino)
+
+
+def _daily_last(values, index):
+    """Letzter Wert pro Kalendertag (Index aufsteigend)."""
+    days = index.normalize().to_numpy()
+    last_of_day = np.r_[days[1:] != days[:-1], True]
+    return values[last_of_day]
+
+
+def time_in_market(index, trades):
+    """Anteil der Bars mit mindestens einem offenen Trade (Einstieg inkl., Ausstieg exkl.)."""
+    if not trades or len(index) == 0:
+        return 0.0
+    entries = index.searchsorted(pd.DatetimeIndex([t["entry_time"] for t in trades]))
+    exits = index.searchsorted(pd.DatetimeIndex([t["exit_time"] for t in trades]))
+    delta = np.zeros(len(index) + 1, dtype=np.int64)
+    np.add.at(delta, entries, 1)
+    np.add.at(delta, exits, -1)
+    return float((np.cumsum(delta[:-1]) > 0).mean())
+
+
+def _open_sum(n, entries, exits, weights):
+    """Summe der Gewichte aller Trades, die in Bar t offen sind (entries ≤ t < exits)."""
+    delta = np.zeros(n + 1, dtype=np.float64)
+    np.add.at(delta, entries, weights)
+    np.add.at(delta, exits, -weights)
+    return np.cumsum(delta[:-1])
+
+
+def mark_to_market(realized, close, trades, entries, exits, exposure_factor, start_balance):
+    """
+    Equity inkl. unrealisiertem PnL pro Bar.
+    realized: realisierte Balance pro Bar (nach den Ausstiegen der Bar), close: Close (Bid) pro Bar,
+    entries/exits: Bar-Positionen je Trade (offen in [entry, exit)).
+    Bewertet wird zum Kurs, zu dem SL/TP/Trailing schließen – dem Close, für Buy und Sell –,
+    Exposure aus der Balance zu Bar-Beginn (rpt · lever):
+    unrealisiert(t) = Exposure(t) · Σ ±(Close(t) − Einstieg).
+    """
+    n = len(realized)
+    if not len(trades) or not n:
+        return np.asarray(realized, dtype=np.float64)
+    is_buy = np.array([t["type"] == "buy" for t in trades])
+    entry_price = np.array([t["entry_price"] for t in trades], dtype=np.float64)
+    entries = np.asarray(entries, dtype=np.int64)
+    exits = np.asarray(exits, dtype=np.int64)
+
+    long_units = _open_sum(n, entries, exits, is_buy.astype(np.float64))
+    long_cost = _open_sum(n, entries, exits, np.where(is_buy, entry_price, 0.0))
+    short_units = _open_sum(n, entries, exits, (~is_buy).astype(np.float64))
+    short_cost = _open_sum(n, entries, exits, np.where(is_buy, 0.0, entry_price))
+
+    exposure = np.r_[start_balance, realized[:-1]] * exposure_factor
+    # Ohne offene Position exakt 0 (kein Rundungsrest aus der Kumulierung der Einstiegspreise)
+    unrealized = (np.where(long_units > 0, close * long_units - long_cost, 0.0)
+                  + np.where(short_units > 0, short_cost - close * short_units, 0.0))
+    return realized + exposure * unrealized
+
+
+def downsample(series, resolution):
+    """
+    Letzter Wert pro Zeitraum ('1D', '1W', …) bzw. jede resolution-te Bar (int, letzte Bar immer dabei).
+    Für lange Läufe: Kennzahlen werden vorher auf voller Auflösung berechnet.
+    """
+    if not resolution or series.empty:
+        return series
+    if isinstance(resolution, int):
+        keep = np.zeros(len(series), dtype=bool)
+        keep[resolution - 1::resolution] = True
+        keep[-1] = True
+        return series[keep]
+    return series.groupby(series.index.floor(resolution)).last()
+
+
+def mtm_metrics(mtm_series):
+    """Max Drawdown der Mark-to-Market-Equity (Betrag und %)."""
+    equity = mtm_series.to_numpy(dtype=np.float64)
+    if not len(equity):
+        return {"Max Drawdown (MTM)": 0.0, "Max Drawdown (MTM) (%)": 0.0}
+    underwater, peak, _ = drawdown(equity)
+    worst = int(np.argmin(underwater))
+    return {"Max Drawdown (MTM)": round(float(peak[worst] - equity[worst]), 2),
+            "Max Drawdown (MTM) (%)": round(float(-underwater[worst]) * 100, 2)}
+
+
+def extended_metrics(equity_series, trades, start_balance=None):
+    """
+    Kennzahlen-dict für evaluate_performance.
+    equity_series: Balance pro Bar (DatetimeIndex), trades: abgeschlossene Trades mit 'pnl'
+    """
+    index = equity_series.index
+    equity = equity_series.to_numpy(dtype=np.float64)
+    start = float(start_balance if start_balance is not None else (equity[0] if len(equity) else 0.0))
+
+    metrics = {}
+    if len(equity):
+        underwater, peak, last_peak = drawdown(equity)
+        worst = int(np.argmin(underwater))
+        times = index.to_numpy()
+        durations = times - times[last_peak]
+        metrics["Max Drawdown"] = round(float(peak[worst] - equity[worst]), 2)
+        metrics["Max Drawdown (%)"] = round(float(-underwater[worst]) * 100, 2)
+        metrics["Max Drawdown Duration (Bars)"] = int((np.arange(len(equity)) - last_peak).max())
+        metrics["Max Drawdown Duration (Days)"] = round(float(durations.max() / np.timedelta64(1, "D")), 2)
+        underwater_curve = pd.Series(underwater * 100, index=index, name="Underwater (%)")
+    else:
+        underwater_curve = pd.Series(dtype=float, name="Underwater (%)")
+        metrics.update({"Max Drawdown": 0.0, "Max Drawdown (%)": 0.0,
+                        "Max Drawdown Duration (Bars)": 0, "Max Drawdown Duration (Days)": 0.0})
+
+    # Renditen: Bar und Tag (erste Rendite relativ zur Start-Balance)
+    years = (index[-1] - index[0]) / YEAR if len(index) > 1 else 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bar_returns = np.diff(np.r_[start, equity]) / np.r_[start, equity[:-1]]
+        daily = _daily_last(equity, index) if len(equity) else equity
+        daily_returns = np.diff(np.r_[start, daily]) / np.r_[start, daily[:-1]]
+    bar_returns = bar_returns[np.isfinite(bar_returns)]
+    daily_returns = daily_returns[np.isfinite(daily_returns)]
+
+    sharpe_bar, sortino_bar = _ratio(bar_returns, len(bar_returns) / years if years else 0)
+    sharpe_day, sortino_day = _ratio(daily_returns, len(daily_returns) / years if years else 0)
+    metrics["Sharpe (Bar)"] = round(sharpe_bar, 3)
+    metrics["Sortino (Bar)"] = round(sortino_bar, 3)
+    metrics["Sharpe (Daily)"] = round(sharpe_day, 3)
+    metrics["Sortino (Daily)"] = round(sortino_day, 3)
+
+    final = equity[-1] if len(equity) else start
+    cagr = (final / start) ** (1 / years) - 1 if years and start > 0 and final > 0 else 0.0
+    metrics["CAGR (%)"] = round(float(cagr) * 100, 2)
+
+    # Trades
+    pnl = np.array([t.get("pnl", 0.0) for t in trades], dtype=np.float64)
+    gross_profit = pnl[pnl > 0].sum()
+    gross_loss = -pnl[pnl < 0].sum()
+    if gross_loss > 0:
+        profit_factor = gross_profit / gross_loss
+    else:
+        profit_factor = float("inf") if gross_profit > 0 else 0.0
+    metrics["Profit Factor"] = round(float(profit_factor), 3)
+    metrics["Expectancy"] = round(float(pnl.mean()), 2) if len(pnl) else 0.0
+    metrics["Time in Market (%)"] = round(time_in_market(index, trades) * 100, 2)
+    metrics["Underwater Curve"] = underwater_curve
+    return metrics
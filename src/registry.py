@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Registry für Indikatoren und Trigger.
+
+- eingebaute Funktionen melden sich per Dekorator an (@indicator / @trigger in
+  indicators.py bzw. triggers.py); das Modul wird erst beim ersten Lookup importiert
+- Fremdpakete deklarieren Entry Points in den Gruppen 'backtester.indicators' bzw.
+  'backtester.triggers' (Name = Name im Strategie-JSON, Wert = 'paket.modul:funktion').
+  Geladen wird nur der Entry Point, dessen Name angefragt wird.
+- Metadaten pro Eintrag (z. B. @indicator(lookback=...)) liegen in Plugin.meta;
+  'lookback'/'warmup' (Zahl oder Funktion der Parameter) ergeben über requirement()
+  den Warm-up-Bedarf einer Strategie (siehe CompiledStrategy.requirements)
+
+Beispiel (pyproject.toml eines Fremdpakets):
+    [project.entry-points."backtester.indicators"]
+    vwap = "meine_indikatoren.vwap:vwap"
+
+Auflisten und Kaltstart eines Backtest-Workers messen:
+    python registry.py
+    python registry.py --cold-start
+"""
+
+import argparse
+import importlib
+import inspect
+import json
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+Plugin = namedtuple("Plugin", ["name", "func", "meta"])
+
+KINDS = {
+    # Art → (Modul der eingebauten Funktionen, Entry-Point-Gruppe, Bezeichnung für Meldungen)
+    "indicator": ("indicators", "backtester.indicators", "Indikator"),
+    "trigger": ("triggers", "backtester.triggers", "Trigger"),
+}
+
+_plugins = {kind: {} for kind in KINDS}
+_builtins_loaded = set()
+
+# Module, die ein reiner Backtest-Worker nicht laden darf (siehe --cold-start)
+HEAVY_MODULES = ("MetaTrader5", "plotly", "live_trader", "visualizer")
+
+
+# --------------------------------------------------------------- Registrieren
+
+def register(kind, func, name=None, replace=False, **meta):
+    """Trägt eine Funktion ein; ein anderer Eintrag unter demselben Namen braucht replace=True."""
+    name = name or func.__name__
+    existing = _plugins[kind].get(name)
+    if existing is not None and existing.func is not func and not replace:
+        raise ValueError(f"{KINDS[kind][2]} '{name}' ist bereits registriert ({existing.func.__module__})")
+    _plugins[kind][name] = Plugin(name, func, meta)
+    return func
+
+
+def _decorator(kind, name, meta):
+    if callable(name):                      # @indicator ohne Klammern
+        return register(kind, name, **meta)
+
+    def decorate(func):
+        return register(kind, func, name, **meta)
+    return decorate
+
+
+def indicator(name=None, **meta):
+    """Dekorator: @indicator, @indicator("name") oder @indicator(lookback=...)."""
+    return _decorator("indicator", name, meta)
+
+
+def trigger(name=None, **meta):
+    """Dekorator: @trigger, @trigger("name") oder @trigger(lookback=1)."""
+    return _decorator("trigger", name, meta)
+
+
+# ------------------------------------------------------------------ Lookup
+
+def _entry_points(group):
+    from importlib.metadata import entry_points
+    try:
+        return list(entry_points(group=group))
+    except TypeError:                       # Python < 3.10: dict Gruppe → Liste
+        return list(entry_points().get(group, []))
+
+
+def _load_builtins(kind):
+    if kind not in _builtins_loaded:
+        importlib.import_module(KINDS[kind][0])
+        _builtins_loaded.add(kind)
+
+
+def _load_entry_point(kind, name):
+    for ep in _entry_points(KINDS[kind][1]):
+        if ep.name == name:
+            func = ep.load()
+            if name not in _plugins[kind]:  # nicht schon per Dekorator beim Import registriert
+                register(kind, func, name)
+            return True
+    return False
+
+
+def plugin(kind, name):
+    """Plugin-Eintrag zu 'name': erst eingebaute, dann per Entry Point deklarierte Funktionen."""
+    plugins = _plugins[kind]
+    if name not in plugins:
+        _load_builtins(kind)
+    if name not in plugins and not _load_entry_point(kind, name):
+        raise ValueError(f"Unbekannter {KINDS[kind][2]} '{name}' (verfügbar: {', '.join(available(kind))})")
+    return plugins[name]
+
+
+def get_indicator(name):
+    return plugin("indicator", name).func
+
+
+def get_trigger(name):
+    return plugin("trigger", name).func
+
+
+def available(kind):
+    """Alle bekannten Namen (Entry Points werden dafür nicht geladen)."""
+    _load_builtins(kind)
+    return sorted(set(_plugins[kind]) | {ep.name for ep in _entry_points(KINDS[kind][1])})
+
+
+# ----------------------------------------------------------------- Warm-up
+
+def _with_defaults(func, params):
+    """params ergänzt um die Defaults der Funktion (erstes Argument = DataFrame)."""
+    try:
+        bound = inspect.signature(func).bind_partial(None, **params)
+    except TypeError:
+        return dict(params)
+    bound.apply_defaults()
+    return dict(list(bound.arguments.items())[1:])
+
+
+def _bars(value, params):
+    if callable(value):
+        value = value(**params)
+    return max(int(value or 0), 0)
+
+
+def requirement(kind, name, params=None):
+    """
+    (lookback, warmup) eines Eintrags in Bars:
+    - lookback: Bars vor dem ersten gültigen (nicht-NaN) Wert
+    - warmup:   Bars, bis der Wert praktisch nicht mehr vom Beginn der Historie abhängt
+                (EMA & Co.); ohne Angabe gleich lookback
+    Einträge ohne Metadaten (z. B. Fremdpakete) gelten als sofort gültig.
+    """
+    entry = plugin(kind, name)
+    params = _with_defaults(entry.func, params or {}) if kind == "indicator" else {}
+    lookback = _bars(entry.meta.get("lookback"), params)
+    warmup = _bars(entry.meta.get("warmup", lookback), params)
+    return lookback, max(warmup, lookback)
+
+
+# --------------------------------------------------------------- Kaltstart
+
+def measure_cold_start(module="backtester", runs=3):
+    """
+    Importzeit von 'module' in frischen Interpretern (Minimum über 'runs')
+    und welche der HEAVY_MODULES dabei mitgeladen werden.
+    """
+    code = (
+        "import json, sys, time; t = time.perf_counter(); "
+        f"import {module}; "
+        f"print(json.dumps([time.perf_counter() - t, [m for m in {HEAVY_MODULES!r} if m in sys.modules]]))"
+    )
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        seconds, heavy = json.loads(out.stdout.strip().splitlines()[-1])
+        timings.append(seconds)
+    return {"module": module, "seconds": round(min(timings), 4), "heavy_modules": heavy}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Registrierte Indikatoren/Trigger und Kaltstart eines Workers")
+    parser.add_argument("--cold-start", action="store_true", help="Importzeit der Backtest-Module messen")
+    args = parser.parse_args(argv)
+
+    if args.cold_start:
+        failed = False
+        for module in ("backtester", "batch_runner", "optimizer"):
+            result = measure_cold_start(module)
+            heavy = ", ".join(result["heavy_modules"])
+            marker = "❌" if heavy else "✅"
+            failed |= bool(heavy)
+            print(f"{marker} import {module}: {result['seconds'] * 1000:.0f} ms" + (f" – lädt {heavy}" if heavy else ""))
+        return 1 if failed else 0
+
+    import registry   # als Skript ist dies __main__ – registriert wird im importierten Modul
+    start = time.perf_counter()
+    for kind, (_, group, _) in KINDS.items():
+        print(f"{group}: {', '.join(registry.available(kind))}")
+    print(f"⏱️ {(time.perf_counter() - start) * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
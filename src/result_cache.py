@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Ergebnis-Cache für Backtests.
+Schlüssel = Hash aus normalisierter Strategie, Datensatz-Fingerprint, Engine-Version und den
+Backtester-Optionen, die Ergebnisse verändern (RESULT_OPTIONS).
+Pro Eintrag eine komprimierte .npz-Datei (Trades, Metriken, Equity-Kurve),
+Größenbegrenzung über LRU-Eviction (Änderungszeit der Datei = letzter Zugriff).
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from backtester import ENGINE_VERSION, Backtester
+
+OHLC_COLUMNS = ["Open", "High", "Low", "Close", "TickVol", "Vol", "Spread"]
+
+# Backtester-Optionen mit Einfluss auf Trades/Metriken (event_driven und rule_workers ändern nichts)
+RESULT_OPTIONS = ("compact", "price_digits", "mtm_resolution")
+
+
+def normalize_strategy(strategy):
+    """
+    Kanonische JSON-Darstellung (sortierte Keys, ohne Whitespace) –
+    gleiche Strategie ergibt unabhängig von Key-Reihenfolge denselben String.
+    """
+    return json.dumps(strategy, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def dataset_fingerprint(df):
+    """
+    Hash über Index und Basis-Spalten (OHLC, Volumen, Spread).
+    Vom Backtester angehängte Indikator-Spalten fließen nicht ein.
+    """
+    cols = [c for c in OHLC_COLUMNS if c in df.columns]
+    h = hashlib.sha256()
+    h.update(",".join(cols).encode())
+    h.update(str(len(df)).encode())
+    h.update(pd.util.hash_pandas_object(df[cols], index=True).values.tobytes())
+    return h.hexdigest()
+
+
+def _encode(obj):
+    if isinstance(obj, pd.Timestamp):
+        return {"$ts": obj.value}
+    if isinstance(obj, pd.Timedelta):
+        return {"$td": obj.value}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Nicht serialisierbar: {type(obj).__name__}")
+
+
+def _decode(obj):
+    if "$ts" in obj:
+        return pd.Timestamp(obj["$ts"])
+    if "$td" in obj:
+        return pd.Timedelta(obj["$td"])
+    return obj
+
+
+class ResultCache:
+    """
+    Content-adressierter Cache für (Trades, Metriken).
+    Serienwertige Metriken (z. B. 'Equity Curve') werden als Arrays abgelegt,
+    skalare Metriken und Trades als JSON im selben .npz-Container.
+    """
+
+    def __init__(self, cache_dir=".backtest_cache", max_bytes=512 * 1024 ** 2):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key(self, strategy, df, options=None):
+        """
+        options: Backtester-Argumente des Laufs (dict); nur RESULT_OPTIONS mit gesetztem Wert
+        fließen ein – ein Lauf mit Standardoptionen behält seinen Schlüssel.
+        """
+        h = hashlib.sha256()
+        h.update(normalize_strategy(strategy).encode())
+        h.update(dataset_fingerprint(df).encode())
+        h.update(ENGINE_VERSION.encode())
+        relevant = {name: value for name, value in (options or {}).items()
+                    if name in RESULT_OPTIONS and value not in (None, False)}
+        if relevant:
+            h.update(normalize_strategy(relevant).encode())
+        return h.hexdigest()
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.npz"
+
+    def get(self, key):
+        """Gibt (trades, metrics) zurück oder None bei Cache-Miss."""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                payload = json.loads(data["payload"].item(), object_hook=_decode)
+                series = {}
+                for name, index_name in payload["series"].items():
+                    idx = pd.DatetimeIndex(data[f"{name}.index"], name=index_name)
+                    series[name] = pd.Series(data[f"{name}.values"], index=idx)
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            return None
+
+        os.utime(path)  # LRU: Zugriff vermerken
+
+        trades = payload["trades"]
+        metrics = dict(payload["metrics"])
+        metrics.update(series)
+        metrics["Trades"] = [t for t in trades if t.get("exit_time")]
+        return trades, metrics
+
+    def put(self, key, trades, metrics):
+        arrays = {}
+        scalars = {}
+        series_names = {}
+        for name, value in metrics.items():
+            if name == "Trades":
+                continue
+            if isinstance(value, pd.Series):
+                arrays[f"{name}.index"] = value.index.to_numpy()
+                arrays[f"{name}.values"] = value.to_numpy()
+                series_names[name] = value.index.name
+            else:
+                scalars[name] = value
+
+        payload = {"trades": trades, "metrics": scalars, "series": series_names}
+        arrays["payload"] = np.array(json.dumps(payload, default=_encode))
+
+        # Atomar schreiben: erst temporäre Datei, dann umbenennen
+        tmp = self.cache_dir / f"{key}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for path in self.cache_dir.glob("*.npz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        for path in self.cache_dir.glob("*.npz"):
+            path.unlink(missing_ok=True)
+
+
+def cached_backtest(df, strategy, cache=None, **options):
+    """
+    Bibliotheks-Einstieg: liefert (trades, metrics, hit).
+    options gehen an den Backtester (compact, mtm_resolution, price_digits, event_driven, ...)
+    und – soweit sie Ergebnisse verändern – in den Schlüssel.
+    Bei Cache-Miss wird der Backtest ausgeführt und das Ergebnis abgelegt.
+    """
+    cache = cache or ResultCache()
+    key = cache.key(strategy, df, options)
+    cached = cache.get(key)
+    if cached is not None:
+        trades, metrics = cached
+        return trades, metrics, True
+
+    bt = Backtester(df, strategy, **options)
+    trades, _, _, metrics, _ = bt.run_backtest(strategy)
+    cache.put(key, trades, metrics)
+    return trades, metrics, False
@@ -9,13 +9,14 @@ import json
 import signal
 import pandas as pd
 from pathlib import Path
-import MetaTrader5 as mt5
-from backtester import Backtester
-from load_mt5_data import load_data
-from live_trader import LiveTrader
-from visualizer import ChartPlotter
 import sys
 
+# MetaTrader5, LiveTrader und plotly werden erst im jeweiligen Modus importiert:
+# Backtests laufen so ohne MT5 (z. B. auf Linux) und ohne die Importzeit von plotly.
+
+# Ab dieser Bar-Anzahl wird der Chart über chart_server ausgeliefert statt als HTML geschrieben
+CHART_SERVER_BARS = 200_000
+
 def load_strategies_from_dir(dir_path="./strategies"):
     """Scant Verzeichnis nach .json-Dateien und lädt 'strategy'-Dicts."""
     strategies = {}
@@ -42,6 +43,10 @@ def load_strategies_from_dir(dir_path="./strategies"):
     return strategies
 
 def run_backtest():
+    from backtester import Backtester
+    from result_cache import ResultCache
+    from load_mt5_data import load_data
+
     print("Backtest Runner gestartet!")
     
     # 1. CSV-Pfad abfragen
@@ -75,15 +80,25 @@ def run_backtest():
         print("❌ Ungültige Auswahl. Beende.")
         sys.exit(1)
     
-    # 3. Backtest durchführen
-    print("🔄 Starte Backtest...")
-    bt = Backtester(df, strategy)
-    trades, rule_results, signal_data, metrics, resolved_df = bt.run_backtest(strategy)
+    # 3. Backtest durchführen (oder aus dem Ergebnis-Cache laden)
+    cache = ResultCache()
+    cache_key = cache.key(strategy, df)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        print("⚡ Ergebnis aus Cache geladen (Strategie & Daten unverändert)")
+        trades, metrics = cached
+        entry_mgr = None
+    else:
+        print("🔄 Starte Backtest...")
+        bt = Backtester(df, strategy)
+        trades, rule_results, signal_data, metrics, resolved_df = bt.run_backtest(strategy)
+        cache.put(cache_key, trades, metrics)
+        entry_mgr = bt.entry_mgr
     
     # 4. Ergebnisse ausgeben
     print("\n📈 Backtest-Ergebnisse:")
     for k, v in metrics.items():
-        if k in ["Trades", "Equity Curve"]:
+        if k == "Trades" or isinstance(v, pd.Series):   # Equity-/Underwater-Kurve
             continue
         if isinstance(v, float):
             print(f"{k}: {v:.2f}")
@@ -92,27 +107,37 @@ def run_backtest():
     
     # Detaillierte Trades (erste 5)
     print("\n💼 Erste 5 Trades:")
-    trades_df = pd.DataFrame([t for t in trades if t.get("exit_time")])  # Nur abgeschlossene
+    closed = [t for t in trades if t.get("exit_time")]  # Nur abgeschlossene
+    trades_df = pd.DataFrame(closed[:5])
     if not trades_df.empty:
         print(trades_df[['id', 'type', 'entry_time', 'exit_time', 'pnl', 'exit_reason']].head().to_string(index=False))
     else:
         print("Keine abgeschlossenen Trades.")
     
-    # 5. Plot erstellen
-    print("📊 Erstelle Plot...")
-    plotter = ChartPlotter(bt.df, trades)
-    plotter.plot_trades_2(entry_mgr=bt.entry_mgr, show_equity=True)
-    print("✅ Plot gespeichert als 'trade2_plot.html' und geöffnet.")
+    # 5. Plot erstellen (große Datensätze: Zoom-Chart-Server statt einer HTML-Datei)
+    from visualizer import ChartPlotter
+    plotter = ChartPlotter(df, trades)
+    if len(df) > CHART_SERVER_BARS:
+        print(f"📊 {len(df)} Bars – starte Chart-Server (Strg+C beendet)...")
+        plotter.serve(entry_mgr=entry_mgr, equity=metrics.get("Equity Curve"))
+    else:
+        print("📊 Erstelle Plot...")
+        plotter.plot_trades_2(entry_mgr=entry_mgr, show_equity=True)
+        print("✅ Plot gespeichert als 'trade2_plot.html' und geöffnet.")
     
     print("\n✅ Backtest abgeschlossen!")
 
 def signal_handler(sig, frame):
     """Graceful Shutdown für Ctrl+C."""
+    import MetaTrader5 as mt5
     print("\n🛑 LiveTrader gestoppt. MT5-Verbindung trennen...")
     mt5.shutdown()
     sys.exit(0)
 
 def run_live():
+    import MetaTrader5 as mt5
+    from live_trader import LiveTrader
+
     print("🚀 Live Trader Runner gestartet!")
     
     # 1. Strategien laden und auswählen
@@ -127,10 +152,10 @@ def run_live():
         print(f"{i}. {name}: {desc}")
     
     try:
-        choice = int(input("\n🔢 Welche Strategie ausführen? (Nummer): ")) - 1
-        selected_name = list(strategies.keys())[choice]
-        strategy = strategies[selected_name]
-        print(f"✅ Ausgewählte Strategie: {selected_name}")
+        # Mehrere Nummern (z. B. "1,3") → gemeinsamer Datenfeed für alle gewählten Strategien
+        choices = [int(c) - 1 for c in input("\n🔢 Welche Strategie(n) ausführen? (Nummer, mehrere mit Komma): ").split(",")]
+        selected_names = [list(strategies.keys())[c] for c in choices]
+        print(f"✅ Ausgewählte Strategie(n): {', '.join(selected_names)}")
     except (ValueError, IndexError):
         print("❌ Ungültige Auswahl. Beende.")
         sys.exit(1)
@@ -152,9 +177,22 @@ def run_live():
     
     # 4. LiveTrader initialisieren und starten
     try:
-        trader = LiveTrader(strategy, symbol=symbol, timeframe=timeframe)
+        if len(selected_names) > 1:
+            from feed_hub import FeedHub
+            hub = FeedHub()
+            for i, name in enumerate(selected_names):
+                hub.subscribe(LiveTrader(strategies[name], symbol=symbol, timeframe=timeframe, magic=123456 + i))
+            hub.connect()
+            hub.start_metrics()
+            signal.signal(signal.SIGINT, signal_handler)  # Ctrl+C-Handler
+            print(f"\n🔄 Starte gemeinsamen Feed für {len(selected_names)} Strategien auf {symbol}...")
+            hub.start_loop()
+            return
+
+        trader = LiveTrader(strategies[selected_names[0]], symbol=symbol, timeframe=timeframe)
         
         trader.connect()  # MT5-Verbindung nur im Live-Modus
+        trader.start_metrics()  # /metrics auf Port 9108 und live_metrics.jsonl
         
         signal.signal(signal.SIGINT, signal_handler)  # Ctrl+C-Handler
         
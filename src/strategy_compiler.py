@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""
+Strategie-Compiler: übersetzt das Strategie-JSON in einen DAG aus
+Indikator-, Trigger- und Logik-Knoten.
+- gleiche Indikator-Aufrufe und Vergleiche werden nur einmal angelegt (CSE)
+- Konstanten bleiben Skalare (Broadcast statt pd.Series([c] * len(df)))
+- Auswertung in topologischer Reihenfolge, optional mit Indikatoren/Triggern auf einem Thread-Pool
+- Abhängigkeitsbericht pro entry_logic- und exit_config-Eintrag
+- Warm-up-Bedarf der Strategie aus den lookback/warmup-Metadaten der Registry
+"""
+
+import inspect
+import re
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from registry import get_indicator, requirement
+from strategy_core import StrategyLogicParser, _indicator_column, _resolve_trigger, _select_output
+
+RULE_ID_PATTERN = re.compile(r"\b[A-Za-z_][A-Za-z0-9_]*\b")
+
+
+class Node:
+    """
+    Knoten im Ausführungs-DAG.
+    kind: 'indicator' (Funktionsaufruf), 'output' (Auswahl/Spalte), 'const',
+          'trigger' (Regel) oder 'logic' (Ausdruck über Regeln)
+    """
+    def __init__(self, node_id, kind, inputs=(), **attrs):
+        self.id = node_id
+        self.kind = kind
+        self.inputs = list(inputs)
+        self.attrs = attrs
+
+    def __repr__(self):
+        return f"Node({self.id!r}, kind={self.kind!r}, inputs={self.inputs})"
+
+
+def _canonical_params(name, params):
+    """Parameter inkl. Defaults der Indikatorfunktion – {} und {'period': 20} sind gleich, wenn 20 Default ist."""
+    func = get_indicator(name)
+    try:
+        bound = inspect.signature(func).bind_partial(None, **params)
+        bound.apply_defaults()
+        items = list(bound.arguments.items())[1:]  # DataFrame-Argument überspringen
+    except TypeError:
+        items = list(params.items())
+    return tuple(sorted(items))
+
+
+def _format_params(items):
+    return ",".join(f"{k}={v}" for k, v in items)
+
+
+class CompiledStrategy:
+    """
+    DAG einer Strategie. Knoten-IDs sind lesbare, kanonische Beschreibungen,
+    z. B. 'call:rsi(period=14)' (Aufruf), 'rsi(period=14)' (Wert)
+    oder 'above(rsi(period=14), 50)' (Regel).
+    """
+
+    def __init__(self):
+        self.nodes = {}          # Knoten-ID → Node
+        self.rules = {}          # Regel-ID → Trigger-Knoten
+        self.entry_logic = {}    # Logik-ID → Logik-Knoten
+        self.exit_logic = {}     # Exit-ID → Logik-Knoten
+        self._keys = {}          # kanonischer Schlüssel → Knoten-ID
+
+    # ------------------------------------------------------------------ Aufbau
+
+    def _add(self, key, node_id, kind, inputs=(), **attrs):
+        if key in self._keys:
+            return self._keys[key]
+        self.nodes[node_id] = Node(node_id, kind, inputs, **attrs)
+        self._keys[key] = node_id
+        return node_id
+
+    def add_indicator(self, spec):
+        name = spec["indicator"]
+        params = _canonical_params(name, spec.get("params", {}))
+        label = f"{name}({_format_params(params)})"
+        call_id = self._add(("indicator", name, params), f"call:{label}",
+                            "indicator", name=name, params=dict(spec.get("params", {})))
+
+        output = spec.get("output")
+        out_id = self._add(("output", call_id, output),
+                           label if output is None else f"{label}.{output}",
+                           "output", [call_id], specs=[])
+        # Gleiche Werte, ggf. unterschiedliche Spaltennamen → alle Specs merken
+        self.nodes[out_id].attrs["specs"].append(spec)
+        return out_id
+
+    def add_operand(self, operand):
+        if isinstance(operand, dict):
+            return self.add_indicator(operand)
+        return self._add(("const", operand), repr(operand), "const", value=operand)
+
+    def add_rule(self, rule):
+        left = self.add_operand(rule["left"])
+        right = self.add_operand(rule["right"])
+        trigger = rule["trigger"]
+        node_id = self._add(("trigger", trigger, left, right), f"{trigger}({left}, {right})",
+                            "trigger", [left, right], trigger=trigger)
+        self.rules[rule["id"]] = node_id
+        return node_id
+
+    def add_logic(self, expr):
+        """
+        Logik-Ausdruck über Regel-IDs. Regeln, die auf denselben Trigger-Knoten zeigen,
+        machen auch die Ausdrücke gleich (z. B. 'R1 & R3' und 'R5 & R3' bei R1 ≡ R5).
+        """
+        normalized = re.sub(r"\s+", "", expr)
+        canonical = RULE_ID_PATTERN.sub(lambda m: f"[{self.rules.get(m.group(0), m.group(0))}]", normalized)
+        inputs = list(dict.fromkeys(self.rules[r] for r in RULE_ID_PATTERN.findall(normalized) if r in self.rules))
+        return self._add(("logic", canonical), canonical, "logic", inputs, expr=expr)
+
+    # ------------------------------------------------------------- Auswertung
+
+    def topological_order(self):
+        """Kahn-Algorithmus über alle Knoten (stabil in Einfügereihenfolge)."""
+        indegree = {nid: 0 for nid in self.nodes}
+        children = {nid: [] for nid in self.nodes}
+        for node in self.nodes.values():
+            for dep in node.inputs:
+                indegree[node.id] += 1
+                children[dep].append(node.id)
+
+        queue = deque(nid for nid, deg in indegree.items() if deg == 0)
+        order = []
+        while queue:
+            nid = queue.popleft()
+            order.append(nid)
+            for child in children[nid]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    queue.append(child)
+
+        if len(order) != len(self.nodes):
+            raise ValueError("Zyklus im Strategie-DAG")
+        return order
+
+    @staticmethod
+    def output_columns(node, result):
+        """Spaltennamen eines Output-Knotens im DataFrame (einmal pro Name)."""
+        return list(dict.fromkeys(_indicator_column(spec, isinstance(result, dict)) for spec in node.attrs["specs"]))
+
+    def _evaluate_node(self, node, df, values, dtype=None):
+        if node.kind == "const":
+            return node.attrs["value"]
+
+        if node.kind == "indicator":
+            func = get_indicator(node.attrs["name"])
+            return func(df, **node.attrs["params"])
+
+        if node.kind == "output":
+            result = values[node.inputs[0]]
+            series = _select_output(node.attrs["specs"][0], result)
+            if series.ndim == 2:               # Panel: Spalten fügt panel.evaluate_panel gesammelt an
+                return series
+            if dtype is not None and series.dtype.kind == "f":
+                series = series.astype(dtype)
+            # Spalten wie bisher im DataFrame ablegen (einmal pro Spaltenname)
+            for col in self.output_columns(node, result):
+                df[col] = series
+            return series
+
+        if node.kind == "trigger":
+            left, right = (values[i] for i in node.inputs)
+            return _resolve_trigger(node.attrs["trigger"])(left, right)
+
+        if node.kind == "logic":
+            rule_results = {rid: values[nid] for rid, nid in self.rules.items()}
+            return StrategyLogicParser(rule_results).parse_expression(node.attrs["expr"])
+
+        raise ValueError(f"Unbekannter Knotentyp: {node.kind}")
+
+    def evaluate_nodes(self, df, include_logic=False, dtype=None, workers=None, precomputed=None):
+        """
+        Wertet alle Knoten in topologischer Reihenfolge aus → dict Knoten-ID → Wert.
+        dtype (z. B. np.float32) legt den Typ der Indikator-Ausgaben fest.
+        workers > 1: Indikator- und Trigger-Knoten laufen parallel (siehe _evaluate_parallel).
+        precomputed: Indikator-Knoten-ID ('call:rsi(period=14)') → bereits berechnetes Ergebnis
+                     auf dem Index von df (z. B. aus indicators_batch.variants)
+        """
+        if workers is not None and workers > 1:
+            return self._evaluate_parallel(df, include_logic, dtype, workers, precomputed or {})
+
+        precomputed = precomputed or {}
+        values = {}
+        for nid in self.topological_order():
+            node = self.nodes[nid]
+            if node.kind == "logic" and not include_logic:
+                continue
+            if nid in precomputed:
+                values[nid] = precomputed[nid]
+                continue
+            values[nid] = self._evaluate_node(node, df, values, dtype)
+        return values
+
+    def _evaluate_parallel(self, df, include_logic, dtype, workers, precomputed):
+        """
+        Indikator-Aufrufe (alle unabhängig) und Trigger laufen auf einem Thread-Pool –
+        die NumPy-/pandas-Kernels geben dabei die GIL frei. Die Indikatoren lesen einen
+        flachen Schnappschuss von df; Output-Knoten (Spalten in df schreiben) und Logik
+        bleiben im aufrufenden Thread und laufen in topologischer Reihenfolge.
+        Ergebnis und Spaltenreihenfolge in df sind damit dieselben wie sequenziell.
+        """
+        order = self.topological_order()
+        snapshot = df.copy(deep=False)
+        values = {}
+
+        def resolve(nid):
+            if isinstance(values[nid], Future):
+                values[nid] = values[nid].result()
+            return values[nid]
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rules") as pool:
+            for nid in order:
+                node = self.nodes[nid]
+                if nid in precomputed:
+                    values[nid] = precomputed[nid]
+                elif node.kind == "indicator":
+                    values[nid] = pool.submit(self._evaluate_node, node, snapshot, values, dtype)
+
+            for nid in order:
+                node = self.nodes[nid]
+                if node.kind == "indicator":
+                    continue
+                inputs = {dep: resolve(dep) for dep in node.inputs}
+                if node.kind == "trigger":
+                    values[nid] = pool.submit(self._evaluate_node, node, snapshot, inputs, dtype)
+                elif node.kind == "logic":
+                    if include_logic:
+                        for rule_nid in self.rules.values():
+                            resolve(rule_nid)
+                        values[nid] = self._evaluate_node(node, df, values, dtype)
+                else:
+                    values[nid] = self._evaluate_node(node, df, values, dtype)
+
+            for nid in order:
+                if nid in values:
+                    resolve(nid)
+        return {nid: values[nid] for nid in order if nid in values}
+
+    def evaluate(self, df, dtype=None, workers=None, precomputed=None):
+        """Liefert wie evaluate_rules ein Dict: Regel-ID → pd.Series[bool]"""
+        values = self.evaluate_nodes(df, dtype=dtype, workers=workers, precomputed=precomputed)
+        return {rule_id: values[nid] for rule_id, nid in self.rules.items()}
+
+    # --------------------------------------------------------------- Bericht
+
+    def _closure(self, node_id):
+        needed = set()
+        stack = [node_id]
+        while stack:
+            nid = stack.pop()
+            if nid in needed:
+                continue
+            needed.add(nid)
+            stack.extend(self.nodes[nid].inputs)
+        return [nid for nid in self.topological_order() if nid in needed]
+
+    def dependencies(self):
+        """
+        Welche Knoten braucht jeder entry_logic- bzw. exit_config-Eintrag?
+        Rückgabe: {'entry_logic': {ID: [Knoten...]}, 'exit_config': {ID: [Knoten...]}}
+        """
+        return {
+            "entry_logic": {lid: self._closure(nid) for lid, nid in self.entry_logic.items()},
+            "exit_config": {eid: self._closure(nid) for eid, nid in self.exit_logic.items()},
+        }
+
+    def requirements(self):
+        """
+        Warm-up-Bedarf in Bars (Maximum über alle Regeln, Trigger-Vorwerte eingerechnet):
+        - 'lookback': Bars, bevor alle Regeln auf gültigen (nicht-NaN) Indikatorwerten beruhen
+                      → ein Backtest kann die Simulation erst dort beginnen
+        - 'warmup':   Bars, bis auch EMA-artige Indikatoren nicht mehr vom Historienbeginn abhängen
+        - 'bars':     Historienlänge, um die letzte Bar wie im Backtest auszuwerten (Live-Abruf)
+        """
+        lookback = warmup = 0
+        for nid in self.rules.values():
+            node = self.nodes[nid]
+            shift = requirement("trigger", node.attrs["trigger"])[0]
+            for operand in node.inputs:
+                if self.nodes[operand].kind != "output":
+                    continue
+                call = self.nodes[self.nodes[operand].inputs[0]]
+                bars = requirement("indicator", call.attrs["name"], call.attrs["params"])
+                lookback = max(lookback, bars[0] + shift)
+                warmup = max(warmup, bars[1] + shift)
+        return {"lookback": lookback, "warmup": warmup, "bars": warmup + 1}
+
+    def describe(self):
+        lines = []
+        for nid in self.topological_order():
+            node = self.nodes[nid]
+            deps = f" ← {', '.join(node.inputs)}" if node.inputs else ""
+            lines.append(f"[{node.kind}] {nid}{deps}")
+        return "\n".join(lines)
+
+
+def compile_strategy(strategy):
+    """
+    Baut den DAG aus 'rules', 'entry_logic' und 'exit_config' einer Strategie.
+    Die Reihenfolge der Regel-IDs in evaluate() entspricht der in strategy['rules'].
+    """
+    compiled = CompiledStrategy()
+
+    for rule in strategy.get("rules", []):
+        compiled.add_rule(rule)
+
+    for entry in strategy.get("entry_logic", []):
+        logic_id = entry.get("ID", f"{entry['signal']}_anonymous")
+        compiled.entry_logic[logic_id] = compiled.add_logic(entry["when"])
+
+    exit_config = strategy.get("exit_config") or {}
+    for logic in exit_config.get("logic", []):
+        compiled.exit_logic[logic.get("ID", "custom_exit")] = compiled.add_logic(logic["when"])
+
+    trailing = exit_config.get("trailing") or {}
+    if trailing.get("trigger") == "custom" and trailing.get("when"):
+        compiled.exit_logic["trailing"] = compiled.add_logic(trailing["when"])
+
+    return compiled
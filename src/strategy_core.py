@@ -1,55 +1,60 @@
 import pandas as pd
 import re
-import indicators
-import triggers
+from registry import get_indicator, get_trigger
+from bitmask import MaskSet, PackedMask
 
 
-def _resolve_indicator(df, spec):
+def _indicator_column(spec, multi_output):
+    """Spaltenname, unter dem ein Indikator-Ergebnis im DataFrame abgelegt wird."""
     name = spec["indicator"]
     params = spec.get("params", {})
-    output_key = spec.get("output")          # z. B. "UpperBand"
     column_name = spec.get("column")         # optional: benutzerdefinierter Spaltenname
 
-    func = getattr(indicators, name)
-    result = func(df, **params)
+    if multi_output:
+        return column_name or f"{name}_{spec.get('output')}_{'_'.join(str(p) for p in params.values())}"
+
+    # Einzelwert (z. B. EMA)
+    return column_name or f"{name}_{'_'.join(str(p) for p in params.values())}"
+
 
-    if isinstance(result, dict):
-        if output_key is None:
-            raise ValueError(f"Indikator '{name}' liefert mehrere Werte – bitte 'output' angeben")
-        if output_key not in result:
-            raise ValueError(f"'{output_key}' nicht gefunden in Ergebnis von '{name}'")
+def _select_output(spec, result):
+    """Wählt bei Multi-Output-Indikatoren (dict) den Wert zu 'output' aus."""
+    if not isinstance(result, dict):
+        return result
+
+    name = spec["indicator"]
+    output_key = spec.get("output")          # z. B. "UpperBand"
+    if output_key is None:
+        raise ValueError(f"Indikator '{name}' liefert mehrere Werte – bitte 'output' angeben")
+    if output_key not in result:
+        raise ValueError(f"'{output_key}' nicht gefunden in Ergebnis von '{name}'")
+    return result[output_key]
 
-        col = column_name or f"{name}_{output_key}_{'_'.join(str(p) for p in params.values())}"
-        df[col] = result[output_key]
-        return df[col]
 
-    # Einzelwert (z. B. EMA)
-    col = column_name or f"{name}_{'_'.join(str(p) for p in params.values())}"
-    df[col] = result
+def _resolve_indicator(df, spec):
+    func = get_indicator(spec["indicator"])
+    result = func(df, **spec.get("params", {}))
+
+    col = _indicator_column(spec, isinstance(result, dict))
+    df[col] = _select_output(spec, result)
     return df[col]
 
 
 
 def _resolve_trigger(name):
-    return getattr(triggers, name)
+    return get_trigger(name)
 
 
 
-def evaluate_rules(df, rules):
+def evaluate_rules(df, rules, workers=None):
     """
     Liefert ein Dict: Regel-ID → pd.Series[bool]
+    Gleiche Indikatoren und Vergleiche werden über den kompilierten DAG nur einmal berechnet.
+    workers > 1 wertet unabhängige Indikatoren/Trigger auf einem Thread-Pool aus (gleiches Ergebnis).
     """
-    rule_results = {}
-    for rule in rules:
-        rule_id = rule["id"]
-        left = _resolve_indicator(df, rule["left"])
-        right = (
-            _resolve_indicator(df, rule["right"]) if isinstance(rule["right"], dict)
-            else rule["right"]
-        )
-        cond = _resolve_trigger(rule["trigger"])(left, right)
-        rule_results[rule_id] = cond
-    return rule_results
+    from strategy_compiler import compile_strategy
+
+    return compile_strategy({"rules": rules}).evaluate(df, workers=workers)
 
 
 
@@ -58,6 +63,7 @@ class StrategyLogicParser:
         self.rule_results = rule_results
 
     def parse_expression(self, expr: str) -> pd.Series:
+        """Logikausdruck über Regel-IDs; Regelergebnisse als Series, PackedMask oder Panel-DataFrame."""
         allowed = re.compile(r"^[A-Za-z0-9_~&|() \t]+$")
         if not allowed.match(expr.replace(" ", "")):
             raise ValueError("Ungültige Zeichen im Logikausdruck")
@@ -73,7 +79,7 @@ class StrategyLogicParser:
         python_expr = python_expr.replace("&", " & ").replace("|", " | ").replace("~", "~")
 
         result = eval(python_expr)
-        if not isinstance(result, pd.Series):
+        if not isinstance(result, (pd.Series, pd.DataFrame, PackedMask)):
             raise ValueError("Ausdruck ergibt kein gültiges Ergebnis")
         return result
 
@@ -84,44 +90,39 @@ def resolve_signal_conflicts(signal_frames):
     Erkennt Konflikte zwischen beliebigen Logikpfaden.
     Gibt ein DataFrame mit resolveden Signalen pro Tick zurück.
     Eintrag nur, wenn exakt eine Logikregel aktiv ist.
+    Vektorisiert: Anzahl aktiver Logiken pro Bar, Auswahl der einzigen aktiven per argmax.
     """
+    import numpy as np
     import pandas as pd
 
     logic_ids = list(signal_frames.keys())
     index = next(iter(signal_frames.values())).index
-    resolved_df = pd.DataFrame(index=index, columns=["logic_id", "signal", "sl", "tp"])
-
-    for time in index:
-        active_entries = []
-
-        for logic_id in logic_ids:
-            row = signal_frames[logic_id].loc[time]
-            if row["active"]:
-                active_entries.append({
-                    "logic_id": logic_id,
-                    "signal": row["signal"],
-                    "sl": row["sl"],
-                    "tp": row["tp"]
-                })
-
-        # ✅ Nur wenn exakt eine Logik aktiv ist
-        if len(active_entries) == 1:
-            entry = active_entries[0]
-            resolved_df.loc[time] = [
-                entry["logic_id"],
-                entry["signal"],
-                entry["sl"],
-                entry["tp"]
-            ]
-        else:
-            resolved_df.loc[time] = [None, None, None, None]
+    active = np.column_stack([signal_frames[lid]["active"].to_numpy().astype(bool) for lid in logic_ids])
+    single = active.sum(axis=1) == 1
+    which = active.argmax(axis=1)
+
+    rows = np.flatnonzero(single)
+    picked = which[rows]
+
+    # ✅ Nur wenn exakt eine Logik aktiv ist
+    columns = {col: np.full(len(index), None, dtype=object) for col in ["logic_id", "signal", "sl", "tp"]}
+    for k, logic_id in enumerate(logic_ids):
+        sel = rows[picked == k]
+        if not len(sel):
+            continue
+        frame = signal_frames[logic_id]
+        columns["logic_id"][sel] = logic_id
+        for col in ("signal", "sl", "tp"):
+            # list(...) behält die Skalar-Typen der Quellspalte (wie .loc)
+            columns[col][sel] = list(frame[col].to_numpy()[sel])
+    resolved_df = pd.DataFrame(columns, index=index, dtype=object)
 
     return resolved_df
 
 
 
 
-def evaluate_signals(rule_results, logic_list):
+def evaluate_signals(rule_results, logic_list, packed=False):
     """
     Bewertet Entry-Logiken aus der Strategie-Definition:
     - erstellt pro Signal eine Matrix mit 'active', 'sl', 'tp'
@@ -129,25 +130,37 @@ def evaluate_signals(rule_results, logic_list):
     - erstellt Regelmasken (dict + DataFrame)
     - erstellt Logikmasken pro Logik-ID
     - erstellt Regel-Signal-Matrix pro Kombination 'Lx:Rx'
+
+    packed=True: Regel- und Logikmasken als PackedMask (8 Bars/Byte) in MaskSets statt
+    bool-DataFrames; &, |, ~ laufen auf den gepackten Bytes, 'Lx:Rx' verweist auf
+    dieselben Regelmasken statt Kopien. Entpackt wird nur 'active' für die Konfliktauflösung.
     """
+    index = next(iter(rule_results.values())).index
+    if packed:
+        rule_results = {rule_id: mask if isinstance(mask, PackedMask) else PackedMask.from_series(mask)
+                        for rule_id, mask in rule_results.items()}
+
     parser = StrategyLogicParser(rule_results)
     signals = {}
     signal_frames = {}
-    tracked_rules = {}
-    index = next(iter(rule_results.values())).index
 
     # 📦 Regelmasken vorbereiten (dict + DataFrame)
-    rule_mask_df = pd.DataFrame(index=index)
-    for rule_id, mask in rule_results.items():
-        bool_mask = mask.astype(bool)
-        tracked_rules[rule_id] = bool_mask
-        rule_mask_df[rule_id] = bool_mask
+    if packed:
+        tracked_rules = MaskSet(index, rule_results)
+        rule_mask_df = tracked_rules
+    else:
+        tracked_rules = {}
+        rule_mask_df = pd.DataFrame(index=index)
+        for rule_id, mask in rule_results.items():
+            bool_mask = mask.astype(bool)
+            tracked_rules[rule_id] = bool_mask
+            rule_mask_df[rule_id] = bool_mask
 
     # 📦 Logikmasken vorbereiten
-    logic_mask_df = pd.DataFrame(index=index)
+    logic_mask_df = MaskSet(index) if packed else pd.DataFrame(index=index)
 
     # 📦 Regel-Signal-Matrix vorbereiten
-    rule_signal_df = pd.DataFrame(index=index)
+    rule_signal_df = MaskSet(index) if packed else pd.DataFrame(index=index)
 
     # 📦 Signal-Matrix pro Signaltyp
     for entry in logic_list:
@@ -167,20 +180,20 @@ def evaluate_signals(rule_results, logic_list):
         # Signal-Matrix pro Tick mit SL/TP
         signal_df = pd.DataFrame(index=index)
         signal_df["signal"] = signal
-        signal_df["active"] = mask
+        signal_df["active"] = mask.unpack() if packed else mask
         signal_df["sl"] = sl
         signal_df["tp"] = tp
         signal_frames[logic_id] = signal_df
 
         # Logik-Matrix pro Logik-ID
-        logic_mask_df[logic_id] = mask.astype(bool)
+        logic_mask_df[logic_id] = mask if packed else mask.astype(bool)
 
-        # Regeln extrahieren (z. B. aus "R1 & ~R2")
+        # Regeln extrahieren (z. B. aus "R1 & ~R2")
         rule_ids = set(re.findall(r"\b[A-Za-z_][A-Za-z0-9_]*\b", expr))
         for rule_id in rule_ids:
             if rule_id in rule_results:
                 col_name = f"{logic_id}:{rule_id}"
-                rule_signal_df[col_name] = rule_results[rule_id].astype(bool)
+                rule_signal_df[col_name] = rule_results[rule_id] if packed else rule_results[rule_id].astype(bool)
     
     resolved = resolve_signal_conflicts(signal_frames)
 
@@ -207,20 +220,26 @@ def evaluate_signals(rule_results, logic_list):
 
 import pandas as pd
 
-def evaluate_live_row(df, rules, logic_list):
+def evaluate_live_row(df, rules, logic_list, rule_results=None):
     """
     Für LiveTrading: bewertet die letzte Zeile der Regeln und gibt ggf. ein Signal zurück.
     Unterstützt Trigger mit .shift()-Logik (z. B. crosses_above).
+    rule_results (optional): bereits ausgewertete Regeln (Regel-ID → Series, z. B. vom FeedHub) –
+    dann wird nur deren letzte Zeile gelesen.
     """
     if df.empty:
         print("⚠️ Leerer DataFrame – keine Bewertung möglich")
         return None
 
+    evaluated = rule_results or {}
     rule_results = {}
 
     # Regeln bewerten
     for rule in rules:
         rule_id = rule["id"]
+        if rule_id in evaluated:
+            rule_results[rule_id] = evaluated[rule_id].iloc[-1]
+            continue
 
         # Indikatoren berechnen → Series zurückgeben
         left_series = _resolve_indicator(df, rule["left"])
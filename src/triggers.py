@@ -4,15 +4,24 @@ Created on Sun Jun 29 13:55:41 2025
 
 @author: hjzfuz
 """
+from registry import trigger
 
+def _prev(x):
+    # Konstanten bleiben Skalare (Broadcast) – ihr Vorwert ist der Wert selbst
+    return x.shift(1) if hasattr(x, "shift") else x
+
+@trigger(lookback=1)     # braucht den Vorwert
 def crosses_above(a, b):
-    return (a.shift(1) < b.shift(1)) & (a >= b)
+    return (_prev(a) < _prev(b)) & (a >= b)
 
+@trigger(lookback=1)
 def crosses_below(a, b):
-    return (a.shift(1) > b.shift(1)) & (a <= b)
+    return (_prev(a) > _prev(b)) & (a <= b)
 
+@trigger
 def above(a, b):
     return a > b
 
+@trigger
 def below(a, b):
     return a < b
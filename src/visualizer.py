@@ -7,6 +7,11 @@ class ChartPlotter:
     def __init__(self, df, trades):
         self.df = df
         self.trades = trades
+
+    def serve(self, entry_mgr=None, equity=None, port=8050, max_points=2000):
+        """Zoom-Chart über einen lokalen HTTP-Server (für Datensätze, die als HTML zu groß sind)."""
+        from chart_server import ChartServer
+        ChartServer(self.df, self.trades, entry_mgr, equity, max_points=max_points).serve(port)
     
     def plot_trades_plotly(self, price_field="Close", title="Trades mit Plotly"):
         
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""Gemeinsame Fixtures – die Module in src/ importieren sich flach (wie beim Start aus src/)."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+DATA_FILE = SRC / "data" / "EURUSD_H1.csv"
+STRATEGY_FILES = sorted((SRC / "strategies").glob("*.json"))
+
+
+def load_strategy(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("strategy", data)
+
+
+@pytest.fixture(scope="session")
+def eurusd():
+    from load_mt5_data import load_data
+    return load_data.metatrader_csv(str(DATA_FILE))
+
+
+@pytest.fixture(params=STRATEGY_FILES, ids=lambda path: path.stem)
+def strategy(request):
+    return load_strategy(request.param)
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import shutil
+
+import pandas as pd
+import pytest
+
+import batch_runner
+from conftest import DATA_FILE, STRATEGY_FILES
+
+
+def test_run_batch_headless(tmp_path):
+    out = tmp_path / "out"
+    table = batch_runner.run_batch([str(p) for p in STRATEGY_FILES], [str(DATA_FILE)], out, workers=1)
+    assert len(table) == len(STRATEGY_FILES)
+    assert (table["status"] == "ok").all(), table["status"].tolist()
+    assert (table["dataset"] == DATA_FILE.name).all()
+
+    written = pd.read_csv(out / "metrics.csv")
+    assert written["Total Trades"].tolist() == table["Total Trades"].tolist()
+    for name in table["strategy"]:
+        run_dir = out / "runs" / f"{name}__{DATA_FILE.stem}"
+        trades = pd.read_csv(run_dir / "trades.csv")
+        assert len(trades) == table.loc[table["strategy"] == name, "Total Trades"].item()
+
+
+def test_duplicate_dataset_names_are_rejected(tmp_path):
+    for folder in ("a", "b"):
+        (tmp_path / folder).mkdir()
+        shutil.copy(DATA_FILE, tmp_path / folder / DATA_FILE.name)
+    with pytest.raises(ValueError, match=DATA_FILE.stem):
+        batch_runner.run_batch([str(STRATEGY_FILES[0])], [str(tmp_path / "*" / "*.csv")], tmp_path / "out")
+
+
+def test_worker_keeps_only_the_current_dataset(tmp_path, monkeypatch):
+    loaded = []
+    monkeypatch.setattr(batch_runner.load_data, "metatrader_csv", lambda path: loaded.append(path) or path)
+    monkeypatch.setattr(batch_runner, "_DATASET", {})
+    for path in ["a.csv", "a.csv", "b.csv", "b.csv"]:
+        batch_runner._dataset(path)
+    assert loaded == ["a.csv", "b.csv"]
+    assert list(batch_runner._DATASET) == ["b.csv"]
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+import operator
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bitmask import MaskSet, PackedMask
+
+LEFT = [True, False, True, True, False, True, False, False, True]
+RIGHT = [True, True, False, True, False, False, True, False, True]
+
+
+@pytest.mark.parametrize("op", [operator.and_, operator.or_, operator.xor])
+def test_mask_as_right_operand(op):
+    series = pd.Series(LEFT)
+    mask = PackedMask.from_bool(RIGHT)
+    expected = op(np.array(LEFT), np.array(RIGHT))
+    for left in (series, series.to_numpy()):
+        result = op(left, mask)
+        assert isinstance(result, PackedMask)
+        np.testing.assert_array_equal(result.unpack(), expected)
+        np.testing.assert_array_equal(op(mask, left).unpack(), expected)
+
+
+def test_invert_keeps_padding_clear():
+    mask = ~PackedMask.from_bool(LEFT)
+    assert mask.count() == LEFT.count(False)
+
+
+def test_maskset_roundtrip(tmp_path):
+    index = pd.date_range("2024-01-01", periods=len(LEFT), freq="h")
+    masks = MaskSet(index, {"L1": PackedMask.from_bool(LEFT, index)})
+    masks.save(tmp_path / "masks.npz")
+    loaded = MaskSet.load(tmp_path / "masks.npz")
+    pd.testing.assert_frame_equal(loaded.to_frame(), masks.to_frame(), check_freq=False)
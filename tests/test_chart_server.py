@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+from chart_server import ChartServer, OHLCPyramid
+
+
+def test_pyramid_levels_aggregate_blocks(eurusd):
+    df = eurusd.iloc[:5000]
+    equity = pd.Series(np.arange(len(df), dtype=float), index=df.index)
+    pyramid = OHLCPyramid(df, equity)
+    assert [step for step, _, _ in pyramid.levels] == [1, 4, 16]
+
+    step, times, columns = pyramid.levels[2]
+    groups = np.arange(len(df)) // step
+    expected = df.groupby(groups).agg({"Open": "first", "High": "max", "Low": "min", "Close": "last"})
+    np.testing.assert_array_equal(times, df.index.to_numpy()[::step])
+    for col in expected:
+        np.testing.assert_array_equal(columns[col], expected[col].to_numpy())
+    np.testing.assert_array_equal(columns["Equity"], equity.groupby(groups).last().to_numpy())
+
+
+def test_select_bounds_and_level(eurusd):
+    df = eurusd.iloc[:5000]
+    pyramid = OHLCPyramid(df)
+    assert pyramid.bounds == (df.index[0], df.index[-1])
+
+    # Ausschnitt auf Bar-Zeiten: eine Kerze davor, Ende inklusive, feinste Stufe
+    start, end = df.index[1000], df.index[1499]
+    step, times, columns = pyramid.select(start, end, max_points=600)
+    assert step == 1
+    assert times[0] == df.index[999].to_datetime64() and times[-1] == end.to_datetime64()
+    np.testing.assert_array_equal(columns["Close"], df["Close"].iloc[999:1500].to_numpy())
+
+    # zu viele Kerzen → nächste Stufe mit höchstens max_points
+    step, times, _ = pyramid.select(start, end, max_points=100)
+    assert step == 16 and len(times) <= 100
+    assert times[0] <= start.to_datetime64() and times[-1] <= end.to_datetime64()
+
+    # Zeitraum über die Daten hinaus: am Rand abgeschnitten, gröbste Stufe als Untergrenze
+    step, times, _ = pyramid.select(df.index[0] - pd.Timedelta(days=30), df.index[-1] + pd.Timedelta(days=30), 10)
+    assert step == 16 and len(times) == len(pyramid.levels[-1][1])
+
+
+def test_range_payload_trades_overlap_window(eurusd, strategy):
+    from backtester import Backtester
+
+    df = eurusd.iloc[:5000].copy()
+    trades, _, _, metrics, _ = Backtester(df.copy(), strategy, progress=False).run_backtest(strategy)
+    closed = [t for t in trades if t.get("exit_time") is not None]
+    chart = ChartServer(df, trades, equity=metrics["Equity Curve"], max_points=600)
+
+    overview = chart.range_payload()
+    assert overview["trades_total"] == len(closed)
+    assert overview["bars_per_candle"] == 16 and len(overview["time"]) == len(overview["equity"])
+
+    start, end = df.index[2000], df.index[2499]
+    payload = chart.range_payload(str(start), str(end))
+    expected = [t["id"] for t in closed if t["entry_time"] <= end and t["exit_time"] >= start]
+    assert payload["trades_total"] == len(expected)
+    assert sorted(t["id"] for t in payload["trades"]) == sorted(expected)
+    assert payload["time"][0] == df.index[1999].isoformat() and payload["time"][-1] == end.isoformat()
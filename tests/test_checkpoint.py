@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from backtester import Backtester
+
+SPLIT = 4000
+
+
+def _summary(metrics, after=None):
+    trades = [(t["id"], t["entry_time"], t["exit_time"], t["exit_price"], round(t["pnl"], 6))
+              for t in metrics["Trades"] if after is None or t["exit_time"] > after]
+    return round(metrics["Final Balance"], 2), trades
+
+
+@pytest.mark.parametrize("limits", [None, {"max_drawdown": 0.99}], ids=["ohne_limits", "max_drawdown"])
+def test_resume_equals_full_run(eurusd, strategy, limits, tmp_path):
+    full = Backtester(eurusd.copy(), strategy).run_backtest(strategy, limits=limits)[3]
+
+    first = Backtester(eurusd.iloc[:SPLIT].copy(), strategy)
+    first.run_backtest(strategy, limits=limits)
+    checkpoint = tmp_path / "checkpoint.npz"
+    first.save_checkpoint(checkpoint)
+
+    resumed = Backtester(eurusd.copy(), strategy).run_backtest(strategy, limits=limits, resume_from=str(checkpoint))[3]
+    last_time = eurusd.index[SPLIT - 1]
+    assert _summary(resumed) == _summary(full, after=last_time)
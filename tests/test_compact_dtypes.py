@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+from compact_dtypes import compact_ohlc, price_digits, restore_prices, verify_compact
+
+
+def test_price_digits_from_float64_and_float32():
+    for digits, values in [(5, [1.12345, 1.1, 1.23456]), (3, [151.234, 150.1]), (2, [2345.67, 2000.5])]:
+        series = pd.Series(values)
+        assert price_digits(series) == digits
+        assert price_digits(series.astype(np.float32)) == digits
+
+
+def test_restore_prices_exact_for_non_5_digit_symbols():
+    source = pd.Series([151.234, 2345.67, 0.98765])
+    for digits, value in zip((3, 2, 5), source):
+        restored = restore_prices(pd.Series([value]).astype(np.float32), digits)
+        assert restored.iloc[0] == value
+
+
+def test_compact_ohlc_keeps_float64_when_float32_is_too_coarse():
+    df = pd.DataFrame({"Close": [1234567.89, 1234567.91]})
+    assert compact_ohlc(df, digits=2)["Close"].dtype == np.float64
+    assert compact_ohlc(df)["Close"].dtype == np.float32
+
+
+def test_verify_compact_3_digit_sample(eurusd, strategy):
+    df = eurusd.iloc[:2000]
+    ok, deviations = verify_compact(df, strategy, rtol=0, atol=1e-9, digits=3)
+    assert ok, deviations
+
+
+def test_compact_backtester_restores_3_digit_prices(eurusd, strategy):
+    from backtester import Backtester
+
+    df = eurusd.iloc[:2000].copy()
+    for col in ["Open", "High", "Low", "Close"]:
+        df[col] = (df[col] * 100).round(3)
+    bt = Backtester(df.copy(), strategy, compact=True)
+    assert bt.price_digits == 3
+    pd.testing.assert_series_equal(bt._close_prices(), df["Close"])
+
+
+def test_compact_trades_match_float64_prices(eurusd, strategy):
+    from backtester import Backtester
+
+    columns = ["id", "type", "entry_time", "entry_price", "sl", "tp", "exit_time", "exit_price", "exit_reason"]
+    trades = {}
+    for compact in (False, True):
+        bt = Backtester(eurusd.copy(), strategy, compact=compact)
+        trades[compact] = pd.DataFrame(bt.run_backtest(strategy)[0])[columns]
+    assert len(trades[False]) > 0
+    pd.testing.assert_frame_equal(trades[True], trades[False], check_dtype=False, check_exact=True)
+
+
+def test_compact_signal_levels_are_exact():
+    from compact_dtypes import compact_signals
+    from entry_manager import EntryManager
+
+    index = pd.date_range("2024-01-01", periods=2, freq="h")
+    resolved = pd.DataFrame({"logic_id": ["L1", None], "signal": ["buy", None],
+                             "sl": [100, None], "tp": [200, None]}, index=index, dtype=object)
+    row = compact_signals(resolved).iloc[0]
+    manager = EntryManager(exit_config={})
+    position = {"entry_price": 1.09671, "type": "buy"}
+    expected = manager.levels(dict(position, sl=100, tp=200))
+    assert manager.levels(dict(position, sl=row["sl"], tp=row["tp"])) == expected
+    assert expected[1] == 1.09871
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+import dataset_store
+from dataset_store import DatasetStore
+
+
+def _is_mapped(array):
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def test_ingest_and_ranged_load(tmp_path, eurusd):
+    store = DatasetStore(tmp_path)
+    store.ingest("EURUSD", eurusd)
+    pd.testing.assert_frame_equal(store.load("EURUSD"), eurusd, check_freq=False)
+    start, end = eurusd.index[1000], eurusd.index[4000]
+    pd.testing.assert_frame_equal(store.load("EURUSD", start, end), eurusd.loc[start:end], check_freq=False)
+
+
+def test_single_partition_load_is_not_copied(tmp_path, eurusd):
+    store = DatasetStore(tmp_path)
+    store.ingest("EURUSD", eurusd)
+    month = eurusd.index[2000].strftime("%Y-%m")
+    part = eurusd[eurusd.index.strftime("%Y-%m") == month]
+    df = store.load("EURUSD", part.index[0], part.index[-1])
+    pd.testing.assert_frame_equal(df, part, check_freq=False)
+    assert _is_mapped(df["Close"].to_numpy())
+
+
+def test_append_replaces_partitions_and_cleans_up(tmp_path, eurusd):
+    store = DatasetStore(tmp_path, retire_seconds=0)
+    store.ingest("EURUSD", eurusd.iloc[:1000])
+    store.append("EURUSD", eurusd.iloc[900:1500])
+    pd.testing.assert_frame_equal(store.load("EURUSD"), eurusd.iloc[:1500], check_freq=False)
+    dirs = {path.name for path in (tmp_path / "EURUSD").iterdir() if path.is_dir()}
+    assert dirs == {meta["dir"] for meta in store.partitions("EURUSD").values()}
+
+
+def test_load_between_file_writes_sees_one_version(tmp_path, eurusd, monkeypatch):
+    """Lädt nach jeder einzelnen Datei, die ingest schreibt: nie eine Mischung aus altem und neuem Stand."""
+    store = DatasetStore(tmp_path)
+    store.ingest("EURUSD", eurusd.iloc[:1500])
+    revised = eurusd.iloc[1000:1600].copy()
+    revised["Close"] += 0.001                # korrigierte Bars in bestehenden Monaten
+    start, end = eurusd.index[900], eurusd.index[1599]
+    before = store.load("EURUSD", start, end).copy()
+    after = pd.concat([eurusd.iloc[:1000], revised]).loc[start:end]
+
+    snapshots = []
+    save = np.save
+
+    def save_and_load(*args, **kwargs):
+        save(*args, **kwargs)
+        snapshots.append(store.load("EURUSD", start, end).copy())
+
+    monkeypatch.setattr(dataset_store.np, "save", save_and_load)
+    store.ingest("EURUSD", revised)
+    monkeypatch.undo()
+
+    assert snapshots
+    for snapshot in snapshots:
+        assert snapshot.equals(before) or snapshot.equals(after)
+    pd.testing.assert_frame_equal(store.load("EURUSD", start, end), after, check_freq=False)
+
+
+def _append_steps(root, frame, head, steps, size):
+    store = DatasetStore(root)
+    for stop in range(head, head + steps * size, size):
+        store.append("EURUSD", frame.iloc[stop:stop + size])
+
+
+def test_load_during_append(tmp_path, eurusd):
+    """Ein zweiter Prozess hängt an, während hier der gerade neu geschriebene Bereich geladen wird."""
+    store = DatasetStore(tmp_path)
+    head, steps, size = 1500, 150, 3
+    frame = eurusd.iloc[:head + steps * size]
+    store.ingest("EURUSD", frame.iloc[:head])
+    start, end = frame.index[head - 300], frame.index[head - 1]
+    expected = frame.loc[start:end]
+
+    writer = multiprocessing.get_context("spawn").Process(
+        target=_append_steps, args=(tmp_path, frame, head, steps, size))
+    writer.start()
+    loads = 0
+    try:
+        while writer.is_alive() or loads == 0:
+            pd.testing.assert_frame_equal(store.load("EURUSD", start, end), expected, check_freq=False)
+            tail = store.load("EURUSD", start)
+            pd.testing.assert_frame_equal(tail, frame.loc[tail.index], check_freq=False)
+            loads += 1
+    finally:
+        writer.join()
+
+    assert writer.exitcode == 0
+    pd.testing.assert_frame_equal(store.load("EURUSD"), frame, check_freq=False)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import shutil
+import time
+from multiprocessing import AuthenticationError
+from types import SimpleNamespace
+
+import pytest
+
+import distributed
+from conftest import DATA_FILE, STRATEGY_FILES
+
+
+def test_authkey_is_required(monkeypatch):
+    monkeypatch.delenv(distributed.AUTHKEY_ENV, raising=False)
+    with pytest.raises(ValueError):
+        distributed.resolve_authkey()
+    with pytest.raises(SystemExit):
+        distributed.main(["worker", "--connect", "127.0.0.1:1"])
+    monkeypatch.setenv(distributed.AUTHKEY_ENV, "geheim")
+    assert distributed.resolve_authkey() == b"geheim"
+    assert distributed.resolve_authkey("anders") == b"anders"
+
+
+def test_coordinator_binds_localhost_and_rejects_wrong_key(tmp_path):
+    coordinator = distributed.Coordinator([], {}, tmp_path, port=0, authkey="geheim")
+    address = coordinator.start()
+    assert address[0] == "127.0.0.1"
+    with pytest.raises(AuthenticationError):
+        distributed.run_worker(address, "falsch")
+
+
+def test_duplicate_dataset_names_are_rejected(tmp_path):
+    for folder in ("a", "b"):
+        (tmp_path / folder).mkdir()
+        shutil.copy(DATA_FILE, tmp_path / folder / DATA_FILE.name)
+    with pytest.raises(ValueError, match=DATA_FILE.name):
+        distributed.build_jobs([str(STRATEGY_FILES[0])], [str(tmp_path / "*" / "*.csv")])
+
+    jobs, datasets = distributed.build_jobs([str(STRATEGY_FILES[0])], [str(tmp_path / "a" / "*.csv")])
+    assert list(datasets) == [DATA_FILE.name] and len(jobs) == 1
+
+
+def _board(monkeypatch, n=4, **kwargs):
+    now = [0.0]
+    monkeypatch.setattr(distributed, "time", SimpleNamespace(monotonic=lambda: now[0], sleep=time.sleep,
+                                                             perf_counter=time.perf_counter))
+    jobs = [{"id": f"J{i}", "strategy_file": "s.json", "name": "s", "params": {}, "dataset": "d.csv"}
+            for i in range(1, n + 1)]
+    return distributed.JobBoard(jobs, {}, **kwargs), now
+
+
+def test_expired_leases_are_requeued_in_order(monkeypatch):
+    board, now = _board(monkeypatch, lease_timeout=10, max_attempts=3)
+    assert [job["id"] for job in board.lease("w1", 3)] == ["J1", "J2", "J3"]
+    now[0] = 5
+    board.heartbeat("w1")                 # verlängert bis 15
+    now[0] = 12
+    assert board.status()["leased"] == 3
+
+    now[0] = 16                           # w1 abgestürzt
+    assert [job["id"] for job in board.lease("w2", 4)] == ["J1", "J2", "J3", "J4"]
+    assert board.complete("w2", "J1", {"status": "ok"})
+    assert not board.complete("w1", "J1", {"status": "ok"})      # verspätete Antwort zählt nicht
+    assert board.rows()[0]["worker"] == "w2"
+
+
+def test_max_attempts_records_an_error(monkeypatch):
+    board, now = _board(monkeypatch, n=1, lease_timeout=10, max_attempts=2)
+    for attempt in range(2):
+        assert [job["id"] for job in board.lease(f"w{attempt}")] == ["J1"]
+        now[0] += 11
+    assert board.lease("w9") is None
+    [row] = board.rows()
+    assert row["status"] == "error: Lease 2x abgelaufen" and row["worker"] == "w1"
+
+
+def test_coordinator_with_local_workers(tmp_path):
+    grid = {"entry_logic.*.sl": [100, 200]}
+    jobs, datasets = distributed.build_jobs([str(p) for p in STRATEGY_FILES], [str(DATA_FILE)], grid)
+    coordinator = distributed.Coordinator(jobs, datasets, tmp_path / "out", port=0, authkey="geheim")
+    table = coordinator.run(local_workers=2, batch_size=1, cache_dir=tmp_path / "cache", poll=0.1)
+
+    assert len(table) == len(jobs) == 2 * len(STRATEGY_FILES)
+    assert (table["status"] == "ok").all(), table["status"].tolist()
+    assert table["job"].tolist() == [job["id"] for job in jobs]
+    assert (tmp_path / "out" / "metrics.csv").exists()
+    assert len((tmp_path / "out" / "results.jsonl").read_text(encoding="utf-8").splitlines()) == len(jobs)
+    assert len(list((tmp_path / "cache").glob("*.csv"))) == 1
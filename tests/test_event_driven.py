@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+
+from backtester import Backtester
+
+
+def test_event_driven_matches_full_loop(eurusd, strategy):
+    trades = {}
+    for event_driven in (False, True):
+        bt = Backtester(eurusd.copy(), strategy, event_driven=event_driven)
+        trades[event_driven] = pd.DataFrame(bt.run_backtest(strategy)[0])
+    assert len(trades[False]) > 0
+    pd.testing.assert_frame_equal(trades[True], trades[False])
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from backtester import Backtester
+from bitmask import MaskSet, PackedMask
+from export import ResultSink, export_results, mask_table, read_frame, trade_schema, trades_table
+
+
+def test_packed_masks_match_bool_columns():
+    rng = np.random.default_rng(3)
+    index = pd.date_range("2024-01-01", periods=29, freq="h")   # kein Vielfaches von 8
+    values = {name: rng.random(len(index)) < 0.4 for name in ("R1", "R2")}
+    masks = MaskSet(index, {name: PackedMask.from_bool(v, index) for name, v in values.items()})
+
+    packed = mask_table(masks).to_pandas()
+    unpacked = mask_table(pd.DataFrame(values, index=index)).to_pandas()
+    pd.testing.assert_frame_equal(packed, unpacked)
+    for name, expected in values.items():
+        assert packed[name].tolist() == expected.tolist()
+
+
+def test_trade_schema_with_missing_values():
+    entry = pd.Timestamp("2024-01-01 10:00")
+    trades = [
+        {"id": "T001", "logic_id": "L1", "type": "buy", "entry_time": entry, "entry_price": 1.1,
+         "sl": 100, "tp": 200, "exit_time": entry + pd.Timedelta(hours=3), "exit_price": 1.102,
+         "exit_reason": "take_profit", "pnl": 12.5, "duration": pd.Timedelta(hours=3)},
+        {"id": "T002", "logic_id": None, "type": "sell", "entry_time": entry, "entry_price": 1.1,
+         "sl": None, "tp": 200, "exit_time": None, "exit_price": None, "duration": pd.NaT},
+    ]
+    table = trades_table(trades, forced=["T002"])
+    assert table.schema == trade_schema()
+    frame = table.to_pandas()
+    assert frame["forced"].tolist() == [False, True]
+    assert table.column("logic_id").to_pylist() == ["L1", None]
+    assert pd.isna(frame.loc[1, "exit_time"]) and pd.isna(frame.loc[1, "duration"])
+    assert np.isnan(frame.loc[1, "sl"]) and np.isnan(frame.loc[0, "sl_trailing"])
+    assert frame.loc[0, "duration"] == pd.Timedelta(hours=3)
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_round_trip_through_read_frame(eurusd, strategy, fmt, tmp_path):
+    bt = Backtester(eurusd.iloc[:3000].copy(), strategy)
+    with ResultSink(tmp_path / "sink", fmt=fmt, batch_rows=7) as sink:
+        trades, _, signal_data, metrics, _ = bt.run_backtest(strategy, sink=sink)
+    paths = export_results(tmp_path / "export", trades, metrics, signal_data, fmt=fmt, forced=bt._forced_ids)
+
+    exported = read_frame(paths["trades"])
+    assert exported["id"].tolist() == [t["id"] for t in metrics["Trades"]]
+    np.testing.assert_array_equal(exported["exit_price"], [t["exit_price"] for t in metrics["Trades"]])
+    np.testing.assert_allclose(exported["pnl"], [t["pnl"] for t in metrics["Trades"]])
+    # der Sink schreibt in Ausstiegsreihenfolge
+    streamed = read_frame(tmp_path / "sink" / f"trades{paths['trades'].suffix}")
+    pd.testing.assert_frame_equal(streamed.sort_values("id", ignore_index=True), exported)
+
+    equity = read_frame(paths["equity"])["equity"]
+    np.testing.assert_array_equal(equity.to_numpy(), metrics["Equity Curve"].to_numpy())
+    assert (equity.index == metrics["Equity Curve"].index).all()
+    rules = read_frame(paths["rule_masks"])
+    assert rules.shape[1] == signal_data["rule_mask_df"].shape[1]
+    assert read_frame(paths["trades"], columns=["id", "pnl"]).columns.tolist() == ["id", "pnl"]
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import copy
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from conftest import STRATEGY_FILES, load_strategy
+from feed_hub import FeedHub
+from strategy_compiler import compile_strategy
+from strategy_core import evaluate_live_row
+
+
+def _trader(strategy, magic, symbol="EURUSD"):
+    """Stand-in für LiveTrader (ohne MT5): gleiche Attribute, on_feed zeichnet auf."""
+    compiled = compile_strategy(strategy)
+    trader = SimpleNamespace(strategy=strategy, symbol=symbol, timeframe=16385, magic=magic, compiled=compiled,
+                             history_size=compiled.requirements()["bars"] + 100, received=[])
+    trader.on_feed = lambda df, rule_results: trader.received.append((df, rule_results))
+    return trader
+
+
+@pytest.fixture
+def strategies():
+    strategies = [load_strategy(path) for path in STRATEGY_FILES]
+    variant = copy.deepcopy(next(s for s in strategies if any(r["left"]["indicator"] == "rsi" for r in s["rules"])))
+    variant["rules"][0]["right"] = 25                # gleiche Regel-IDs, ein abweichender Vergleich
+    return strategies + [variant]
+
+
+def test_shared_feed_matches_separate_evaluation(eurusd, strategies):
+    fetched = []
+
+    def fetch(symbol, timeframe, count):
+        fetched.append(count)
+        return eurusd.iloc[-count:].copy()
+
+    hub = FeedHub(fetch=fetch)
+    traders = [_trader(strategy, 1000 + i) for i, strategy in enumerate(strategies)]
+    for trader in traders:
+        feed = hub.subscribe(trader)
+    assert len(hub.feeds) == 1
+    assert hub.update(feed)
+    assert fetched == [max(t.history_size for t in traders)]      # ein Abruf für alle
+
+    summary = feed.summary()
+    assert summary["indicator_calls"] < summary["indicator_calls_separate"]
+
+    for trader in traders:
+        (df, rule_results), = trader.received
+        expected = trader.compiled.evaluate(df.copy())        # eigener LiveTrader: compute_indicators
+        assert list(rule_results) == list(expected)
+        for rule_id, series in expected.items():
+            pd.testing.assert_series_equal(rule_results[rule_id], series, check_names=False)
+        rules, logic = trader.strategy["rules"], trader.strategy["entry_logic"]
+        assert (evaluate_live_row(df, rules, logic, rule_results=rule_results)
+                == evaluate_live_row(df.copy(), rules, logic))
+
+    # gleiche Regel-ID 'R1', anderer Vergleich: der Hub hält die Ergebnisse pro Strategie getrennt
+    rsi = next(t for t in traders[:-1] if t.strategy["rules"][0]["left"]["indicator"] == "rsi")
+    assert not rsi.received[0][1]["R1"].equals(traders[-1].received[0][1]["R1"])
+
+
+def test_subscribe_rejects_duplicate_magic(strategies):
+    hub = FeedHub(fetch=lambda *args: pd.DataFrame())
+    hub.subscribe(_trader(strategies[0], 1000))
+    hub.subscribe(_trader(strategies[1], 1000, symbol="GBPUSD"))      # anderes Symbol: erlaubt
+    with pytest.raises(ValueError, match="Magic-Nummer 1000"):
+        hub.subscribe(_trader(strategies[1], 1000))
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import itertools
+
+import numpy as np
+import pytest
+
+import indicators
+import indicators_batch
+from conftest import STRATEGY_FILES, load_strategy
+
+PERIODS = [5, 14, 30]
+
+
+def assert_close(batch, single):
+    np.testing.assert_allclose(batch, np.asarray(single, dtype=np.float64), rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize("name", ["sma", "ema", "rsi", "atr", "adx", "cci"])
+def test_period_batches_match_single_indicators(eurusd, name):
+    values = getattr(indicators_batch, f"{name}_batch")(eurusd, PERIODS)
+    for j, period in enumerate(PERIODS):
+        assert_close(values[:, j], getattr(indicators, name)(eurusd, period=period))
+
+
+def test_macd_batch(eurusd):
+    params = [(12, 26, 9), (5, 26, 9), (12, 40, 5)]
+    result = indicators_batch.macd_batch(eurusd, params)
+    for j, (fast, slow, signal) in enumerate(params):
+        single = indicators.macd(eurusd, fast, slow, signal)
+        for key in ("macd", "signal", "histogram"):
+            assert_close(result[key][:, j], single[key])
+
+
+def test_bollinger_and_stochastic_batches(eurusd):
+    std_devs = [1.5, 2.0]
+    result = indicators_batch.bollinger_bands_batch(eurusd, PERIODS, std_devs)
+    for j, (period, std_dev) in enumerate(itertools.product(PERIODS, std_devs)):
+        single = indicators.bollinger_bands(eurusd, period, std_dev)
+        for key in ("upper", "middle", "lower"):
+            assert_close(result[key][:, j], single[key])
+
+    result = indicators_batch.stochastic_oscillator_batch(eurusd, PERIODS, d_period=3)
+    for j, k_period in enumerate(PERIODS):
+        single = indicators.stochastic_oscillator(eurusd, k_period, 3)
+        for key in ("percent_k", "percent_d"):
+            assert_close(result[key][:, j], single[key])
+
+
+def test_variants_return_single_indicator_format(eurusd):
+    param_sets = [{"period": 20, "std_dev": 2.0}, {"period": 10, "std_dev": 2.0}, {"period": 20, "std_dev": 1.0}]
+    for params, result in zip(param_sets, indicators_batch.variants(eurusd, "bollinger_bands", param_sets)):
+        single = indicators.bollinger_bands(eurusd, **params)
+        assert set(result) == set(single)
+        assert result["upper"].index.equals(eurusd.index)
+        assert_close(result["upper"], single["upper"])
+    assert indicators_batch.variants(eurusd, "obv", [{}, {}]) is None
+
+
+def test_optimizer_batch_indicators_same_result(eurusd):
+    from optimizer import successive_halving
+
+    strategy = load_strategy(next(path for path in STRATEGY_FILES if "rsi" in path.stem))
+    grid = {"rules.*.left.params.period": [7, 14, 21], "entry_logic.*.sl": [100, 200]}
+    df = eurusd.iloc[:3000]
+    batched = successive_halving(df, strategy, grid, min_bars=300, batch_indicators=True)
+    single = successive_halving(df, strategy, grid, min_bars=300, batch_indicators=False)
+    assert batched["best"]["params"] == single["best"]["params"]
+    assert batched["rounds"] == single["rounds"]
+    assert batched["best"]["score"] == single["best"]["score"]
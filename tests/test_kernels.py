@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators
+import kernels
+
+WINDOWS = [1, 2, 7, 14, 20, 50]
+
+
+@pytest.fixture(scope="module")
+def close(eurusd):
+    series = eurusd["Close"].iloc[:3000].copy()
+    series.iloc[[100, 101, 1500]] = np.nan       # Fenster über Lücken → NaN wie bei pandas
+    return series
+
+
+@pytest.mark.parametrize("window", WINDOWS)
+def test_rolling_kernels_match_pandas(close, window):
+    rolling = close.rolling(window)
+    for kernel, expected in [(kernels.rolling_sum, rolling.sum()), (kernels.rolling_mean, rolling.mean()),
+                             (kernels.rolling_max, rolling.max()), (kernels.rolling_min, rolling.min())]:
+        np.testing.assert_allclose(kernel(close, window), expected, rtol=1e-12, atol=1e-12, err_msg=kernel.__name__)
+    if window > 1:
+        # konstante Fenster: Kernel exakt 0, pandas Rundungsrest um 1e-9
+        np.testing.assert_allclose(kernels.rolling_std(close, window), rolling.std(), rtol=1e-7, atol=1e-8)
+    np.testing.assert_allclose(kernels.rolling_mad(close, window),
+                               rolling.apply(lambda w: np.abs(w - w.mean()).mean(), raw=True),
+                               rtol=1e-9, atol=1e-15)
+
+
+def test_rolling_sums_match_single_windows(close):
+    for centered in (False, True):
+        for window, sums in zip(WINDOWS, kernels.rolling_sums(close, WINDOWS, centered=centered)):
+            np.testing.assert_allclose(sums, close.rolling(window).sum(), rtol=1e-10, atol=1e-12)
+
+
+def test_kernels_run_column_wise_on_2d_and_short_input(eurusd):
+    frame = eurusd[["Open", "High", "Low", "Close"]].iloc[:500]
+    np.testing.assert_allclose(kernels.rolling_mean(frame, 20), frame.rolling(20).mean(), rtol=1e-12)
+    np.testing.assert_allclose(kernels.rolling_max(frame, 20), frame.rolling(20).max())
+    assert np.isnan(kernels.rolling_mean(frame["Close"].iloc[:5], 20)).all()
+
+
+def test_indicators_match_pandas_formulas(eurusd):
+    df = eurusd.iloc[:3000]
+    close = df["Close"]
+    mid, sd = close.rolling(20).mean(), close.rolling(20).std()
+    bands = indicators.bollinger_bands(df, 20, 2.0)
+    pd.testing.assert_series_equal(bands["upper"], mid + 2.0 * sd, check_names=False, rtol=1e-9)
+    pd.testing.assert_series_equal(bands["lower"], mid - 2.0 * sd, check_names=False, rtol=1e-9)
+
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0.0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0.0)).rolling(14).mean()
+    pd.testing.assert_series_equal(indicators.rsi(df, 14), 100 - 100 / (1 + gain / loss),
+                                   check_names=False, rtol=1e-9)
+
+    tp = (df["High"] + df["Low"] + df["Close"]) / 3
+    mad = tp.rolling(20).apply(lambda w: np.abs(w - w.mean()).mean(), raw=True)
+    pd.testing.assert_series_equal(indicators.cci(df, 20), (tp - tp.rolling(20).mean()) / (0.015 * mad),
+                                   check_names=False, rtol=1e-8)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import json
+import urllib.request
+from types import SimpleNamespace
+
+from feed_hub import FeedHub
+from live_metrics import LiveMetrics, render_prometheus
+
+
+def _trader(strategy, magic):
+    # nur was FeedHub.subscribe/start_metrics braucht (LiveTrader selbst braucht MetaTrader5)
+    return SimpleNamespace(strategy=strategy, symbol="EURUSD", timeframe=16385, magic=magic, history_size=50,
+                           metrics=LiveMetrics(labels={"symbol": "EURUSD", "magic": magic,
+                                                       "strategy": strategy["name"]}))
+
+
+def _metrics(magic, name):
+    metrics = LiveMetrics(labels={"symbol": "EURUSD", "magic": magic, "strategy": name})
+    with metrics.cycle():
+        with metrics.phase("fetch"):
+            pass
+        metrics.inc("signals")
+    return metrics
+
+
+def test_render_merges_series_under_one_type_line():
+    text = render_prometheus([_metrics(1, "rsi"), _metrics(2, 'bb "v2"')])
+    assert text.count("# TYPE backtester_live_signals_total counter") == 1
+    assert 'backtester_live_signals_total{symbol="EURUSD",magic="1",strategy="rsi"} 1' in text
+    assert 'strategy="bb \\"v2\\""' in text
+    assert text.count("# TYPE backtester_live_cycle_seconds histogram") == 1
+
+
+def test_hub_serves_one_endpoint_and_shared_log(tmp_path, strategy):
+    hub = FeedHub(fetch=lambda *args: None)
+    traders = [_trader(dict(strategy, name=f"s{i}"), 123456 + i) for i in range(2)]
+    for trader in traders:
+        hub.subscribe(trader)
+    log_path = tmp_path / "live_metrics.jsonl"
+    server = hub.start_metrics(port=0, log_path=str(log_path))
+    try:
+        for trader in traders:
+            with trader.metrics.cycle():
+                trader.metrics.inc("signals")
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        text = urllib.request.urlopen(f"{base}/metrics").read().decode()
+        snapshots = json.loads(urllib.request.urlopen(f"{base}/metrics.json").read())
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert 'magic="123456"' in text and 'magic="123457"' in text
+    assert [snap["labels"]["strategy"] for snap in snapshots] == ["s0", "s1"]
+    records = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+    assert sorted(record["labels"]["magic"] for record in records) == [123456, 123457]
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+
+from conftest import DATA_FILE
+from load_mt5_data import _line_chunks, load_data
+
+
+def test_first_chunk_starts_with_data_line():
+    chunks = _line_chunks(str(DATA_FILE), 64 * 1024)
+    with open(DATA_FILE, "rb") as f:
+        header = f.readline()
+        _, start, _ = chunks[0]
+        assert start == len(header)
+        f.seek(start)
+        assert f.read(4).isdigit()            # Datum 'YYYY.MM.DD', kein '\n' der Kopfzeile
+
+
+def test_chunks_cover_file_on_line_boundaries():
+    chunks = _line_chunks(str(DATA_FILE), 64 * 1024)
+    data = DATA_FILE.read_bytes()
+    for (_, start, end), (_, next_start, _) in zip(chunks, chunks[1:]):
+        assert end == next_start
+        assert data[end - 1:end] == b"\n"
+    assert chunks[-1][2] == len(data)
+
+
+def test_parallel_equals_sequential(eurusd):
+    df = load_data.metatrader_csv_parallel(str(DATA_FILE), workers=1, chunk_bytes=64 * 1024)
+    pd.testing.assert_frame_equal(df, eurusd)
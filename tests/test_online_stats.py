@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from online_stats import OnlineStats
+
+
+def _series(n=500, seed=7):
+    rng = np.random.default_rng(seed)
+    return rng.normal(5.0, 120.0, n), rng.normal(0.0005, 0.01, n)
+
+
+def test_welford_and_drawdown_match_numpy():
+    pnl, ret = _series()
+    stats = OnlineStats(start_balance=10000)
+    for p, r in zip(pnl, ret):
+        stats.update(float(p), float(r))
+
+    assert stats.mean == pytest.approx(ret.mean(), rel=1e-12)
+    assert stats.variance == pytest.approx(ret.var(ddof=1), rel=1e-10)
+    equity = 10000 + np.cumsum(pnl)
+    peak = np.maximum.accumulate(np.r_[10000.0, equity])[1:]
+    assert stats.balance == pytest.approx(equity[-1])
+    assert stats.max_drawdown == pytest.approx((peak - equity).max())
+    assert stats.max_drawdown_pct == pytest.approx(((peak - equity) / peak).max() * 100)
+    assert stats.win_rate == pytest.approx((pnl > 0).mean() * 100)
+    assert stats.total_pnl == pytest.approx(pnl.sum())
+
+
+def test_snapshot_round_trip(tmp_path):
+    pnl, ret = _series(50)
+    stats = OnlineStats(start_balance=10000)
+    for i, (p, r) in enumerate(zip(pnl[:30], ret[:30]), 1):
+        stats.update(float(p), float(r), deal_ticket=i)
+    stats.deal_window()
+    path = tmp_path / "live_stats.json"
+    stats.save(path)
+
+    restored = OnlineStats.load(path)
+    assert restored.to_dict() == stats.to_dict()
+    for p, r in zip(pnl[30:], ret[30:]):
+        stats.update(float(p), float(r))
+        restored.update(float(p), float(r))
+    assert restored.summary() == stats.summary()
+
+
+def test_deal_window_follows_polls_without_trades():
+    stats = OnlineStats(start_balance=10000)
+    start = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    since, until = stats.deal_window(now=start)
+    assert since == start - timedelta(days=7) and until == start + timedelta(days=1)
+
+    # eine Woche ohne Deals: das Fenster wächst nicht mit
+    for hours in range(1, 24 * 7):
+        since, until = stats.deal_window(now=start + timedelta(hours=hours))
+    assert until - since == timedelta(days=2, hours=1)
+    assert stats.last_update is None
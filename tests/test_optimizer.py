@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from conftest import STRATEGY_FILES, load_strategy
+from optimizer import evaluate_candidate, successive_halving
+
+GRID = {"entry_logic.*.sl": [100, 200], "entry_logic.*.tp": [200, 400]}
+
+
+def rsi_strategy():
+    return load_strategy(next(path for path in STRATEGY_FILES if "rsi" in path.stem))
+
+
+def test_aborted_candidate_reports_simulated_bars(eurusd):
+    score, metrics, bars, reason = evaluate_candidate(eurusd, rsi_strategy(), {}, 3000, "Total Profit",
+                                                      limits={"max_trades": 1})
+    assert reason is not None and metrics is None
+    assert 0 < bars < 3000
+
+
+def test_leaderboard_without_limits(eurusd):
+    result = successive_halving(eurusd.iloc[:3000], rsi_strategy(), GRID, min_bars=300)
+    assert result["best"] is result["leaderboard"][0]
+    assert all(res["bars"] == 3000 and res["aborted"] is None for res in result["leaderboard"])
+
+
+def test_all_candidates_aborted_reports_no_best(eurusd):
+    result = successive_halving(eurusd.iloc[:3000], rsi_strategy(), GRID, min_bars=300,
+                                limits={"max_trades": 1})
+    assert result["best"] is None
+    assert result["leaderboard"] == []
+    assert result["rounds"][-1]["survivors"] == 0
+    assert result["bars_evaluated"] < result["bars_full_grid"]
+
+
+def test_importing_sweep_modules_keeps_progress_bars(monkeypatch):
+    import subprocess
+    import sys
+
+    from conftest import SRC
+
+    monkeypatch.delenv("TQDM_DISABLE", raising=False)
+    code = "import os, optimizer, batch_runner, distributed, panel; print('TQDM_DISABLE' in os.environ)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=SRC, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+def test_backtester_progress_flag(eurusd, capsys):
+    from backtester import Backtester
+
+    strategy = rsi_strategy()
+    Backtester(eurusd.iloc[:500].copy(), strategy, progress=False).run_backtest(strategy)
+    assert "Backtesting" not in capsys.readouterr().err
+    Backtester(eurusd.iloc[:500].copy(), strategy).run_backtest(strategy)
+    assert "Backtesting" in capsys.readouterr().err
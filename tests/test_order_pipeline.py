@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+from types import SimpleNamespace
+
+import order_pipeline
+from order_pipeline import ORDER_TYPE_BUY, RETRY_RETCODES, FakeBroker, OrderPipeline
+
+REQUEST = {"symbol": "EURUSD", "type": ORDER_TYPE_BUY, "price": 1.1, "volume": 0.1}
+
+
+class GatedBroker(FakeBroker):
+    """FakeBroker, dessen order_send erst nach gate.set() antwortet."""
+
+    def __init__(self, **kwargs):
+        super().__init__(latency=(0, 0), requote_rate=0.0, seed=1, **kwargs)
+        self.gate = threading.Event()
+        self.entered = threading.Event()
+
+    def order_send(self, request):
+        self.entered.set()
+        self.gate.wait(5)
+        return super().order_send(request)
+
+
+def test_retry_with_backoff_and_fresh_price(monkeypatch):
+    sleeps = []
+    clock = SimpleNamespace(perf_counter=time.perf_counter, time=time.time,
+                            sleep=lambda s: sleeps.append(s) if s else None)
+    monkeypatch.setattr(order_pipeline, "time", clock)
+
+    broker = FakeBroker(latency=(0, 0), requote_rate=1.0, seed=3)
+    with OrderPipeline(broker, workers=1, max_retries=3, retry_delay=0.01, retry_backoff=2.0) as pipeline:
+        ticket = pipeline.submit(dict(REQUEST))
+        assert ticket.wait(5)
+    assert ticket.status == "failed" and ticket.retcode in RETRY_RETCODES
+    assert ticket.attempts == 4 and len(broker.sent) == 4
+    assert sleeps == [0.01, 0.02, 0.04]
+    # jede Wiederholung mit frischem Ask aus symbol_info_tick
+    assert [sent["price"] for sent in broker.sent[1:]] != [REQUEST["price"]] * 3
+
+
+def test_status_transitions_and_rejection_when_queue_full():
+    broker = GatedBroker()
+    seen = []
+    with OrderPipeline(broker, workers=1, max_queue=1) as pipeline:
+        first = pipeline.submit(dict(REQUEST), on_done=lambda t: seen.append((t.id, t.status)))
+        assert broker.entered.wait(5)
+        assert first.status == "sending"
+        second = pipeline.submit(dict(REQUEST))
+        assert second.status == "queued"
+        third = pipeline.submit(dict(REQUEST))
+        assert third.status == "rejected" and third.done.is_set() and third.attempts == 0
+
+        broker.gate.set()
+        pipeline.join()
+    assert (first.status, second.status) == ("done", "done")
+    assert seen == [(first.id, "done")]
+    assert first.signal_time <= first.submitted <= first.acked == first.filled
+    stats = pipeline.latency_stats()
+    assert stats["status"] == {"done": 2, "rejected": 1}
+
+
+def test_completed_history_is_bounded():
+    broker = FakeBroker(latency=(0, 0), requote_rate=0.0, seed=2)
+    with OrderPipeline(broker, workers=2, history=5) as pipeline:
+        for _ in range(20):
+            pipeline.submit(dict(REQUEST))
+        pipeline.join()
+    assert len(pipeline.completed) == 5
+    assert pipeline.latency_stats()["count"] == 5
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+
+from backtester import Backtester
+from panel import make_panel, panel_gaps, run_panel
+
+COLUMNS = ["id", "type", "entry_time", "entry_price", "exit_time", "exit_price", "exit_reason", "pnl"]
+
+
+def _frames(eurusd):
+    other = eurusd.iloc[500:].copy()
+    for col in ["Open", "High", "Low", "Close"]:
+        other[col] = (other[col] * 1.3).round(5)
+    return {"EURUSD": eurusd.copy(), "OTHER": other}
+
+
+def test_inner_join_panel_matches_single_symbol_runs(eurusd, strategy):
+    frames = _frames(eurusd)
+    results = run_panel(frames, strategy, join="inner")
+    common = frames["OTHER"].index
+    for symbol, df in frames.items():
+        single = Backtester(df.loc[common].copy(), strategy, event_driven=True).run_backtest(strategy)[0]
+        panel_trades = pd.DataFrame(results[symbol][0])
+        assert len(panel_trades) > 0
+        pd.testing.assert_frame_equal(panel_trades[COLUMNS], pd.DataFrame(single)[COLUMNS])
+
+
+def test_outer_join_warns_about_gaps_inside_a_symbol(eurusd, capsys):
+    frames = {"EURUSD": eurusd.iloc[:1000], "HALF": eurusd.iloc[200:1000:2], "LATE": eurusd.iloc[600:]}
+    panel = make_panel(frames, join="outer")
+    assert panel_gaps(panel) == {"HALF": 399}
+    out = capsys.readouterr().out
+    assert "HALF: 399 Lücken" in out and "EURUSD" not in out and "LATE" not in out
+
+    make_panel(frames, join="inner")
+    assert "Lücken" not in capsys.readouterr().out
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+from backtester import Backtester
+from performance import drawdown, extended_metrics
+
+
+def _run(eurusd, strategy):
+    bt = Backtester(eurusd.copy(), strategy)
+    metrics = bt.run_backtest(strategy)[3]
+    return bt, metrics
+
+
+def test_mark_to_market_matches_per_bar_loop(eurusd, strategy):
+    bt, metrics = _run(eurusd, strategy)
+    realized = metrics["Equity Curve"].to_numpy()
+    mtm = metrics["Equity Curve (MTM)"].to_numpy()
+    index = metrics["Equity Curve"].index
+    close = bt.df["Close"].reindex(index).to_numpy()
+    trades = metrics["Trades"]
+    assert any(t["type"] == "sell" for t in trades)
+
+    factor = strategy["rpt"] * strategy["lever"]
+    entries = index.get_indexer([t["entry_time"] for t in trades])
+    exits = index.get_indexer([t["exit_time"] for t in trades])
+    expected = np.empty(len(index))
+    for bar in range(len(index)):
+        exposure = (realized[bar - 1] if bar else strategy["start balance"]) * factor
+        unrealized = sum((close[bar] - t["entry_price"]) * (1 if t["type"] == "buy" else -1)
+                         for t, entry, exit_ in zip(trades, entries, exits) if entry <= bar < exit_)
+        expected[bar] = realized[bar] + exposure * unrealized
+    np.testing.assert_allclose(mtm, expected, rtol=0, atol=1e-6)
+
+    # Ausstiegs-Bars: ohne weiter offene Trades ist MTM = realisiert; SL/TP/Trailing schließen
+    # zum bewerteten Kurs, die MTM-Kurve springt dort also nicht um den Spread
+    still_open = [((entries <= bar) & (bar < exits)).any() for bar in exits]
+    flat_exits = [bar for bar, open_ in zip(exits, still_open) if not open_]
+    assert flat_exits
+    np.testing.assert_allclose(mtm[flat_exits], realized[flat_exits], rtol=0, atol=1e-9)
+    for t, exit_ in zip(trades, exits):
+        if t["exit_reason"] in ("stop_loss", "take_profit", "trailing_stop"):
+            assert t["exit_price"] == close[exit_]
+
+
+def test_extended_metrics_on_hand_computed_curve():
+    # 5 Bars über genau ein Jahr (je ein Kalendertag) – Bar- und Tagesrenditen sind identisch
+    index = pd.date_range("2020-01-01", periods=5, freq=pd.Timedelta(days=365.25 / 4))
+    equity = pd.Series([100.0, 110.0, 99.0, 121.0, 110.0], index=index)
+    trades = [{"entry_time": index[1], "exit_time": index[3], "pnl": 10.0},
+              {"entry_time": index[2], "exit_time": index[4], "pnl": -11.0},
+              {"entry_time": index[1], "exit_time": index[2], "pnl": 22.0},
+              {"entry_time": index[3], "exit_time": index[4], "pnl": -11.0}]
+
+    underwater, peak, last_peak = drawdown(equity.to_numpy())
+    np.testing.assert_allclose(underwater, [0.0, 0.0, -0.1, 0.0, 110 / 121 - 1])
+    np.testing.assert_array_equal(peak, [100, 110, 110, 121, 121])
+    np.testing.assert_array_equal(last_peak, [0, 1, 1, 3, 3])
+
+    metrics = extended_metrics(equity, trades, start_balance=100.0)
+    assert metrics["Max Drawdown"] == 11.0
+    assert metrics["Max Drawdown (%)"] == 10.0
+    assert metrics["Max Drawdown Duration (Bars)"] == 1
+    assert metrics["Max Drawdown Duration (Days)"] == 91.31
+    assert metrics["CAGR (%)"] == 10.0
+
+    # Renditen ab Start-Balance: 0, +10 %, −10 %, +2/9, −1/11; 5 Perioden pro Jahr
+    returns = np.array([0.0, 0.1, -0.1, 2 / 9, -1 / 11])
+    sharpe = returns.mean() / returns.std(ddof=1) * np.sqrt(5)
+    sortino = returns.mean() / np.sqrt(((0.1 ** 2) + (1 / 11) ** 2) / 5) * np.sqrt(5)
+    assert metrics["Sharpe (Bar)"] == metrics["Sharpe (Daily)"] == round(sharpe, 3) == 0.431
+    assert metrics["Sortino (Bar)"] == metrics["Sortino (Daily)"] == round(sortino, 3)
+
+    assert metrics["Profit Factor"] == round(32 / 22, 3)
+    assert metrics["Expectancy"] == 2.5
+    assert metrics["Time in Market (%)"] == 60.0
+    pd.testing.assert_series_equal(metrics["Underwater Curve"], pd.Series(underwater * 100, index=index,
+                                                                          name="Underwater (%)"))
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import sys
+
+import pandas as pd
+import pytest
+
+import registry
+
+PLUGIN = '''
+calls = []
+
+def typical_price(df, period=1):
+    calls.append(period)
+    return (df["High"] + df["Low"] + df["Close"]) / 3
+
+def above_or_equal(left, right):
+    return left >= right
+'''
+
+
+@pytest.fixture
+def plugin_package(tmp_path, monkeypatch):
+    """Installiertes Fremdpaket: Modul + dist-info mit Entry Points auf sys.path."""
+    (tmp_path / "demo_plugin.py").write_text(PLUGIN, encoding="utf-8")
+    dist = tmp_path / "demo_plugin-1.0.dist-info"
+    dist.mkdir()
+    (dist / "METADATA").write_text("Metadata-Version: 2.1\nName: demo-plugin\nVersion: 1.0\n", encoding="utf-8")
+    (dist / "entry_points.txt").write_text(
+        "[backtester.indicators]\ntypical_price = demo_plugin:typical_price\n\n"
+        "[backtester.triggers]\nabove_or_equal = demo_plugin:above_or_equal\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for kind in registry.KINDS:
+        registry._load_builtins(kind)
+        monkeypatch.setitem(registry._plugins, kind, dict(registry._plugins[kind]))
+    yield
+    sys.modules.pop("demo_plugin", None)
+
+
+def test_entry_points_are_listed_and_loaded_on_demand(plugin_package):
+    assert "typical_price" in registry.available("indicator")
+    assert "above_or_equal" in registry.available("trigger")
+    assert "demo_plugin" not in sys.modules             # Auflisten lädt kein Fremdpaket
+
+    func = registry.get_indicator("typical_price")
+    assert func.__module__ == "demo_plugin"
+    assert "above_or_equal" not in registry._plugins["trigger"]   # nur der angefragte Entry Point
+    assert registry.requirement("indicator", "typical_price", {"period": 5}) == (0, 0)
+
+    with pytest.raises(ValueError, match="Unbekannter Indikator 'missing'"):
+        registry.get_indicator("missing")
+    with pytest.raises(ValueError, match="bereits registriert"):
+        registry.register("indicator", lambda df: df["Close"], name="typical_price")
+
+
+def test_entry_point_plugins_in_strategy(plugin_package, eurusd):
+    from strategy_core import evaluate_rules
+
+    df = eurusd.iloc[:500].copy()
+    rules = [{"id": "R1", "left": {"indicator": "price", "params": {"field": "Close"}},
+              "right": {"indicator": "typical_price", "params": {"period": 3}}, "trigger": "above_or_equal"},
+             {"id": "R2", "left": {"indicator": "typical_price", "params": {"period": 3}},
+              "right": 1.0, "trigger": "above"}]
+    results = evaluate_rules(df, rules)
+
+    typical = (df["High"] + df["Low"] + df["Close"]) / 3
+    pd.testing.assert_series_equal(results["R1"], df["Close"] >= typical, check_names=False)
+    pd.testing.assert_series_equal(results["R2"], typical > 1.0, check_names=False)
+    assert sys.modules["demo_plugin"].calls == [3]      # gemeinsamer Knoten, ein Aufruf
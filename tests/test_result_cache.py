@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import os
+
+import numpy as np
+import pandas as pd
+
+from backtester import Backtester
+from result_cache import ResultCache, cached_backtest
+
+
+def _assert_same(cached, fresh):
+    (trades, metrics), (fresh_trades, fresh_metrics) = cached, fresh
+    pd.testing.assert_frame_equal(pd.DataFrame(trades), pd.DataFrame(fresh_trades), check_dtype=False, check_exact=True)
+    for name, value in fresh_metrics.items():
+        if isinstance(value, pd.Series):
+            np.testing.assert_array_equal(metrics[name].to_numpy(), value.to_numpy())
+            assert (metrics[name].index == value.index).all()
+        elif name == "Trades":
+            pd.testing.assert_frame_equal(pd.DataFrame(metrics[name]), pd.DataFrame(value), check_dtype=False, check_exact=True)
+        else:
+            assert metrics[name] == value, name
+
+
+def test_cache_hit_equals_fresh_run(eurusd, strategy, tmp_path):
+    df = eurusd.iloc[:3000]
+    cache = ResultCache(tmp_path)
+    *first, hit = cached_backtest(df.copy(), strategy, cache)
+    assert not hit
+    *second, hit = cached_backtest(df.copy(), strategy, cache)
+    assert hit
+
+    fresh = Backtester(df.copy(), strategy).run_backtest(strategy)
+    _assert_same(second, (fresh[0], fresh[3]))
+
+
+def test_backtester_options_are_part_of_the_key(eurusd, strategy, tmp_path):
+    df = eurusd.iloc[:3000]
+    cache = ResultCache(tmp_path)
+    cached_backtest(df.copy(), strategy, cache)
+    *_, hit = cached_backtest(df.copy(), strategy, cache, mtm_resolution="1D")
+    assert not hit
+    *result, hit = cached_backtest(df.copy(), strategy, cache, mtm_resolution="1D")
+    assert hit
+    fresh = Backtester(df.copy(), strategy, mtm_resolution="1D").run_backtest(strategy)
+    _assert_same(result, (fresh[0], fresh[3]))
+
+    assert cache.key(strategy, df) == cache.key(strategy, df, {"event_driven": True, "compact": False})
+    assert cache.key(strategy, df) != cache.key(strategy, df, {"compact": True})
+    assert cache.key(strategy, df, {"compact": True}) != cache.key(strategy, df, {"compact": True, "price_digits": 3})
+
+
+def test_lru_eviction(tmp_path):
+    index = pd.date_range("2024-01-01", periods=2000, freq="h")
+    rng = np.random.default_rng(0)
+    cache = ResultCache(tmp_path)
+
+    def put(name):
+        metrics = {"Total Profit": 1.0, "Equity Curve": pd.Series(rng.random(len(index)), index=index)}
+        cache.put(name, [], metrics)
+        return os.path.getsize(tmp_path / f"{name}.npz")
+
+    size = max(put(name) for name in ("a", "b", "c"))
+    for age, name in enumerate(("a", "b", "c")):           # Zugriffszeiten eindeutig staffeln
+        os.utime(tmp_path / f"{name}.npz", (1000 + age, 1000 + age))
+    assert cache.get("a") is not None                        # a zuletzt benutzt → b ist am ältesten
+
+    cache.max_bytes = int(size * 3.5)               # Platz für drei Einträge
+    put("d")
+    assert {p.stem for p in tmp_path.glob("*.npz")} == {"a", "c", "d"}
+    assert cache.get("b") is None
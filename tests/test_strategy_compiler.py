@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from registry import get_indicator
+from strategy_compiler import compile_strategy
+from strategy_core import StrategyLogicParser, _indicator_column, _resolve_trigger, _select_output, evaluate_rules
+
+
+def _reference_rules(df, rules):
+    """Bisheriger Auswerter: jede Regel rechnet ihre Indikatoren selbst, Konstanten bleiben Skalare."""
+    def operand(spec):
+        if not isinstance(spec, dict):
+            return spec
+        result = get_indicator(spec["indicator"])(df, **spec.get("params", {}))
+        df[_indicator_column(spec, isinstance(result, dict))] = _select_output(spec, result)
+        return df[_indicator_column(spec, isinstance(result, dict))]
+
+    return {rule["id"]: _resolve_trigger(rule["trigger"])(operand(rule["left"]), operand(rule["right"]))
+            for rule in rules}
+
+
+def test_dag_matches_rule_by_rule_evaluation(eurusd, strategy):
+    expected_df = eurusd.copy()
+    expected = _reference_rules(expected_df, strategy["rules"])
+
+    df = eurusd.copy()
+    compiled = compile_strategy(strategy)
+    values = compiled.evaluate_nodes(df, include_logic=True)
+    rules = {rule_id: values[nid] for rule_id, nid in compiled.rules.items()}
+
+    assert list(rules) == list(expected)
+    for rule_id, series in expected.items():
+        pd.testing.assert_series_equal(rules[rule_id], series, check_names=False)
+    # Spalten eines gemeinsamen Aufrufs (z. B. upper/lower) legt der DAG direkt hintereinander ab
+    assert sorted(df.columns) == sorted(expected_df.columns)
+    pd.testing.assert_frame_equal(df[expected_df.columns], expected_df)
+
+    parser = StrategyLogicParser(expected)
+    for logic_id, nid in compiled.entry_logic.items():
+        expr = next(e["when"] for e in strategy["entry_logic"] if e.get("ID") == logic_id)
+        pd.testing.assert_series_equal(values[nid], parser.parse_expression(expr), check_names=False)
+
+
+def test_dag_computes_shared_indicator_calls_once(eurusd):
+    spec = {"indicator": "atr", "params": {"period": 14}}
+    strategy = {"rules": [{"id": "R1", "left": spec, "right": 0.001, "trigger": "above"},
+                          {"id": "R2", "left": dict(spec, params={}), "right": 0.0005, "trigger": "below"},
+                          {"id": "R3", "left": spec, "right": 0.001, "trigger": "above"}]}
+    compiled = compile_strategy(strategy)
+    kinds = [node.kind for node in compiled.nodes.values()]
+    assert kinds.count("indicator") == 1
+    assert kinds.count("trigger") == 2
+    assert compiled.rules["R1"] == compiled.rules["R3"]
+
+    rules = compiled.evaluate(eurusd.iloc[:500].copy())
+    expected = _reference_rules(eurusd.iloc[:500].copy(), strategy["rules"])
+    for rule_id in expected:
+        pd.testing.assert_series_equal(rules[rule_id], expected[rule_id], check_names=False)
+
+
+def _rule(spec, trigger="above", right=0.0):
+    return {"rules": [{"id": "R1", "left": spec, "right": right, "trigger": trigger}]}
+
+
+@pytest.mark.parametrize("spec, trigger, expected", [
+    ({"indicator": "rsi", "params": {"period": 14}}, "crosses_above", (14, 15)),
+    ({"indicator": "sma", "params": {"period": 50}}, "above", (49, 49)),
+    ({"indicator": "ema", "params": {"period": 20}}, "above", (0, 93)),   # 0.9^93 ≈ 1e-4 Restgewicht
+    ({"indicator": "adx", "params": {}}, "crosses_below", (27, 28)),
+    ({"indicator": "stochastic_oscillator", "params": {"k_period": 14}, "output": "percent_d"}, "above", (15, 15)),
+    ({"indicator": "price", "params": {"field": "Close"}}, "crosses_above", (1, 1)),
+])
+def test_requirements_per_indicator(spec, trigger, expected):
+    lookback, warmup = expected
+    assert compile_strategy(_rule(spec, trigger)).requirements() == {"lookback": lookback, "warmup": warmup,
+                                                                     "bars": warmup + 1}
+
+
+def test_requirements_match_first_valid_bar(eurusd, strategy):
+    compiled = compile_strategy(strategy)
+    values = compiled.evaluate_nodes(eurusd.iloc[:500].copy())
+    first_valid = 0
+    for nid in compiled.rules.values():
+        shift = 1 if compiled.nodes[nid].attrs["trigger"].startswith("crosses") else 0
+        for operand in compiled.nodes[nid].inputs:
+            if compiled.nodes[operand].kind == "output":
+                series = values[operand]
+                first_valid = max(first_valid, int(np.flatnonzero(series.notna())[0]) + shift)
+    assert compiled.requirements()["lookback"] == first_valid
+
+
+def test_requirements_bars_reproduce_last_bar(eurusd, strategy):
+    compiled = compile_strategy(strategy)
+    bars = compiled.requirements()["bars"]
+    full = compiled.evaluate_nodes(eurusd.copy(), include_logic=True)
+    tail = compiled.evaluate_nodes(eurusd.iloc[-bars:].copy(), include_logic=True)
+    for nid, value in full.items():
+        if isinstance(value, pd.Series):
+            last = value.iloc[-1]
+            if value.dtype == bool:
+                assert tail[nid].iloc[-1] == last, nid
+            else:
+                assert tail[nid].iloc[-1] == pytest.approx(last, rel=1e-9), nid
+    # nur 'lookback' Bars: der Vorwert für crosses_* ist dann noch NaN
+    short = compiled.evaluate_nodes(eurusd.iloc[-(compiled.requirements()["lookback"]):].copy())
+    assert any(pd.isna(value.iloc[-2]) for value in short.values()
+               if isinstance(value, pd.Series) and value.dtype != bool)
+
+
+@pytest.mark.parametrize("workers", [2, 4])
+def test_threaded_evaluation_matches_serial(eurusd, strategy, workers):
+    compiled = compile_strategy(strategy)
+    serial_df, threaded_df = eurusd.copy(), eurusd.copy()
+    serial = compiled.evaluate_nodes(serial_df, include_logic=True)
+    threaded = compiled.evaluate_nodes(threaded_df, include_logic=True, workers=workers)
+
+    assert list(threaded) == list(serial)
+    for nid, value in serial.items():
+        if isinstance(value, pd.Series):
+            pd.testing.assert_series_equal(threaded[nid], value, check_exact=True)
+        elif isinstance(value, dict):
+            for key in value:
+                pd.testing.assert_series_equal(threaded[nid][key], value[key], check_exact=True)
+        else:
+            assert threaded[nid] == value
+    pd.testing.assert_frame_equal(threaded_df, serial_df)       # gleiche Spalten in gleicher Reihenfolge
+
+    rules = evaluate_rules(eurusd.copy(), strategy["rules"], workers=workers)
+    for rule_id, nid in compiled.rules.items():
+        pd.testing.assert_series_equal(rules[rule_id], serial[nid], check_exact=True)